@@ -3,12 +3,33 @@ from .apiwrapper import (  # noqa
     NotFound, UnknownStatusCode
 )
 
+from .pool import ApiPool  # noqa
+
+from .asyncapi import AsyncApi  # noqa
+
+from .ratelimit import RateLimiter  # noqa
+
+from .cache import DetailCache, SingleFlight, TTLCache  # noqa
+
+from .transport import RecordTransport, ReplayTransport  # noqa
+
+from .metrics import (  # noqa
+    MetricsCollector, PrometheusHook, OpenTelemetryHook)
+
 from .user import User  # noqa
 
+from .sync import MatchSync  # noqa
+
+from .stats import MatchStats  # noqa
+
+from .leaderboard import TrackIndex  # noqa
+
+from .warehouse import MatchWarehouse  # noqa
+
 from .metadata import (  # noqa
     set_metadatapath, getcharactersdict, getflyingpetsdict,
     getgametypesdict, getkartsdict, getpetsdict, gettracksdict, getimagepath,
     getcharactername, getcharacterid, getflyingpetid, getflyingpetname,
     getgametypeid, getgametypename, getkartid, getkartname, getpetid,
     getpetname, gettrackid, gettrackname,
-    download_meta, downmeta_ifnotexist)
+    download_meta, downmeta_ifnotexist, set_json_decoder)
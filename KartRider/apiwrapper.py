@@ -1,10 +1,18 @@
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import List, Optional, Union
+from typing import Callable, Iterable, Iterator, List, Optional, Union
 
-import requests
+import time
 
-from . import utils
-from .match import AllMatches, MatchResponse
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import metadata, utils
+from .cache import DetailCache, SingleFlight, TTLCache
+from .match import (AllMatches, MatchDetail, MatchInfo, MatchResponse,
+                    UsersMatches)
+from .metrics import Hook, _emit, _endpoint
+from .ratelimit import RateLimiter, _backoff, _shouldretry
 from .user import User
 
 _API_URL = 'https://api.nexon.co.kr/kart/v1.0/'
@@ -42,37 +50,238 @@ class UnknownStatusCode(Exception):
     pass
 
 
+def _errorstatuscode(code: int):
+    if code == 200:
+        return None
+    elif code == 400:
+        raise InvalidToken
+    elif code == 403:
+        raise ForbiddenToken
+    elif code == 404:
+        raise NotFound
+    elif code == 429:
+        raise TooManyRequest
+    else:
+        raise UnknownStatusCode(code)
+
+
+def _matchlisturl(accessid: str, start_date: str, end_date: str,
+                  offset: int, limit: int, match_types: str,
+                  base: str = _API_URL) -> str:
+    return base + (
+        f'users/{accessid}/matches?'
+        f'start_date={start_date}&end_date={end_date}'
+        f'&offset={offset}&limit={limit}&match_types={match_types}')
+
+
+def _allmatchesurl(start_date: str, end_date: str, offset: int,
+                   limit: int, match_types: str,
+                   base: str = _API_URL) -> str:
+    return base + (
+        f'matches/all?start_date={start_date}'
+        f'&end_date={end_date}&offset={offset}'
+        f'&limit={limit}&match_types={match_types}'
+    )
+
+
+def _userskey(key: str, user) -> str:
+    # accessid 를 변환한 User 는 닉네임 대신 accessid 를 키로 사용합니다.
+    if type(user) is User and user._accessid is not None:
+        return user._accessid
+    return key
+
+
 class Api(object):
     """카트라이더 OpenAPI Wrapper 클래스입니다.
 
+    모든 요청은 keep-alive 연결을 재사용하는 하나의 세션으로 보내집니다.
+    with 문으로 사용하거나, 다 쓴 뒤 :meth:`close` 를 호출하세요.
+
+    >>> with KartRider.Api(API_KEY) as api:
+    ...     api.getAllMatches()
+
     :param accesstoken: 사용자의 API KEY 문자열
+    :param pool_connections: 연결 풀을 유지할 호스트 수
+    :param pool_maxsize: 호스트 하나당 유지할 최대 연결 수
+    :param timeout: 요청 타임아웃(초), (연결, 읽기) 튜플도 가능
+    :param rate_limit: 초당 요청 수 또는 공유할 :class:`.RateLimiter`,
+        None 이면 제한하지 않습니다.
+    :param max_retries: 429, 5xx 응답을 재시도할 최대 횟수
+    :param backoff: 재시도 대기 시간의 기준(초), 재시도마다 2배로 늘어납니다.
+    :param detail_cache: 매치 상세 정보를 저장할 :class:`.DetailCache`
+    :param user_cache_size: 저장할 닉네임, accessid 변환 결과의 최대 수
+    :param user_cache_ttl: 닉네임, accessid 변환 결과의 유효 시간(초),
+        None 이나 0 이면 저장하지 않습니다.
+    :param json_decoder: 응답을 디코딩할 JSON 디코더, 'auto', 'orjson',
+        'msgspec', 'ujson', 'json' 또는 bytes 를 받는 함수
+    :param transport: 요청을 보낼 transport, None 이면 Api 의 세션으로
+        보냅니다. :mod:`KartRider.transport` 를 참고하세요.
+    :param base_url: API 의 기본 URL, :mod:`KartRider.mockserver` 같은 다른
+        서버로 요청할때 바꿉니다.
+    :param hooks: 요청, 재시도, 캐시 이벤트를 받을 함수들,
+        :mod:`KartRider.metrics` 를 참고하세요.
+    :param single_flight: True 면 여러 스레드가 동시에 같은 URL 을 요청할때
+        요청을 한번만 보내고 디코딩한 결과를 함께 받습니다. 결과는 같은
+        객체이므로 수정하지 마세요.
     """
 
-    def __init__(self, accesstoken: str):
+    def __init__(self, accesstoken: str, pool_connections: int = 4,
+                 pool_maxsize: int = 10,
+                 timeout: Union[float, tuple, None] = 10,
+                 rate_limit: Union[float, RateLimiter, None] = None,
+                 max_retries: int = 3, backoff: float = 0.5,
+                 detail_cache: Optional[DetailCache] = None,
+                 user_cache_size: int = 4096,
+                 user_cache_ttl: Optional[float] = 600,
+                 json_decoder: utils.JsonDecoder = 'auto',
+                 transport=None, base_url: str = _API_URL,
+                 hooks: Optional[Iterable[Hook]] = None,
+                 single_flight: bool = True):
         self.accesstoken = accesstoken
+        self.base_url = base_url.rstrip('/') + '/'  #: API 의 기본 URL
+        self._decode = utils._jsondecoder(json_decoder)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.detail_cache = detail_cache
+
+        #: 닉네임, accessid 변환 결과를 저장하는 :class:`.TTLCache`
+        self.usercache = None
+        if user_cache_ttl:
+            self.usercache = TTLCache(user_cache_size, user_cache_ttl)
+
+        if rate_limit is not None and not isinstance(rate_limit,
+                                                     RateLimiter):
+            rate_limit = RateLimiter(rate_limit)
+        self.ratelimiter = rate_limit
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+        #: 이벤트를 받을 함수 리스트
+        self.hooks = list(hooks) if hooks is not None else []
+
+        #: 요청을 보내는 transport
+        self.transport = transport if transport is not None else self._session
+
+        #: 같은 URL 의 동시 요청을 합치는 :class:`.SingleFlight`
+        self.singleflight = SingleFlight() if single_flight else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """세션이 유지하고 있는 연결을 모두 닫습니다.
+        """
+        self._session.close()
 
     def _makeapiheader(self):
         return {'Authorization': self.accesstoken}
 
+    def _choosekey(self) -> Optional[int]:
+        # 요청 한번에 쓸 키를 고르고 보낼 수 있을때까지 기다립니다.
+        # None 이 아닌 키는 이벤트의 'key' 로 전달됩니다.
+        if self.ratelimiter is not None:
+            self.ratelimiter.acquire()
+        return None
+
+    def _releasekey(self, key: Optional[int],
+                    res: Optional[requests.Response]):
+        # res 는 transport 가 예외를 던졌으면 None 입니다.
+        pass
+
+    def _send(self, url: str, key: Optional[int]) -> requests.Response:
+        return self.transport.get(url, headers=self._makeapiheader(),
+                                  timeout=self.timeout)
+
+    def _retrydelay(self, key: Optional[int], res: requests.Response,
+                    attempt: int) -> Optional[float]:
+        # 다시 보내기 전에 기다릴 시간(초), 다시 보내지 않으면 None
+        if attempt >= self.max_retries or not _shouldretry(res.status_code):
+            return None
+
+        delay = _backoff(attempt, self.backoff,
+                         res.headers.get('Retry-After'))
+        if self.ratelimiter is not None and res.status_code == 429:
+            self.ratelimiter.pause(delay)
+        return delay
+
     def _getresponse(self, url: str) -> requests.Response:
-        res = requests.get(url, headers=self._makeapiheader())
+        attempt = 0
 
-        self._errorstatuscode(res.status_code)
-        return res
+        while True:
+            key = self._choosekey()
+
+            hooks = self.hooks
+            if hooks:
+                started = time.perf_counter()
+
+            try:
+                res = self._send(url, key)
+            except BaseException:
+                self._releasekey(key, None)
+                if hooks:
+                    self._hookevent('request', key, {
+                        'endpoint': _endpoint(url, self.base_url),
+                        'url': url, 'status': None,
+                        'elapsed': time.perf_counter() - started,
+                        'size': 0, 'attempt': attempt})
+                raise
+            self._releasekey(key, res)
+
+            if hooks:
+                endpoint = _endpoint(url, self.base_url)
+                self._hookevent('request', key, {
+                    'endpoint': endpoint, 'url': url,
+                    'status': res.status_code,
+                    'elapsed': time.perf_counter() - started,
+                    'size': len(res.content), 'attempt': attempt})
+
+            delay = self._retrydelay(key, res, attempt)
+            if delay is not None:
+                if hooks:
+                    self._hookevent('retry', key, {
+                        'endpoint': endpoint, 'url': url,
+                        'status': res.status_code, 'delay': delay,
+                        'attempt': attempt})
+                res.close()
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self._errorstatuscode(res.status_code)
+            return res
+
+    def _fetchjson(self, url: str):
+        return self._decode(self._getresponse(url).content)
+
+    def _getjson(self, url: str):
+        if self.singleflight is None:
+            return self._fetchjson(url)
+
+        raw, shared = self.singleflight.do(url, lambda: self._fetchjson(url))
+        if shared:
+            self._emit('coalesced', {
+                'endpoint': _endpoint(url, self.base_url), 'url': url})
+        return raw
 
     def _errorstatuscode(self, code: int):
-        if code == 200:
-            return None
-        elif code == 400:
-            raise InvalidToken
-        elif code == 403:
-            raise ForbiddenToken
-        elif code == 404:
-            raise NotFound
-        elif code == 429:
-            raise TooManyRequest
-        else:
-            raise UnknownStatusCode(code)
+        _errorstatuscode(code)
+
+    def _emit(self, event: str, data: dict):
+        if self.hooks:
+            _emit(self.hooks, event, data)
+
+    def _hookevent(self, event: str, key: Optional[int], data: dict):
+        if key is not None:
+            data['key'] = key
+        _emit(self.hooks, event, data)
 
     def user(self, nickname: Optional[str] = None,
              accessid: Optional[str] = None) -> User:
@@ -122,29 +331,75 @@ class Api(object):
             return User(self, nickname, accessid)
 
     def _getIDbyNickname(self, nickname: str) -> str:
-        raw = self._getresponse(_API_URL + f'users/nickname/{nickname}').json()
+        if self.usercache is not None:
+            accessid = self.usercache.get(('id', nickname))
+            self._emit('cache', {'cache': 'user', 'hit': accessid is not None})
+            if accessid is not None:
+                return accessid
+
+        raw = self._getjson(self.base_url + f'users/nickname/{nickname}')
+        self._cacheuser(nickname, raw['accessId'])
         return raw['accessId']
 
     def _getNicknamebyID(self, accessid: str) -> str:
-        raw = self._getresponse(_API_URL + f'users/{accessid}').json()
+        if self.usercache is not None:
+            nickname = self.usercache.get(('name', accessid))
+            self._emit('cache', {'cache': 'user', 'hit': nickname is not None})
+            if nickname is not None:
+                return nickname
+
+        raw = self._getjson(self.base_url + f'users/{accessid}')
+        self._cacheuser(raw['name'], accessid)
         return raw['name']
 
+    def _cacheuser(self, nickname: str, accessid: str):
+        if self.usercache is not None:
+            self.usercache.set(('id', nickname), accessid)
+            self.usercache.set(('name', accessid), nickname)
+
+    def invalidate_user(self, nickname: Optional[str] = None,
+                        accessid: Optional[str] = None):
+        """저장된 닉네임, accessid 변환 결과를 지웁니다.
+
+        닉네임이 바뀐 유저를 다시 조회해야 할때 사용합니다.
+        둘 다 입력하지 않으면 모든 변환 결과를 지웁니다.
+
+        :param nickname: 지울 닉네임
+        :param accessid: 지울 accessid
+        """
+        cache = self.usercache
+        if cache is None:
+            return
+
+        if nickname is None and accessid is None:
+            cache.clear()
+            return
+
+        if nickname is not None:
+            cached = cache.invalidate(('id', nickname))
+            if cached is not None:
+                cache.invalidate(('name', cached))
+        if accessid is not None:
+            cached = cache.invalidate(('name', accessid))
+            if cached is not None:
+                cache.invalidate(('id', cached))
+
     def _getMatchlist(self, accessid: str, start_date: str = "",
                       end_date: str = "", offset: int = 0, limit: int = 10,
                       match_types: str = "") -> dict:
-        url = _API_URL + (
-            f'users/{accessid}/matches?'
-            f'start_date={start_date}&end_date={end_date}'
-            f'&offset={offset}&limit={limit}&match_types={match_types}')
+        url = _matchlisturl(accessid, start_date, end_date, offset, limit,
+                            match_types, self.base_url)
 
-        raw = self._getresponse(url).json()
+        raw = self._getjson(url)
         return raw
 
     def getUserMatches(self, id: Union[str, User], start_date: dtstr = "",
                        end_date: dtstr = "", offset: int = 0,
                        limit: int = 10,
                        match_types:
-                       Union[List[str], str] = "") -> MatchResponse:
+                       Union[List[str], str] = "",
+                       prefetch: bool = False,
+                       lazy: bool = False) -> MatchResponse:
         """유저의 매치 데이터를 받아옵니다.
         Api.user(...).getMatches(...) 로도 사용할 수도 있습니다.
 
@@ -154,6 +409,8 @@ class Api(object):
         :param offset: 조회 오프셋
         :param limit: 조회 수 (최대 500건)
         :param match_types: 매치 타입 이름이나 ID (리스트 또는 단일 문자열)
+        :param prefetch: True 면 각 매치의 상세 정보를 동시에 미리 받아옵니다.
+        :param lazy: True 면 매치 정보를 호출할때 변환합니다.
 
         :raises InvalidToken: 잘못된 Token이나 파라미터 입력
         :raises ForbiddenToken: 허용되지 않은 AccessToken 사용
@@ -173,11 +430,99 @@ class Api(object):
         raw = self._getMatchlist(
             id, start_date, end_date, offset, limit, match_type_ids)
 
-        return MatchResponse(self, raw['nickName'], raw['matches'])
+        mr = MatchResponse(self, raw['nickName'], raw['matches'], lazy)
+
+        if prefetch:
+            self.prefetch_details(m.detail for m in mr.mergevalues())
+
+        return mr
+
+    def getUsersMatches(self, users: Iterable[Union[str, User]],
+                        start_date: dtstr = "", end_date: dtstr = "",
+                        offset: int = 0, limit: int = 10,
+                        match_types: Union[List[str], str] = "",
+                        lazy: bool = False, accessid: bool = False,
+                        max_workers: int = 8) -> UsersMatches:
+        """여러 유저의 매치 데이터를 동시에 받아옵니다.
+
+        닉네임은 accessid 로 변환한 뒤(저장된 변환 결과가 있으면 재사용)
+        매치 목록을 요청하며, 유저마다의 두 요청은 최대 max_workers 개의
+        스레드로 동시에 보내지고 rate_limit 이 설정되어 있다면 그 제한을
+        함께 따릅니다. 한 유저의 요청이 실패해도 나머지 유저는 계속
+        받아오고, 실패한 유저의 예외는 :attr:`.UsersMatches.errors` 에
+        저장됩니다.
+
+        >>> res = api.getUsersMatches(['닉네임1', '닉네임2'], limit=20)
+        >>> for nickname, mr in res.items():
+        ...     print(nickname, sum(len(v) for v in mr.values()))
+
+        :param users: 닉네임(accessid 가 True 면 accessid) 혹은 User
+            클래스들, User 는 accessid 를 키로 사용합니다. (accessid 를
+            변환하지 못한 User 의 예외는 닉네임을 키로 저장됩니다)
+        :param start_date: 조회 시작 날짜(UTC)
+        :param end_date: 조회 끝 날짜(UTC)
+        :param offset: 조회 오프셋
+        :param limit: 조회 수 (최대 500건)
+        :param match_types: 매치 타입 이름이나 ID (리스트 또는 단일 문자열)
+        :param lazy: True 면 매치 정보를 호출할때 변환합니다.
+        :param accessid: True 면 users 의 문자열을 accessid 로 사용합니다.
+        :param max_workers: 동시에 보낼 최대 요청 수
+
+        :rtype: UsersMatches
+        """
+        start_date, end_date = utils._convStEt(start_date, end_date)
+        match_types = utils._convMt(match_types)
+
+        def fetch(user, isid):
+            if type(user) is User:
+                user = user.accessid
+            elif not isid:
+                user = self._getIDbyNickname(user)
+
+            raw = self._getMatchlist(user, start_date, end_date, offset,
+                                     limit, match_types)
+            return MatchResponse(self, raw['nickName'], raw['matches'], lazy)
+
+        # 입력한 키 → (유저, accessid 인지 여부)
+        # User 의 accessid 변환도 스레드 풀에서 하므로 아직 모르면
+        # 닉네임을 키로 둡니다.
+        targets = {}
+        for user in users:
+            if type(user) is User:
+                targets.setdefault(user._accessid or user._name, (user, True))
+            else:
+                targets.setdefault(user, (user, accessid))
+
+        result = UsersMatches()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {key: executor.submit(fetch, *target)
+                       for key, target in targets.items()}
+
+            for key, future in futures.items():
+                try:
+                    mr = future.result()
+                except Exception as e:
+                    result.errors[_userskey(key, targets[key][0])] = e
+                else:
+                    result.setdefault(_userskey(key, targets[key][0]), mr)
+
+        return result
+
+    def _getAllMatchlist(self, start_date: str = "", end_date: str = "",
+                         offset: int = 0, limit: int = 10,
+                         match_types: str = "") -> dict:
+        url = _allmatchesurl(start_date, end_date, offset, limit, match_types,
+                             self.base_url)
+
+        raw = self._getjson(url)
+        return raw
 
     def getAllMatches(self, start_date: dtstr = "", end_date: dtstr = "",
                       offset: int = 0, limit: int = 10,
-                      match_types: Union[List[str], str] = "") -> AllMatches:
+                      match_types: Union[List[str], str] = "",
+                      prefetch: bool = False,
+                      lazy: bool = False) -> AllMatches:
         """모든 유저의 매치 데이터를 받아옵니다.
 
         :param start_date: 조회 시작 날짜(UTC)
@@ -185,6 +530,8 @@ class Api(object):
         :param offset: 조회 오프셋
         :param limit: 조회 수 (최대 500건)
         :param match_types: 매치 타입 이름이나 ID (리스트 또는 단일 문자열)
+        :param prefetch: True 면 각 매치의 상세 정보를 동시에 미리 받아옵니다.
+        :param lazy: True 면 매치 정보를 호출할때 변환합니다.
 
         :raises InvalidToken: 잘못된 Token이나 파라미터 입력
         :raises ForbiddenToken: 허용되지 않은 AccessToken 사용
@@ -197,17 +544,177 @@ class Api(object):
         """
         start_date, end_date = utils._convStEt(start_date, end_date)
         match_types = utils._convMt(match_types)
-        url = _API_URL + (
-            f'matches/all?start_date={start_date}'
-            f'&end_date={end_date}&offset={offset}'
-            f'&limit={limit}&match_types={match_types}'
-        )
 
-        raw = self._getresponse(url).json()
+        raw = self._getAllMatchlist(start_date, end_date, offset, limit,
+                                    match_types)
+
+        am = AllMatches(self, lazy, **raw)
 
-        return AllMatches(self, **raw)
+        if prefetch:
+            self.prefetch_details(am.mergevalues())
+
+        return am
+
+    def prefetch_details(self, details: Iterable[MatchDetail],
+                         max_workers: int = 8):
+        """여러 :class:`.MatchDetail` 의 상세 정보를 동시에 받아옵니다.
+
+        같은 매치 ID는 한번만 요청하고, 이미 받아온 매치는 건너뜁니다.
+        요청은 최대 max_workers 개의 스레드로 동시에 보내지며,
+        rate_limit 이 설정되어 있다면 그 제한을 따릅니다.
+
+        >>> all = api.getAllMatches(limit=100)
+        >>> api.prefetch_details(all.mergevalues())
+
+        :param details: 상세 정보를 받아올 MatchDetail 들
+        :param max_workers: 동시에 보낼 최대 요청 수
+        :raises InvalidToken: 잘못된 Token이나 파라미터 입력
+        :raises ForbiddenToken: 허용되지 않은 AccessToken 사용
+        :raises NotFound: 존재하지 않는 리소스
+        :raises TooManyRequest: AccessToken의 요청 허용량 초과
+        :raises UnknownStatusCode: 알 수 없는 오류
+        """
+        pending = {}
+
+        for detail in details:
+            if not detail._cachedetail:
+                pending.setdefault(detail.matchid, []).append(detail)
+
+        if not pending:
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self._getMatchDetails, matchid):
+                       matchid for matchid in pending}
+            done, notdone = wait(futures, return_when=FIRST_EXCEPTION)
+
+            for future in notdone:
+                future.cancel()
+
+            for future in done:
+                if future.exception() is not None:
+                    raise future.exception()
+
+                for detail in pending[futures[future]]:
+                    if not detail._cachedetail:
+                        detail._setdetail(future.result())
+
+    def iter_user_matches(self, id: Union[str, User],
+                          start_date: dtstr = "", end_date: dtstr = "",
+                          match_types: Union[List[str], str] = "",
+                          page_size: int = 500) -> Iterator[MatchInfo]:
+        """유저의 매치 데이터를 페이지 단위로 받아오며 하나씩 순회합니다.
+
+        다음 페이지는 현재 페이지를 순회하는 동안 미리 받아오고,
+        한번에 두 페이지 이상을 메모리에 두지 않습니다.
+
+        >>> for match in api.iter_user_matches(accessid, start, end):
+        ...     print(match.track, match.player.matchrank)
+
+        :param id: 유저의 accessid 혹은 User 클래스
+        :param start_date: 조회 시작 날짜(UTC)
+        :param end_date: 조회 끝 날짜(UTC)
+        :param match_types: 매치 타입 이름이나 ID (리스트 또는 단일 문자열)
+        :param page_size: 한번에 요청할 매치 수 (최대 500건)
+
+        :raises InvalidToken: 잘못된 Token이나 파라미터 입력
+        :raises ForbiddenToken: 허용되지 않은 AccessToken 사용
+        :raises NotFound: 존재하지 않는 리소스
+        :raises TooManyRequest: AccessToken의 요청 허용량 초과
+        :raises UnknownStatusCode: 알 수 없는 오류
+
+        :rtype: Iterator[MatchInfo]
+        """
+        if type(id) is User:
+            id = id.accessid
+
+        start_date, end_date = utils._convStEt(start_date, end_date)
+        match_types = utils._convMt(match_types)
+
+        def fetch(offset):
+            return self._getMatchlist(id, start_date, end_date, offset,
+                                      page_size, match_types)['matches']
+
+        for match in self._iterpages(fetch, page_size):
+            yield MatchInfo(self, **match)
+
+    def iter_all_matches(self, start_date: dtstr = "", end_date: dtstr = "",
+                         match_types: Union[List[str], str] = "",
+                         page_size: int = 500) -> Iterator[MatchDetail]:
+        """모든 유저의 매치 데이터를 페이지 단위로 받아오며 하나씩 순회합니다.
+
+        :meth:`iter_user_matches` 와 같이 다음 페이지를 미리 받아옵니다.
+
+        :param start_date: 조회 시작 날짜(UTC)
+        :param end_date: 조회 끝 날짜(UTC)
+        :param match_types: 매치 타입 이름이나 ID (리스트 또는 단일 문자열)
+        :param page_size: 한번에 요청할 매치 수 (최대 500건)
+
+        :raises InvalidToken: 잘못된 Token이나 파라미터 입력
+        :raises ForbiddenToken: 허용되지 않은 AccessToken 사용
+        :raises NotFound: 존재하지 않는 리소스
+        :raises TooManyRequest: AccessToken의 요청 허용량 초과
+        :raises UnknownStatusCode: 알 수 없는 오류
+
+        :rtype: Iterator[MatchDetail]
+        """
+        start_date, end_date = utils._convStEt(start_date, end_date)
+        match_types = utils._convMt(match_types)
+
+        def fetch(offset):
+            return self._getAllMatchlist(start_date, end_date, offset,
+                                         page_size, match_types)['matches']
+
+        for matchid in self._iterpages(fetch, page_size):
+            yield MatchDetail(self, matchid)
+
+    def _iterpages(self, fetch: Callable[[int], list],
+                   page_size: int) -> Iterator:
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(fetch, 0)
+        offset = 0
+
+        try:
+            while True:
+                page = future.result()
+                future = None
+                count = sum(len(group['matches']) for group in page)
+                offset += count
+
+                if count >= page_size:
+                    future = executor.submit(fetch, offset)
+
+                for group in page:
+                    yield from group['matches']
+
+                if future is None:
+                    return
+        finally:
+            if future is not None:
+                future.cancel()
+            executor.shutdown(wait=False)
 
     def _getMatchDetails(self, match_id: str) -> dict:
-        url = _API_URL + f'matches/{match_id}'
-        raw = self._getresponse(url).json()
+        if self.detail_cache is not None:
+            raw = self.detail_cache.get(match_id)
+            self._emit('cache', {'cache': 'detail', 'hit': raw is not None})
+            if raw is not None:
+                return raw
+
+        url = self.base_url + f'matches/{match_id}'
+        raw = self._getjson(url)
+
+        if self.detail_cache is not None:
+            self.detail_cache.set(match_id, raw)
         return raw
+
+    def download_meta(self, file_dir: str) -> bool:
+        """Api 의 세션으로 메타데이터를 다운로드 합니다.
+
+        :func:`KartRider.metadata.download_meta` 와 같습니다.
+
+        :param file_dir: 메타데이터가 들어갈 폴더 경로
+        :return: 메타데이터가 바뀌었으면 True, 바뀌지 않았으면 False
+        :rtype: bool
+        """
+        return metadata.download_meta(file_dir, self._session)
@@ -0,0 +1,351 @@
+import asyncio
+from typing import Iterable, List, Optional, Union
+
+from . import utils
+from .apiwrapper import (_API_URL, NotFound, _allmatchesurl,
+                         _errorstatuscode, _matchlisturl, _userskey,
+                         dtstr)
+from .cache import DetailCache
+from .match import AllMatches, MatchDetail, MatchResponse, UsersMatches
+from .ratelimit import RateLimiter, _backoff, _shouldretry
+from .user import User
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+
+class AsyncApi(object):
+    """asyncio 용 카트라이더 OpenAPI Wrapper 클래스입니다.
+
+    :class:`KartRider.Api` 와 같은 메소드를 코루틴으로 제공하고,
+    같은 :class:`.MatchResponse`, :class:`.AllMatches`,
+    :class:`.MatchDetail` 을 반환합니다. aiohttp 가 필요합니다.
+
+    >>> async with KartRider.AsyncApi(API_KEY) as api:
+    ...     all = await api.getAllMatches(limit=500)
+    ...     await api.prefetch_details(all.mergevalues())
+
+    .. note:: 이벤트 루프를 막지 않도록 MatchDetail 의 상세 정보와 User 의
+              닉네임, accessid 는 속성을 호출할때 자동으로 받아오지 않습니다.
+              :meth:`prefetch_details`, :meth:`load_detail`,
+              :meth:`getMatchDetail`, :meth:`user` 로 먼저 받아오세요.
+
+    :param accesstoken: 사용자의 API KEY 문자열
+    :param max_concurrency: 동시에 보낼 최대 요청 수
+    :param timeout: 요청 타임아웃(초)
+    :param session: 사용할 aiohttp.ClientSession, None 이면 새로 만듭니다.
+    :param rate_limit: 초당 요청 수 또는 공유할 :class:`.RateLimiter`
+    :param max_retries: 429, 5xx 응답을 재시도할 최대 횟수
+    :param backoff: 재시도 대기 시간의 기준(초)
+    :param detail_cache: 매치 상세 정보를 저장할 :class:`.DetailCache`
+    :param json_decoder: 응답을 디코딩할 JSON 디코더
+    :param base_url: API 의 기본 URL
+    """
+
+    def __init__(self, accesstoken: str, max_concurrency: int = 32,
+                 timeout: Optional[float] = 10, session=None,
+                 rate_limit: Union[float, RateLimiter, None] = None,
+                 max_retries: int = 3, backoff: float = 0.5,
+                 detail_cache: Optional[DetailCache] = None,
+                 json_decoder: utils.JsonDecoder = 'auto',
+                 base_url: str = _API_URL):
+        if aiohttp is None:
+            raise ImportError('AsyncApi 를 사용하려면 aiohttp 가 필요합니다.')
+
+        self.accesstoken = accesstoken
+        self.base_url = base_url.rstrip('/') + '/'
+        self._decode = utils._jsondecoder(json_decoder)
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.detail_cache = detail_cache
+
+        if rate_limit is not None and not isinstance(rate_limit,
+                                                     RateLimiter):
+            rate_limit = RateLimiter(rate_limit)
+        self.ratelimiter = rate_limit
+
+        self._session = session
+        self._ownsession = session is None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """직접 만든 세션이 유지하고 있는 연결을 모두 닫습니다.
+        """
+        if self._ownsession and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _makeapiheader(self):
+        return {'Authorization': self.accesstoken}
+
+    def _getsession(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _getjson(self, url: str):
+        session = self._getsession()
+
+        async with self._semaphore:
+            attempt = 0
+
+            while True:
+                if self.ratelimiter is not None:
+                    await asyncio.sleep(self.ratelimiter.reserve())
+
+                async with session.get(
+                        url, headers=self._makeapiheader()) as res:
+                    retry = _shouldretry(res.status)
+                    if attempt < self.max_retries and retry:
+                        delay = _backoff(attempt, self.backoff,
+                                         res.headers.get('Retry-After'))
+                    else:
+                        _errorstatuscode(res.status)
+                        return self._decode(await res.read())
+
+                if self.ratelimiter is not None and res.status == 429:
+                    self.ratelimiter.pause(delay)
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def user(self, nickname: Optional[str] = None,
+                   accessid: Optional[str] = None) -> User:
+        """유저의 닉네임과 ID 클래스를 생성합니다.
+
+        :meth:`KartRider.Api.user` 와 같습니다.
+
+        :rtype: User
+        """
+        if nickname is None and accessid is None:
+            raise ValueError('파라미터를 입력하지 않았습니다.')
+
+        elif nickname is not None and accessid is not None:
+            try:
+                vnick = await self._agetNicknamebyID(accessid)
+            except NotFound:
+                vnick = None
+
+            if vnick != nickname:
+                raise ValueError('닉네임과 ID가 일치하지 않습니다.')
+            else:
+                return User(self, vnick, accessid)
+
+        else:
+            if nickname is None:
+                nickname = await self._agetNicknamebyID(accessid)
+            else:
+                accessid = await self._agetIDbyNickname(nickname)
+            return User(self, nickname, accessid)
+
+    async def _agetIDbyNickname(self, nickname: str) -> str:
+        raw = await self._getjson(
+            self.base_url + f'users/nickname/{nickname}')
+        return raw['accessId']
+
+    async def _agetNicknamebyID(self, accessid: str) -> str:
+        raw = await self._getjson(self.base_url + f'users/{accessid}')
+        return raw['name']
+
+    def _getIDbyNickname(self, nickname: str) -> str:
+        raise RuntimeError('AsyncApi 의 User 는 await AsyncApi.user(...) 로 '
+                           '만들어야 합니다.')
+
+    _getNicknamebyID = _getIDbyNickname
+
+    async def _useraccessid(self, user: User) -> str:
+        if user._accessid is None:
+            user._accessid = await self._agetIDbyNickname(user._name)
+        return user._accessid
+
+    async def getUserMatches(self, id: Union[str, User],
+                             start_date: dtstr = "", end_date: dtstr = "",
+                             offset: int = 0, limit: int = 10,
+                             match_types: Union[List[str], str] = "",
+                             prefetch: bool = False,
+                             lazy: bool = False) -> MatchResponse:
+        """유저의 매치 데이터를 받아옵니다.
+
+        :meth:`KartRider.Api.getUserMatches` 와 같습니다.
+
+        :rtype: MatchResponse
+        """
+        if type(id) is User:
+            id = await self._useraccessid(id)
+
+        start_date, end_date = utils._convStEt(start_date, end_date)
+        match_type_ids = utils._convMt(match_types)
+
+        raw = await self._getjson(_matchlisturl(
+            id, start_date, end_date, offset, limit, match_type_ids,
+            self.base_url))
+
+        mr = MatchResponse(self, raw['nickName'], raw['matches'], lazy)
+
+        if prefetch:
+            await self.prefetch_details(m.detail for m in mr.mergevalues())
+
+        return mr
+
+    async def getUsersMatches(self, users: Iterable[Union[str, User]],
+                              start_date: dtstr = "", end_date: dtstr = "",
+                              offset: int = 0, limit: int = 10,
+                              match_types: Union[List[str], str] = "",
+                              lazy: bool = False,
+                              accessid: bool = False) -> UsersMatches:
+        """여러 유저의 매치 데이터를 동시에 받아옵니다.
+
+        :meth:`KartRider.Api.getUsersMatches` 와 같습니다.
+
+        :rtype: UsersMatches
+        """
+        start_date, end_date = utils._convStEt(start_date, end_date)
+        match_types = utils._convMt(match_types)
+
+        async def fetch(user, isid):
+            if type(user) is User:
+                user = await self._useraccessid(user)
+            elif not isid:
+                user = await self._agetIDbyNickname(user)
+
+            raw = await self._getjson(_matchlisturl(
+                user, start_date, end_date, offset, limit, match_types,
+                self.base_url))
+            return MatchResponse(self, raw['nickName'], raw['matches'], lazy)
+
+        # 입력한 키 → (유저, accessid 인지 여부)
+        # User 의 accessid 변환도 동시에 하므로 아직 모르면 닉네임을
+        # 키로 둡니다.
+        targets = {}
+        for user in users:
+            if type(user) is User:
+                targets.setdefault(user._accessid or user._name, (user, True))
+            else:
+                targets.setdefault(user, (user, accessid))
+        results = await asyncio.gather(
+            *(fetch(*target) for target in targets.values()),
+            return_exceptions=True)
+
+        result = UsersMatches()
+        for (key, (user, _)), res in zip(targets.items(), results):
+            key = _userskey(key, user)
+            if isinstance(res, BaseException):
+                # 취소(3.7 이하에서는 CancelledError 도 Exception 입니다)나
+                # KeyboardInterrupt 는 유저의 결과가 아니므로 전달합니다.
+                cancelled = isinstance(res, asyncio.CancelledError)
+                if cancelled or not isinstance(res, Exception):
+                    raise res
+                result.errors[key] = res
+            else:
+                result.setdefault(key, res)
+
+        return result
+
+    async def getAllMatches(self, start_date: dtstr = "",
+                            end_date: dtstr = "", offset: int = 0,
+                            limit: int = 10,
+                            match_types: Union[List[str], str] = "",
+                            prefetch: bool = False,
+                            lazy: bool = False) -> AllMatches:
+        """모든 유저의 매치 데이터를 받아옵니다.
+
+        :meth:`KartRider.Api.getAllMatches` 와 같습니다.
+
+        :rtype: AllMatches
+        """
+        start_date, end_date = utils._convStEt(start_date, end_date)
+        match_types = utils._convMt(match_types)
+
+        raw = await self._getjson(_allmatchesurl(
+            start_date, end_date, offset, limit, match_types, self.base_url))
+
+        am = AllMatches(self, lazy, **raw)
+
+        if prefetch:
+            await self.prefetch_details(am.mergevalues())
+
+        return am
+
+    async def getMatchDetail(self, match_id: str) -> MatchDetail:
+        """상세 정보를 받아온 :class:`.MatchDetail` 을 반환합니다.
+
+        :param match_id: 매치 ID
+        :rtype: MatchDetail
+        """
+        detail = MatchDetail(self, match_id)
+        detail._setdetail(await self._agetMatchDetails(match_id))
+        return detail
+
+    async def load_detail(self, detail: MatchDetail) -> MatchDetail:
+        """detail 의 상세 정보를 아직 받아오지 않았다면 받아오고 detail 을
+        반환합니다.
+
+        >>> am = await api.getAllMatches(limit=10)
+        >>> detail = await api.load_detail(next(am.mergevalues()))
+
+        :param detail: 상세 정보를 받아올 MatchDetail
+        :rtype: MatchDetail
+        """
+        await self.prefetch_details([detail])
+        return detail
+
+    async def prefetch_details(self, details: Iterable[MatchDetail]):
+        """여러 :class:`.MatchDetail` 의 상세 정보를 동시에 받아옵니다.
+
+        같은 매치 ID는 한번만 요청하고, 이미 받아온 매치는 건너뜁니다.
+        동시에 보내지는 요청은 max_concurrency 개로 제한됩니다.
+
+        :param details: 상세 정보를 받아올 MatchDetail 들
+        """
+        pending = {}
+
+        for detail in details:
+            if not detail._cachedetail:
+                pending.setdefault(detail.matchid, []).append(detail)
+
+        if not pending:
+            return
+
+        matchids = list(pending)
+        raws = await asyncio.gather(
+            *(self._agetMatchDetails(matchid) for matchid in matchids))
+
+        for matchid, raw in zip(matchids, raws):
+            for detail in pending[matchid]:
+                if not detail._cachedetail:
+                    detail._setdetail(raw)
+
+    async def _agetMatchDetails(self, match_id: str) -> dict:
+        # DetailCache 는 sqlite 를 쓰므로 이벤트 루프를 막지 않도록
+        # 스레드 풀에서 실행합니다.
+        cache = self.detail_cache
+        if cache is not None:
+            loop = asyncio.get_event_loop()
+            raw = await loop.run_in_executor(None, cache.get, match_id)
+            if raw is not None:
+                return raw
+
+        raw = await self._getjson(self.base_url + f'matches/{match_id}')
+
+        if cache is not None:
+            await loop.run_in_executor(None, cache.set, match_id, raw)
+        return raw
+
+    def _getMatchDetails(self, match_id: str) -> dict:
+        raise RuntimeError('AsyncApi 의 매치 상세 정보는 '
+                           'await AsyncApi.prefetch_details(...) 로 '
+                           '먼저 받아와야 합니다.')
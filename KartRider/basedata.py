@@ -1,34 +1,24 @@
-from typing import Iterator, Mapping, TypeVar
+from typing import Callable, Iterator, Mapping, Sequence, TypeVar
 
 
 class _BaseData(object):
-    def __init__(self, api, intattrs=None, ignoreattrs=None,
-                 changenameattrs=None, **kwargs):
+    # 필드가 정해진 하위 클래스는 __slots__ 를 선언해 인스턴스마다
+    # __dict__ 를 만들지 않고, 응답 JSON 은 :class:`.Schema` 로 옮깁니다.
+    __slots__ = ()
+
+    def __init__(self, api):
         self._api = api
 
-        if len(kwargs) != 0:
-
-            if intattrs is None:
-                intattrs = []
-            if ignoreattrs is None:
-                ignoreattrs = []
-            if changenameattrs is None:
-                changenameattrs = {}
-
-            for k, v in kwargs.items():
-                k = k.lower()
-                if k in ignoreattrs:
-                    continue
-                elif k in intattrs:
-                    if v == '':
-                        v = 0
-                    setattr(self, k, int(v))
-                elif k in changenameattrs:
-                    setattr(self, changenameattrs[k], v)
-                else:
-                    if v.strip() == "":
-                        v = None
-                    setattr(self, k, v)
+    @classmethod
+    def _fromraw(cls, api, raw: dict):
+        """응답 JSON 객체 하나를 cls 의 스키마로 바로 변환합니다.
+
+        __init__ 의 키워드 인자로 raw 를 복사하지 않습니다.
+        """
+        obj = cls.__new__(cls)
+        obj._api = api
+        cls._schema.apply(obj, raw, api)
+        return obj
 
 
 T = TypeVar('T')
@@ -50,3 +40,47 @@ class MergeAbleDict(dict, Mapping[str, T]):
         """
         for v in self.values():
             yield from v
+
+
+class LazyList(Sequence[T]):
+    """응답 JSON 의 리스트를 그대로 감싸고, 항목을 호출할때 처음 한번만
+    변환하는 읽기 전용 리스트입니다.
+
+    len() 이나 :attr:`raw` 는 항목을 변환하지 않습니다.
+
+    :param raw: 응답 JSON 의 리스트
+    :param factory: 응답 항목 하나를 받아 객체를 만드는 함수
+    """
+    __slots__ = ('_raw', '_factory', '_items')
+
+    def __init__(self, raw: list, factory: Callable[..., T]):
+        self._raw = raw
+        self._factory = factory
+        self._items = None
+
+    @property
+    def raw(self) -> list:
+        """변환하지 않은 응답 JSON 의 리스트"""
+        return self._raw
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self._raw)))]
+
+        if self._items is None:
+            self._items = [None] * len(self._raw)
+
+        item = self._items[i]
+        if item is None:
+            item = self._items[i] = self._factory(self._raw[i])
+        return item
+
+    def __iter__(self):
+        for i in range(len(self._raw)):
+            yield self[i]
+
+    def __repr__(self):
+        return f'{type(self).__name__}({len(self._raw)} items)'
@@ -0,0 +1,311 @@
+import copy
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from .utils import JsonDecoder, _jsondecoder
+
+
+class DetailCache(object):
+    """매치 상세 정보(/matches/{matchId})를 저장하는 sqlite 디스크 캐시입니다.
+
+    끝난 매치의 상세 정보는 바뀌지 않으므로, 한번 받아온 정보를 압축해
+    저장해 두고 다음 실행부터는 네트워크 요청 없이 사용합니다.
+    저장된 크기가 max_size 를 넘으면 가장 오래 사용하지 않은 매치부터
+    지웁니다. 읽기마다 쓰기가 생기지 않도록 사용 시각은 메모리에 모아
+    두었다가 저장, 지우기, 닫기 때나 flush_every 개가 쌓였을때 한번에
+    기록합니다.
+
+    >>> cache = KartRider.DetailCache('details.sqlite3')
+    >>> api = KartRider.Api(API_KEY, detail_cache=cache)
+
+    :param path: sqlite 데이터베이스 파일 경로
+    :param max_size: 저장할 압축 데이터의 최대 크기(바이트), None 이면 무제한
+    :param json_decoder: 저장된 데이터를 읽을때 사용할 JSON 디코더
+    :param flush_every: 이만큼 사용 시각이 쌓이면 바로 기록합니다.
+    """
+
+    def __init__(self, path: str, max_size: Optional[int] = 512 * 2 ** 20,
+                 json_decoder: JsonDecoder = 'auto',
+                 flush_every: int = 1024):
+        self.path = path
+        self.max_size = max_size
+        self.flush_every = flush_every
+        self._accessed = {}
+        self._decode = _jsondecoder(json_decoder)
+        self.hits = 0  #: 캐시에서 찾은 횟수
+        self.misses = 0  #: 캐시에 없었던 횟수
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS details ('
+            'matchid TEXT PRIMARY KEY, data BLOB NOT NULL, '
+            'size INTEGER NOT NULL, accessed REAL NOT NULL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS details_accessed '
+                           'ON details (accessed)')
+        self._conn.commit()
+        self._size = self._conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM details').fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM details').fetchone()[0]
+
+    def __contains__(self, matchid):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT 1 FROM details WHERE matchid = ?',
+                (matchid,)).fetchone() is not None
+
+    @property
+    def size(self) -> int:
+        """저장된 압축 데이터의 크기(바이트)"""
+        return self._size
+
+    def stats(self) -> dict:
+        """hits, misses, size, count 를 담은 dict를 반환합니다.
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': self._size, 'count': len(self)}
+
+    def get(self, matchid: str) -> Optional[dict]:
+        """저장된 상세 정보를 반환합니다. 없으면 None 을 반환합니다.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM details WHERE matchid = ?',
+                (matchid,)).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._accessed[matchid] = time.time()
+            if len(self._accessed) >= self.flush_every:
+                self._flush()
+                self._conn.commit()
+
+        return self._decode(zlib.decompress(row[0]))
+
+    def _flush(self):
+        if self._accessed:
+            self._conn.executemany(
+                'UPDATE details SET accessed = ? WHERE matchid = ?',
+                [(t, m) for m, t in self._accessed.items()])
+            self._accessed.clear()
+
+    def flush(self):
+        """모아 둔 사용 시각을 기록합니다.
+        """
+        with self._lock:
+            self._flush()
+            self._conn.commit()
+
+    def set(self, matchid: str, raw: dict):
+        """상세 정보를 저장합니다.
+        """
+        data = zlib.compress(
+            json.dumps(raw, ensure_ascii=False).encode('utf8'))
+
+        with self._lock:
+            old = self._conn.execute(
+                'SELECT size FROM details WHERE matchid = ?',
+                (matchid,)).fetchone()
+            if old is not None:
+                self._size -= old[0]
+
+            self._accessed.pop(matchid, None)
+            self._conn.execute(
+                'INSERT OR REPLACE INTO details VALUES (?, ?, ?, ?)',
+                (matchid, data, len(data), time.time()))
+            self._size += len(data)
+
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        if self.max_size is None or self._size <= self.max_size:
+            return
+
+        self._flush()
+        while self._size > self.max_size:
+            rows = self._conn.execute(
+                'SELECT matchid, size FROM details '
+                'ORDER BY accessed LIMIT 64').fetchall()
+            if not rows:
+                break
+
+            for matchid, size in rows:
+                if self._size <= self.max_size:
+                    break
+                self._conn.execute('DELETE FROM details WHERE matchid = ?',
+                                   (matchid,))
+                self._size -= size
+
+    def clear(self):
+        """저장된 모든 상세 정보를 지웁니다.
+        """
+        with self._lock:
+            self._accessed.clear()
+            self._conn.execute('DELETE FROM details')
+            self._conn.commit()
+            self._size = 0
+
+    def close(self):
+        """모아 둔 사용 시각을 기록하고 데이터베이스 연결을 닫습니다.
+        """
+        with self._lock:
+            self._flush()
+            self._conn.commit()
+            self._conn.close()
+
+
+class TTLCache(object):
+    """유효 시간(TTL)이 있는 스레드 안전한 LRU 캐시입니다.
+
+    :class:`KartRider.Api` 가 닉네임과 accessid 를 변환한 결과를 저장하는데
+    사용하며, 그 Api 로 만든 모든 :class:`.User` 가 공유합니다.
+
+    :param maxsize: 저장할 최대 항목 수
+    :param ttl: 항목의 유효 시간(초)
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0  #: 캐시에서 찾은 횟수
+        self.misses = 0  #: 캐시에 없었거나 만료된 횟수
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """hits, misses, count 를 담은 dict를 반환합니다.
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+                'count': len(self._data)}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """저장된 값을 반환합니다. 없거나 만료됐으면 None 을 반환합니다.
+        """
+        with self._lock:
+            item = self._data.get(key)
+
+            if item is None or item[1] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key: Hashable, value: Any):
+        """값을 저장합니다. maxsize 를 넘으면 가장 오래 쓰지 않은 항목을
+        지웁니다.
+        """
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> Optional[Any]:
+        """key 에 저장된 값을 지우고, 지운 값을 반환합니다.
+        """
+        with self._lock:
+            item = self._data.pop(key, None)
+        return None if item is None else item[0]
+
+    def clear(self):
+        """저장된 모든 값을 지웁니다.
+        """
+        with self._lock:
+            self._data.clear()
+
+
+class _Call(object):
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _copyerror(error: BaseException) -> BaseException:
+    try:
+        copied = copy.copy(error)
+    except Exception:
+        # 인자로 다시 만들 수 없는 예외는 그대로 던집니다.
+        return error
+    copied.__cause__ = error
+    return copied
+
+
+class SingleFlight(object):
+    """같은 키로 동시에 들어온 호출을 하나로 합칩니다.
+
+    먼저 들어온 호출 하나만 함수를 실행하고, 그 사이에 같은 키로 들어온
+    호출들은 끝나기를 기다렸다가 같은 결과를 받습니다. 예외는 호출마다
+    복사본을 받으며 원래 예외는 ``__cause__`` 에 남습니다.
+    끝난 결과는 저장하지 않으므로 다음 호출은 다시 실행됩니다.
+
+    :class:`KartRider.Api` 가 같은 URL 요청을 합치는데 사용합니다.
+    """
+
+    def __init__(self):
+        self.shared = 0  #: 다른 호출의 결과를 받은 횟수
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """실행 중인 키의 수"""
+        return len(self._calls)
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """key 로 실행 중인 호출이 있으면 그 결과를, 없으면 func() 를
+        실행한 결과를 반환합니다.
+
+        :return: (결과, 다른 호출의 결과를 받았는지 여부)
+        :rtype: tuple
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                # 같은 예외 객체를 여러 스레드에서 던지면 __traceback__ 이
+                # 서로 덮어써지므로 기다린 호출마다 복사본을 던집니다.
+                raise _copyerror(call.error)
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
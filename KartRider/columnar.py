@@ -0,0 +1,211 @@
+"""매치 데이터를 열(column) 단위로 변환합니다.
+
+:class:`.MatchResponse`, :class:`.AllMatches` 의 ``to_columns()``,
+``to_arrow()``, ``to_pandas()`` 가 사용합니다. 행마다 파이썬 객체를 만들지
+않고 응답 JSON 에서 바로 열 리스트를 만듭니다.
+
+``to_arrow`` 는 pyarrow, ``to_pandas`` 는 numpy 와 pandas 가 필요합니다.
+"""
+from typing import Dict, Iterable
+
+from .schema import integer, matchrank, matchretired, matchwin, text
+from .utils import _change_strs_todt64
+
+Columns = Dict[str, list]
+
+#: 사전(dictionary/categorical) 인코딩하는 ID 열
+CATEGORY_COLUMNS = ('matchtypeid', 'channelname', 'characterid', 'trackid',
+                    'kartid', 'petid', 'flyingpetid')
+
+#: datetime64 로 변환하는 시간 열 (UTC)
+TIME_COLUMNS = ('starttime', 'endtime')
+
+
+# (열 이름, 응답 JSON 키, 변환 함수)
+_PLAYER_FIELDS = (
+    ('accountno', 'accountNo', text),
+    ('charactername', 'characterName', text),
+    ('characterid', 'character', text),
+    ('kartid', 'kart', text),
+    ('petid', 'pet', text),
+    ('flyingpetid', 'flyingPet', text),
+    ('license', 'license', text),
+    ('rankinggrade2', 'rankinggrade2', text),
+    ('partsengine', 'partsEngine', text),
+    ('partshandle', 'partsHandle', text),
+    ('partswheel', 'partsWheel', text),
+    ('partskit', 'partsKit', text),
+    ('matchrank', 'matchRank', matchrank),
+    ('matchretired', 'matchRank', matchretired),
+    ('matchwin', 'matchWin', matchwin),
+    ('matchtime', 'matchTime', integer),
+)
+
+_MATCHINFO_FIELDS = (
+    ('matchid', 'matchId', text),
+    ('matchtypeid', 'matchType', text),
+    ('teamid', 'teamId', text),
+    ('channelname', 'channelName', text),
+    ('trackid', 'trackId', text),
+    ('playercount', 'playerCount', integer),
+    ('matchresult', 'matchResult', text),
+    ('starttime', 'startTime', text),
+    ('endtime', 'endTime', text),
+)
+
+_DETAIL_FIELDS = (
+    ('matchid', 'matchId', None),
+    ('matchtypeid', 'matchType', text),
+    ('channelname', 'channelName', text),
+    ('trackid', 'trackId', text),
+    ('gamespeed', 'gameSpeed', None),
+    ('playtime', 'playTime', None),
+    ('matchresult', 'matchResult', text),
+    ('starttime', 'startTime', text),
+    ('endtime', 'endTime', text),
+)
+
+_MATCHINFO_PLAYER_FIELDS = tuple(
+    f for f in _PLAYER_FIELDS if f[0] not in ('accountno', 'characterid'))
+
+
+def _empty(*fieldsets) -> Columns:
+    columns = {}
+    for fields in fieldsets:
+        for name, _, _ in fields:
+            columns[name] = []
+    return columns
+
+
+def _append(columns: Columns, fields, raw: dict):
+    for name, key, conv in fields:
+        v = raw.get(key)
+        columns[name].append(v if conv is None else conv(v))
+
+
+def matchlist_columns(matcheslist: list) -> Columns:
+    """유저 매치 목록 응답의 matches 를 매치 하나당 한 행인 열로 바꿉니다.
+    """
+    columns = _empty(_MATCHINFO_FIELDS, _MATCHINFO_PLAYER_FIELDS)
+    columns['accountno'] = []
+    columns['characterid'] = []
+
+    for group in matcheslist:
+        for match in group['matches']:
+            _append(columns, _MATCHINFO_FIELDS, match)
+            _append(columns, _MATCHINFO_PLAYER_FIELDS, match['player'])
+            columns['accountno'].append(text(match.get('accountNo')))
+            columns['characterid'].append(text(match.get('character')))
+
+    return columns
+
+
+def allmatches_columns(matcheslist: list) -> Columns:
+    """전체 매치 목록 응답의 matches 를 matchid, matchtypeid 열로 바꿉니다.
+    """
+    columns = {'matchid': [], 'matchtypeid': []}
+
+    for group in matcheslist:
+        matchids = group['matches']
+        columns['matchid'].extend(matchids)
+        columns['matchtypeid'].extend([group['matchType']] * len(matchids))
+
+    return columns
+
+
+def detail_columns(raws: Iterable[dict]) -> Columns:
+    """매치 상세 정보 응답들을 플레이어 하나당 한 행인 열로 바꿉니다.
+
+    팀전이 아니면 teamid 는 None 입니다.
+    """
+    columns = _empty(_DETAIL_FIELDS, _PLAYER_FIELDS)
+    columns['teamid'] = []
+
+    for raw in raws:
+        if 'teams' in raw:
+            teams = [(t['teamId'], t['players']) for t in raw['teams']]
+        else:
+            teams = [(None, raw.get('players', []))]
+
+        for teamid, players in teams:
+            for player in players:
+                _append(columns, _DETAIL_FIELDS, raw)
+                _append(columns, _PLAYER_FIELDS, player)
+                columns['teamid'].append(teamid)
+
+    return columns
+
+
+def details_to_columns(details: Iterable) -> Columns:
+    """:class:`.MatchDetail` 들을 플레이어 하나당 한 행인 열로 바꿉니다.
+
+    상세 정보를 받아오지 않은 MatchDetail 은 속성을 호출할때 받아오므로,
+    먼저 :meth:`KartRider.Api.prefetch_details` 를 호출하세요.
+    """
+    columns = _empty(_DETAIL_FIELDS, _PLAYER_FIELDS)
+    columns['teamid'] = []
+    detailattrs = [name for name, _, _ in _DETAIL_FIELDS]
+    playerattrs = [name for name, _, _ in _PLAYER_FIELDS]
+
+    for detail in details:
+        if detail.isteamgame:
+            teams = [(team.teamid, team) for team in detail.teams]
+        else:
+            teams = [(None, detail.players)]
+
+        for teamid, players in teams:
+            for player in players:
+                for name in detailattrs:
+                    v = getattr(detail, name)
+                    if name in TIME_COLUMNS and v is not None:
+                        v = v.isoformat()
+                    columns[name].append(v)
+                for name in playerattrs:
+                    columns[name].append(getattr(player, name, None))
+                columns['teamid'].append(teamid)
+
+    return columns
+
+
+def to_arrow(columns: Columns):
+    """열 dict 를 pyarrow.Table 로 바꿉니다.
+
+    ID 열은 dictionary 인코딩, 시간 열은 timestamp[ms] 로 변환합니다.
+
+    :rtype: pyarrow.Table
+    """
+    import pyarrow as pa
+
+    arrays = {}
+
+    for name, values in columns.items():
+        if name in TIME_COLUMNS:
+            arrays[name] = pa.array(_change_strs_todt64(values))
+        elif name in CATEGORY_COLUMNS:
+            arrays[name] = pa.array(values, pa.string()).dictionary_encode()
+        else:
+            arrays[name] = pa.array(values)
+
+    return pa.table(arrays)
+
+
+def to_pandas(columns: Columns):
+    """열 dict 를 pandas.DataFrame 으로 바꿉니다.
+
+    ID 열은 category, 시간 열은 datetime64[ms] 로 변환합니다.
+
+    :rtype: pandas.DataFrame
+    """
+    import pandas as pd
+
+    data = {}
+
+    for name, values in columns.items():
+        if name in TIME_COLUMNS:
+            data[name] = _change_strs_todt64(values)
+        elif name in CATEGORY_COLUMNS:
+            data[name] = pd.Categorical(values)
+        else:
+            data[name] = values
+
+    return pd.DataFrame(data)
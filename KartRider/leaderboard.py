@@ -0,0 +1,351 @@
+"""트랙별 기록 순위표와 기록 분포 인덱스입니다.
+
+:class:`TrackIndex` 는 (트랙, 매치 종류, 게임 속도) 마다 가장 빠른 K 개의
+기록과 전체 기록의 분포(:class:`LogSketch`)만 보관합니다. 매치 상세 정보를
+추가할때마다 갱신되므로 순위표와 백분위 조회에 저장된 매치를 다시 훑지
+않습니다.
+
+>>> index = TrackIndex(k=100)
+>>> index.add(details)  # MatchDetail 또는 상세 정보 응답 JSON
+>>> index.top('빌리지 고가의 질주', n=10)
+>>> index.percentile('빌리지 고가의 질주', 105000)  # 이 기록 이하의 비율
+"""
+import bisect
+import heapq
+import math
+from collections import namedtuple
+from typing import Iterable, List, Optional, Tuple
+
+from . import utils
+from .match import AllMatches, MatchDetail
+from .metadata import _getid
+
+#: 순위표의 기록 하나
+Record = namedtuple('Record', ['time', 'accountno', 'charactername',
+                               'kartid', 'matchid', 'endtime'])
+
+Key = Tuple[str, str, Optional[int]]
+
+
+class LogSketch(object):
+    """상대 오차가 alpha 이하인 스트리밍 분위수 스케치입니다.
+
+    값을 로그 간격의 구간으로 세기만 하므로 저장 크기는 값의 범위에만
+    비례하고, 같은 alpha 의 스케치는 구간별 수를 더해 합칠 수 있습니다.
+
+    :param alpha: 분위수 값의 최대 상대 오차
+    """
+    __slots__ = ('alpha', 'count', 'zeros', '_gamma', '_loggamma', '_bins',
+                 '_sorted')
+
+    def __init__(self, alpha: float = 0.01):
+        if not 0 < alpha < 1:
+            raise ValueError('alpha 는 0 과 1 사이여야 합니다.')
+
+        self.alpha = alpha
+        self.count = 0  #: 추가한 값의 수
+        self.zeros = 0  #: 0 이하인 값의 수
+        self._gamma = (1 + alpha) / (1 - alpha)
+        self._loggamma = math.log(self._gamma)
+        self._bins = {}
+        self._sorted = None
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._loggamma)
+
+    def _value(self, index: int) -> float:
+        # 구간 (gamma^(i-1), gamma^i] 의 대표값
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+    def add(self, value: float, count: int = 1):
+        """값을 count 번 추가합니다."""
+        self.count += count
+        if value <= 0:
+            self.zeros += count
+            return
+
+        i = self._index(value)
+        self._bins[i] = self._bins.get(i, 0) + count
+        self._sorted = None
+
+    def merge(self, other: 'LogSketch') -> 'LogSketch':
+        """같은 alpha 의 other 를 더하고 자신을 반환합니다."""
+        if other.alpha != self.alpha:
+            raise ValueError('alpha 가 다른 스케치는 합칠 수 없습니다.')
+
+        for i, n in other._bins.items():
+            self._bins[i] = self._bins.get(i, 0) + n
+        self.count += other.count
+        self.zeros += other.zeros
+        self._sorted = None
+        return self
+
+    def _cumulative(self) -> Tuple[List[int], List[int]]:
+        if self._sorted is None:
+            indexes = sorted(self._bins)
+            cumulative = []
+            total = self.zeros
+            for i in indexes:
+                total += self._bins[i]
+                cumulative.append(total)
+            self._sorted = (indexes, cumulative)
+        return self._sorted
+
+    def quantile(self, q: float) -> Optional[float]:
+        """q 분위수(0~1)의 근삿값을 반환합니다. 비어 있으면 None 입니다."""
+        if self.count == 0:
+            return None
+        if not 0 <= q <= 1:
+            raise ValueError('q 는 0 과 1 사이여야 합니다.')
+
+        rank = q * (self.count - 1)
+        if rank < self.zeros:
+            return 0.0
+
+        indexes, cumulative = self._cumulative()
+        pos = min(bisect.bisect_right(cumulative, rank), len(indexes) - 1)
+        return self._value(indexes[pos])
+
+    def rank(self, value: float) -> float:
+        """value 이하인 값의 비율(0~1)을 반환합니다."""
+        if self.count == 0:
+            return 0.0
+        if value <= 0:
+            return self.zeros / self.count
+
+        indexes, cumulative = self._cumulative()
+        pos = bisect.bisect_right(indexes, self._index(value))
+        below = cumulative[pos - 1] if pos else self.zeros
+        return below / self.count
+
+
+class _TrackEntry(object):
+    __slots__ = ('heap', 'sketch')
+
+    def __init__(self, alpha):
+        self.heap = []  # (-time, 순서, Record) 의 최대 힙
+        self.sketch = LogSketch(alpha)
+
+
+def _detailplayers(detail):
+    # (trackid, matchtypeid, gamespeed, matchid, endtime, players)
+    if isinstance(detail, MatchDetail):
+        # trackid 를 먼저 읽어 상세 정보를 받아오지 않았다면 받아옵니다.
+        trackid = detail.trackid
+        if detail.isteamgame:
+            players = [p for team in detail.teams for p in team]
+        else:
+            players = detail.players
+        rows = [(p.matchtime, p.matchretired, p.accountno, p.charactername,
+                 p.kartid) for p in players]
+        return (trackid, detail.matchtypeid, detail.gamespeed,
+                detail.matchid, detail.endtime, rows)
+
+    if 'teams' in detail:
+        players = [p for team in detail['teams'] for p in team['players']]
+    else:
+        players = detail.get('players', [])
+
+    rows = []
+    for p in players:
+        time = p.get('matchTime', '')
+        retired = p.get('matchRank') in ('99', '') or time == ''
+        rows.append((int(time) if time else 0, retired, p.get('accountNo'),
+                     p.get('characterName'), p.get('kart')))
+    endtime = detail.get('endTime')
+    if endtime:
+        endtime = utils._change_str_todt(endtime)
+    return (detail.get('trackId'), detail.get('matchType'),
+            detail.get('gameSpeed'), detail.get('matchId'), endtime, rows)
+
+
+def _toid(value: Optional[str], datatype: str) -> Optional[str]:
+    if value is None or utils._isId(value):
+        return value
+    return _getid(datatype, value)
+
+
+class TrackIndex(object):
+    """(트랙 ID, 매치 타입 ID, 게임 속도) 별 기록 순위표와 분포입니다.
+
+    리타이어했거나 기록이 없는 플레이는 제외합니다. dedupe 가 True 면 같은
+    매치 ID 는 한번만 추가됩니다.
+
+    순위표와 분포의 크기는 키 수에만 비례하지만 중복 검사를 위한 매치 ID
+    집합은 추가한 매치 수에 비례합니다(매치당 약 100 바이트). 매치 ID 가
+    겹치지 않는 데이터(예: :class:`.MatchSync` 가 새로 받은 매치)만
+    추가한다면 dedupe=False 로 이 메모리를 아낄 수 있습니다.
+
+    :param k: 키마다 보관할 가장 빠른 기록 수
+    :param alpha: 분위수 스케치의 상대 오차
+    :param dedupe: True 면 추가한 매치 ID 를 기억해 같은 매치를 건너뜁니다.
+    """
+
+    def __init__(self, k: int = 100, alpha: float = 0.01,
+                 dedupe: bool = True):
+        self.k = k
+        self.alpha = alpha
+        self._entries = {}
+        self._matchids = set() if dedupe else None
+        self._matches = 0
+        self._seq = 0
+
+    @property
+    def dedupe(self) -> bool:
+        """매치 ID 로 중복을 거르는지 여부"""
+        return self._matchids is not None
+
+    def __len__(self):
+        """추가한 매치 수"""
+        return self._matches
+
+    def keys(self) -> List[Key]:
+        """(트랙 ID, 매치 타입 ID, 게임 속도) 키 리스트를 반환합니다."""
+        return list(self._entries)
+
+    def add(self, details: Iterable) -> int:
+        """매치 상세 정보들을 추가합니다.
+
+        :param details: :class:`.AllMatches` 나 :class:`.MatchDetail` 또는
+            상세 정보 응답 JSON 들,
+            상세 정보를 받아오지 않은 MatchDetail 은 여기서 받아옵니다.
+        :return: 추가한 기록 수
+        :rtype: int
+        """
+        if isinstance(details, AllMatches):
+            details = details.mergevalues()
+        elif isinstance(details, (MatchDetail, dict)):
+            details = [details]
+
+        added = 0
+        k = self.k
+        matchids = self._matchids
+
+        for detail in details:
+            row = _detailplayers(detail)
+            trackid, matchtype, speed, matchid, endtime, rows = row
+            if matchids is not None:
+                if matchid in matchids:
+                    continue
+                matchids.add(matchid)
+            self._matches += 1
+
+            key = (trackid, matchtype, speed)
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _TrackEntry(self.alpha)
+            heap = entry.heap
+
+            for time, retired, accountno, name, kartid in rows:
+                if retired or time <= 0:
+                    continue
+
+                entry.sketch.add(time)
+                added += 1
+
+                if len(heap) >= k and -heap[0][0] <= time:
+                    continue
+
+                self._seq += 1
+                item = (-time, -self._seq,
+                        Record(time, accountno, name, kartid, matchid,
+                               endtime))
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                else:
+                    heapq.heapreplace(heap, item)
+
+        return added
+
+    def merge(self, other: 'TrackIndex') -> 'TrackIndex':
+        """other 의 기록을 더하고 자신을 반환합니다. 분포는 매치 ID 로
+        중복을 걸러내지 않으므로 서로 다른 매치를 추가한 인덱스끼리
+        합쳐야 합니다.
+
+        :raises ValueError: k 나 alpha 가 다를때
+        """
+        if other.k != self.k or other.alpha != self.alpha:
+            raise ValueError('k, alpha 가 다른 인덱스는 합칠 수 없습니다.')
+
+        for key, theirs in other._entries.items():
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _TrackEntry(self.alpha)
+            entry.sketch.merge(theirs.sketch)
+
+            for item in theirs.heap:
+                self._seq += 1
+                item = (item[0], -self._seq, item[2])
+                if len(entry.heap) < self.k:
+                    heapq.heappush(entry.heap, item)
+                elif item[0] > entry.heap[0][0]:
+                    heapq.heapreplace(entry.heap, item)
+
+        if self._matchids is not None and other._matchids is not None:
+            self._matchids |= other._matchids
+        self._matches += other._matches
+        return self
+
+    def _select(self, track, matchtype, gamespeed) -> List[_TrackEntry]:
+        trackid = _toid(track, 'track')
+        matchtype = _toid(matchtype, 'gameType')
+        entries = []
+        for (t, m, s), entry in self._entries.items():
+            match = t == trackid
+            match = match and (matchtype is None or m == matchtype)
+            match = match and (gamespeed is None or s == gamespeed)
+            if match:
+                entries.append(entry)
+        return entries
+
+    def top(self, track: str, n: int = 100, matchtype: Optional[str] = None,
+            gamespeed: Optional[int] = None) -> List[Record]:
+        """트랙의 가장 빠른 기록 n 개를 빠른 순서로 반환합니다.
+
+        matchtype, gamespeed 가 None 이면 모든 값을 합쳐 봅니다.
+        n 은 k 이하여야 정확합니다.
+
+        :param track: 트랙 ID 또는 이름(메타데이터 경로가 지정됐을때)
+        :param n: 반환할 기록 수
+        :param matchtype: 매치 타입 ID 또는 이름
+        :param gamespeed: 게임 속도
+        :rtype: list(Record)
+        """
+        records = [item[2]
+                   for entry in self._select(track, matchtype, gamespeed)
+                   for item in entry.heap]
+        return heapq.nsmallest(n, records, key=lambda r: r.time)
+
+    def _sketch(self, track, matchtype, gamespeed) -> LogSketch:
+        entries = self._select(track, matchtype, gamespeed)
+        if len(entries) == 1:
+            return entries[0].sketch
+
+        sketch = LogSketch(self.alpha)
+        for entry in entries:
+            sketch.merge(entry.sketch)
+        return sketch
+
+    def count(self, track: str, matchtype: Optional[str] = None,
+              gamespeed: Optional[int] = None) -> int:
+        """트랙의 기록 수를 반환합니다."""
+        return self._sketch(track, matchtype, gamespeed).count
+
+    def percentile(self, track: str, time: int,
+                   matchtype: Optional[str] = None,
+                   gamespeed: Optional[int] = None) -> float:
+        """기록 time(ms) 이하인 기록의 비율(0~1)을 반환합니다.
+        작을수록 빠른 기록입니다.
+
+        :rtype: float
+        """
+        return self._sketch(track, matchtype, gamespeed).rank(time)
+
+    def quantile(self, track: str, q: float,
+                 matchtype: Optional[str] = None,
+                 gamespeed: Optional[int] = None) -> Optional[float]:
+        """트랙 기록의 q 분위수(ms)를 반환합니다. 0.5 는 중앙값입니다.
+
+        :rtype: float
+        """
+        return self._sketch(track, matchtype, gamespeed).quantile(q)
@@ -1,10 +1,13 @@
+import functools
 from datetime import datetime
 from typing import List
 
-from . import utils
-from .basedata import MergeAbleDict, _BaseData
+from . import columnar, utils
+from .basedata import LazyList, MergeAbleDict, _BaseData
 from .metadata import (_getname, _safe_check, getcharactername,
                        getgametypename, gettrackname)
+from .schema import (Field, Schema, emptynone, integer, matchrank,
+                     matchretired, matchwin, text)
 
 
 class MatchResponse(_BaseData, MergeAbleDict[List['MatchInfo']]):
@@ -17,23 +20,32 @@ class MatchResponse(_BaseData, MergeAbleDict[List['MatchInfo']]):
         >>> mr = api.user('닉네임').getMatches()
         >>> mr['아이템 팀전'][0].playerCount # 검색된 매치 중 아이템 팀전의 0번째 매치 정보의 플레이어 카운트
         6
+
+    lazy 가 True 면 값은 응답 JSON 을 그대로 감싼 :class:`.LazyList` 이고,
+    항목은 호출할때 :class:`.MatchInfoView` 로 만들어집니다.
     """
 
-    def __init__(self, api, nickname: str, matcheslist):
+    def __init__(self, api, nickname: str, matcheslist, lazy: bool = False):
         _BaseData.__init__(self, api)
         MergeAbleDict.__init__(self)
 
         self.nickname = nickname  #: 매치 정보를 호출한 유저의 닉네임
+        self._matcheslist = matcheslist
 
         meta = _safe_check('gameType.json')
+        factory = functools.partial(MatchInfoView, api)
 
         for match in matcheslist:
             matchinforaw = match['matches']
             matchtypeid = match['matchType']
-            matchinfo = [None] * len(matchinforaw)
 
-            for i, m in enumerate(matchinforaw):
-                matchinfo[i] = MatchInfo(api, **m)
+            if lazy:
+                matchinfo = LazyList(matchinforaw, factory)
+            else:
+                matchinfo = [None] * len(matchinforaw)
+
+                for i, m in enumerate(matchinforaw):
+                    matchinfo[i] = MatchInfo._fromraw(api, m)
 
             if meta:
                 matchtype = getgametypename(matchtypeid)
@@ -41,45 +53,51 @@ class MatchResponse(_BaseData, MergeAbleDict[List['MatchInfo']]):
                 matchtype = matchtypeid
             self[matchtype] = matchinfo
 
+    def to_columns(self) -> columnar.Columns:
+        """매치 하나당 한 행인 열 이름→값 리스트 dict 를 반환합니다.
 
-class MatchInfo(_BaseData):
-    """매치 정보를 담고 있는 클래스입니다.
+        :class:`.MatchInfo` 를 거치지 않고 응답 JSON 에서 바로 만들며,
+        starttime, endtime 은 ISO 형식 문자열입니다.
 
-    사용법:
-        >>> mr = api.user('닉네임').getMatches()
-        >>> mi = mr['아이템 팀전'][0] # 검색된 매치 중 아이템 팀전의 0번째 매치 정보
-        >>> mi.character
-        황금망토 배찌
-    """
-    accountno: str  #: 계정 고유 식별자(str)
-    channelname: str  #: 채널 이름(str)
-    characterid: str  #: 캐릭터 ID(str)
-    matchresult: str  # :(str)
-    matchtypeid: str  #: 매치 종류 ID(str)
-    playercount: int  #: 참여 유저 수(int)
-    teamid: str  #: 팀 ID(str)
-    trackid: str  #: 트랙 ID(str)
+        :rtype: dict
+        """
+        return columnar.matchlist_columns(self._matcheslist)
 
-    def __init__(self, api, **kwargs):
-        intattrs = ['playercount']
-        ignoreattrs = ['starttime', 'endtime', 'player', 'matchid']
-        changeattrs = {'matchtype': 'matchtypeid',
-                       'character': 'characterid'}
+    def to_arrow(self):
+        """:meth:`to_columns` 를 pyarrow.Table 로 반환합니다.
+
+        :rtype: pyarrow.Table
+        """
+        return columnar.to_arrow(self.to_columns())
 
-        super(MatchInfo, self).__init__(api, intattrs,
-                                        ignoreattrs, changeattrs, **kwargs)
+    def to_pandas(self):
+        """:meth:`to_columns` 를 pandas.DataFrame 으로 반환합니다.
 
-        #: 게임 시작 시간(UTC)(datetime)
-        self.starttime = utils._change_str_todt(kwargs['startTime'])
+        :rtype: pandas.DataFrame
+        """
+        return columnar.to_pandas(self.to_columns())
+
+
+class UsersMatches(dict):
+    """여러 유저의 매치 응답을 담고 있는 클래스입니다.
+
+    :meth:`KartRider.Api.getUsersMatches` 에 입력한 닉네임이나 accessid 를
+    키로, :class:`.MatchResponse` 를 값으로 가지는 dict와 같습니다.
+    요청에 실패한 유저는 키에 없고 :attr:`errors` 에 들어갑니다.
+
+    >>> res = api.getUsersMatches(['닉네임1', '닉네임2'])
+    >>> res['닉네임1']['스피드 팀전']
+    >>> res.errors
+    {'닉네임2': NotFound()}
+    """
 
-        #: 게임 종료 시간(UTC)(datetime)
-        self.endtime = utils._change_str_todt(kwargs['endTime'])
+    def __init__(self, *args, **kwargs):
+        super(UsersMatches, self).__init__(*args, **kwargs)
+        self.errors = {}  #: 유저→요청에 실패한 예외 dict
 
-        #: 참여 유저 정보 (:class:`Player`)
-        self.player = Player(api, **kwargs['player'])
 
-        #: 매치 상세 정보 (:class:`.MatchDetail`)
-        self.detail = MatchDetail(api, kwargs['matchId'])
+class _MatchInfoNames(object):
+    __slots__ = ()
 
     @property
     def character(self) -> str:
@@ -109,6 +127,109 @@ class MatchInfo(_BaseData):
         return getgametypename(self.matchtypeid)
 
 
+class MatchInfo(_MatchInfoNames, _BaseData):
+    """매치 정보를 담고 있는 클래스입니다.
+
+    사용법:
+        >>> mr = api.user('닉네임').getMatches()
+        >>> mi = mr['아이템 팀전'][0] # 검색된 매치 중 아이템 팀전의 0번째 매치 정보
+        >>> mi.character
+        황금망토 배찌
+    """
+    accountno: str  #: 계정 고유 식별자(str)
+    channelname: str  #: 채널 이름(str)
+    characterid: str  #: 캐릭터 ID(str)
+    matchresult: str  # :(str)
+    matchtypeid: str  #: 매치 종류 ID(str)
+    playercount: int  #: 참여 유저 수(int)
+    teamid: str  #: 팀 ID(str)
+    trackid: str  #: 트랙 ID(str)
+    starttime: datetime  #: 게임 시작 시간(UTC)(datetime)
+    endtime: datetime  #: 게임 종료 시간(UTC)(datetime)
+    player: 'Player'  #: 참여 유저 정보 (:class:`Player`)
+    detail: 'MatchDetail'  #: 매치 상세 정보 (:class:`.MatchDetail`)
+
+    __slots__ = ('_api', 'accountno', 'channelname', 'characterid',
+                 'matchresult', 'matchtypeid', 'playercount', 'seasontype',
+                 'teamid', 'trackid', 'starttime', 'endtime', 'player',
+                 'detail')
+
+    _schema = Schema(
+        Field('accountNo', conv=text),
+        Field('channelName', conv=text),
+        Field('character', 'characterid'),
+        Field('matchResult', conv=text),
+        Field('matchType', 'matchtypeid'),
+        Field('playerCount', conv=integer),
+        Field('seasonType', conv=text),
+        Field('teamId', conv=text),
+        Field('trackId', conv=text),
+        Field('startTime', conv=utils._change_str_todt),
+        Field('endTime', conv=utils._change_str_todt),
+        Field('player', conv=lambda api, v: Player._fromraw(api, v),
+              nested=True),
+        Field('matchId', 'detail', lambda api, v: MatchDetail(api, v),
+              nested=True),
+    )
+
+    def __init__(self, api, **kwargs):
+        super(MatchInfo, self).__init__(api)
+        self._schema.apply(self, kwargs, api)
+
+
+class MatchInfoView(_MatchInfoNames):
+    """응답 JSON 을 복사하지 않고 감싸는 :class:`.MatchInfo` 의 가벼운 뷰입니다.
+
+    :class:`.MatchInfo` 와 같은 속성을 가지지만, 속성을 호출할때마다
+    응답 JSON 에서 값을 변환합니다. player 와 detail 은 처음 호출할때
+    만들어집니다.
+    """
+    __slots__ = ('_api', '_raw', '_player', '_detail')
+
+    def __init__(self, api, raw: dict):
+        self._api = api
+        self._raw = raw
+        self._player = None
+        self._detail = None
+
+    @property
+    def raw(self) -> dict:
+        """변환하지 않은 응답 JSON"""
+        return self._raw
+
+    def __getattr__(self, attr):
+        field = MatchInfo._schema.field(attr)
+
+        if field is None or field.nested or field.key not in self._raw:
+            raise AttributeError(f'없는 속성 {attr}을 호출하려 했습니다.')
+
+        return MatchInfo._schema.convert(field, self._raw[field.key])
+
+    @property
+    def player(self) -> 'Player':
+        """참여 유저 정보 (:class:`Player`)"""
+        if self._player is None:
+            self._player = Player._fromraw(self._api, self._raw['player'])
+        return self._player
+
+    @property
+    def detail(self) -> 'MatchDetail':
+        """매치 상세 정보 (:class:`.MatchDetail`)"""
+        if self._detail is None:
+            self._detail = MatchDetail(self._api, self._raw['matchId'])
+        return self._detail
+
+    def materialize(self) -> MatchInfo:
+        """모든 필드를 변환한 :class:`.MatchInfo` 를 반환합니다.
+
+        :rtype: MatchInfo
+        """
+        info = MatchInfo._fromraw(self._api, self._raw)
+        info.player = self.player
+        info.detail = self.detail
+        return info
+
+
 class AllMatches(_BaseData, MergeAbleDict['MatchDetail']):
     """전체 매치의 데이터를 담고 있는 클래스입니다.
 
@@ -120,14 +241,19 @@ class AllMatches(_BaseData, MergeAbleDict['MatchDetail']):
         >>> mi = mr['아이템 팀전']
         >>> mi[0].character
         노네임
+
+    lazy 가 True 면 값은 매치 ID 리스트를 감싼 :class:`.LazyList` 이고,
+    :class:`.MatchDetail` 은 항목을 호출할때 만들어집니다.
     """
 
-    def __init__(self, api, **kwargs):
+    def __init__(self, api, lazy: bool = False, **kwargs):
         matches = kwargs['matches']
         _BaseData.__init__(self, api)
         MergeAbleDict.__init__(self)
+        self._matcheslist = matches
 
         meta = _safe_check('gameType.json')
+        factory = functools.partial(MatchDetail, api)
 
         for item in matches:
             mt = item['matchType']
@@ -136,12 +262,44 @@ class AllMatches(_BaseData, MergeAbleDict['MatchDetail']):
             if meta:
                 mt = getgametypename(mt)
 
+            if lazy:
+                self[mt] = LazyList(prematchlist, factory)
+                continue
+
             self[mt] = [None] * len(prematchlist)
 
             for i, match in enumerate(prematchlist):
                 detail = MatchDetail(self._api, match)
                 self[mt][i] = detail
 
+    def to_columns(self, details: bool = False) -> columnar.Columns:
+        """열 이름→값 리스트 dict 를 반환합니다.
+
+        details 가 False 면 매치 하나당 한 행인 matchid, matchtypeid 열을,
+        True 면 :func:`KartRider.columnar.details_to_columns` 처럼
+        플레이어 하나당 한 행인 상세 정보 열을 반환합니다.
+
+        :param details: 상세 정보 열을 만들지 여부
+        :rtype: dict
+        """
+        if details:
+            return columnar.details_to_columns(self.mergevalues())
+        return columnar.allmatches_columns(self._matcheslist)
+
+    def to_arrow(self, details: bool = False):
+        """:meth:`to_columns` 를 pyarrow.Table 로 반환합니다.
+
+        :rtype: pyarrow.Table
+        """
+        return columnar.to_arrow(self.to_columns(details))
+
+    def to_pandas(self, details: bool = False):
+        """:meth:`to_columns` 를 pandas.DataFrame 으로 반환합니다.
+
+        :rtype: pandas.DataFrame
+        """
+        return columnar.to_pandas(self.to_columns(details))
+
 
 class MatchDetail(_BaseData):
     """매치의 상세 정보를 담고 있는 클래스입니다.
@@ -168,49 +326,51 @@ class MatchDetail(_BaseData):
     teams: None  #: 팀 정보 (list(:class:`KartRider.match.Team`))
     isteamgame: bool  #: 팀 게임 여부(bool)
 
+    __slots__ = ('_api', '_cachedetail', '_raw', 'matchid', 'channelname',
+                 'endtime', 'gamespeed', 'matchresult', 'matchtypeid',
+                 'playtime', 'starttime', 'trackid', 'teams', 'players',
+                 'isteamgame')
+
+    _schema = Schema(
+        Field('channelName', conv=emptynone),
+        Field('endTime', conv=utils._change_str_todt),
+        Field('gameSpeed', conv=emptynone),
+        Field('matchId', conv=emptynone),
+        Field('matchResult', conv=emptynone),
+        Field('matchType', 'matchtypeid', emptynone),
+        Field('playTime', conv=emptynone),
+        Field('startTime', conv=utils._change_str_todt),
+        Field('trackId', conv=emptynone),
+        Field('teams', conv=lambda api, v: [
+            Team(api, team['teamId'], team['players']) for team in v],
+            nested=True),
+        Field('players', conv=lambda api, v: [
+            Player._fromraw(api, player) for player in v], nested=True),
+    )
+
     def __init__(self, api, matchid):
         self.matchid = matchid  #: 매치 ID(str)
         super(MatchDetail, self).__init__(api)
         self._cachedetail = False
+        self._raw = None
 
     def _getdetail(self):
         if self._cachedetail:
             raise Exception('알 수 없는 에러')
         raw = self._api._getMatchDetails(self.matchid)
+        self._setdetail(raw)
 
-        changeattrs = {'matchtype': 'matchtypeid'}
-
-        for k, v in raw.items():
-            k = k.lower()
-            if k == 'teams':
-                self.teams: List['Team'] = [None] * len(v)
-
-                for i, team in enumerate(v):
-                    self.teams[i] = Team(
-                        self._api, team['teamId'], team['players'])
-
-            elif k == 'players':
-                self.players: List[Player] = [None] * len(v)
-
-                for i, player in enumerate(v):
-                    self.players[i] = Player(self._api, **player)
-
-            elif k == 'endtime' or k == 'starttime':
-                time = utils._change_str_todt(v)
-                setattr(self, k, time)
-            else:
-                if k in changeattrs:
-                    k = changeattrs[k]
-                if v == '':
-                    v = None
-                setattr(self, k, v)
-
-        if 'teams' in self.__dict__:
-            self.isteamgame = True
-        else:
-            self.isteamgame = False
+    def _setdetail(self, raw: dict):
+        self._schema.apply(self, raw, self._api)
+        self.isteamgame = 'teams' in raw
+        self._raw = raw
         self._cachedetail = True
 
+    @property
+    def raw(self) -> dict:
+        """변환하지 않은 상세 정보 응답 JSON, 아직 받아오지 않았으면 None"""
+        return self._raw
+
     def __getattr__(self, attr):
         lazyattrs = ['channelname', 'endtime', 'gamespeed', 'matchid',
                      'matchresult', 'matchtype', 'playtime', 'starttime',
@@ -219,6 +379,9 @@ class MatchDetail(_BaseData):
         if attr in lazyattrs:
             if self._cachedetail:
                 raise AttributeError
+            emit = getattr(self._api, '_emit', None)
+            if emit is not None:
+                emit('lazy_detail', {'matchid': self.matchid})
             self._getdetail()
             return getattr(self, attr)
         raise AttributeError(f'없는 속성 {attr}을 호출하려 했습니다.')
@@ -249,8 +412,7 @@ class Team(List['Player'], list):
     def __init__(self, api, teamid: int, players):
         self.teamid = teamid  #: 팀 ID(str)
 
-        for player in players:
-            self.append(Player(api, **player))
+        self.extend([Player._fromraw(api, player) for player in players])
 
 
 class Player(_BaseData):
@@ -277,31 +439,38 @@ class Player(_BaseData):
     partswheel: str  #: 카트바디의 휠 파츠 (9 엔진 이하)(str)
     petid: str  #: 펫 ID(str)
     rankinggrade2: str  #: 리뉴얼 라이선스(str)
+    matchrank: int  #: 순위, 리타이어는 -1(int)
+    matchretired: bool  #: 리타이어 여부(bool)
+    matchwin: bool  #: 매치 승리 여부(bool)
+
+    __slots__ = ('_api', 'accountno', 'charactername', 'characterid',
+                 'flyingpetid', 'kartid', 'license', 'matchtime',
+                 'partsengine', 'partshandle', 'partskit', 'partswheel',
+                 'petid', 'rankinggrade2', 'matchrank', 'matchretired',
+                 'matchwin')
+
+    _schema = Schema(
+        Field('accountNo', conv=text),
+        Field('characterName', conv=text),
+        Field('character', 'characterid'),
+        Field('flyingPet', 'flyingpetid'),
+        Field('kart', 'kartid'),
+        Field('license', conv=text),
+        Field('matchTime', conv=integer),
+        Field('partsEngine', conv=text),
+        Field('partsHandle', conv=text),
+        Field('partsKit', conv=text),
+        Field('partsWheel', conv=text),
+        Field('pet', 'petid'),
+        Field('rankinggrade2', conv=text),
+        Field('matchRank', conv=matchrank),
+        Field('matchRank', 'matchretired', matchretired),
+        Field('matchWin', conv=matchwin),
+    )
 
     def __init__(self, api, **kwargs):
-        changeattrs = {'kart': 'kartid', 'character': 'characterid',
-                       'pet': 'petid', 'flyingpet': 'flyingpetid'}
-        ignoreattrs = ['matchrank', 'matchwin', 'matchretired']
-        intattrs = ['matchtime']
-        super(Player, self).__init__(
-            api, intattrs, ignoreattrs, changeattrs, **kwargs)
-
-        rank = kwargs['matchRank']
-
-        if rank == '99' or rank == '':
-            self.matchrank = -1  #: 순위, 리타이어는 -1
-            self.matchretired = True  #: 리타이어 여부
-        elif rank == '1':
-            self.matchrank = 1
-            self.matchretired = False
-        else:
-            self.matchrank = int(rank)
-            self.matchretired = False
-
-        if kwargs['matchWin'] == '0':
-            self.matchwin = False  #: 매치 승리 여부
-        else:
-            self.matchwin = True
+        super(Player, self).__init__(api)
+        self._schema.apply(self, kwargs)
 
     @property
     def kart(self) -> str:
@@ -1,12 +1,88 @@
-import json
 import os
 import functools
+import json
+import shutil
+import stat
+import tempfile
+import threading
+import time
+import zlib
 from zipfile import ZipFile
-from io import BytesIO
 import requests
 from . import utils
 
 _path = ""
+_decoder = None
+
+_META_URL = 'https://static.api.nexon.co.kr/kart/latest/metadata.zip'
+#: 메타데이터 폴더에 저장하는 다운로드 정보 파일 (ETag, 파일 목록)
+_STATE_FILE = '.metadata.json'
+
+#: 메타데이터 파일의 수정 여부(mtime)를 다시 확인하기까지의 최소 간격(초)
+_MTIME_CHECK_INTERVAL = 1.0
+
+
+class _MetaStore(object):
+    """메타데이터 파일을 한번만 읽어 id→이름, 이름→id 인덱스로 보관합니다.
+
+    :func:`set_metadatapath` 로 경로가 바뀌거나 파일의 mtime 이 바뀌면
+    해당 데이터를 다시 읽습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, datatype: str):
+        """(id→이름, 이름→id) dict 쌍을 반환합니다.
+
+        :raises FileNotFoundError: 메타데이터 파일이 없을때
+        """
+        entry = self._entries.get(datatype)
+        now = time.monotonic()
+
+        if entry is not None and entry['path'] == _path:
+            if now - entry['checked'] < _MTIME_CHECK_INTERVAL:
+                return entry['byid'], entry['byname']
+            if self._mtime(datatype) == entry['mtime']:
+                entry['checked'] = now
+                return entry['byid'], entry['byname']
+
+        with self._lock:
+            return self._load(datatype, now)
+
+    def _mtime(self, datatype):
+        try:
+            return os.stat(os.path.join(_path, datatype + '.json')).st_mtime_ns
+        except OSError:
+            self._entries.pop(datatype, None)
+            raise FileNotFoundError
+
+    def _load(self, datatype, now):
+        path = _path
+        mtime = self._mtime(datatype)
+
+        with open(os.path.join(path, datatype + '.json'), 'rb') as f:
+            data = _loads(f.read())
+
+        byid = {}
+        byname = {}
+
+        for item in data:
+            byid[item['id']] = item['name']
+            byname[item['name']] = item['id']
+
+        self._entries[datatype] = {'path': path, 'mtime': mtime,
+                                   'checked': now,
+                                   'byid': byid, 'byname': byname}
+        return byid, byname
+
+
+_store = _MetaStore()
 
 
 def set_metadatapath(path: str):
@@ -21,10 +97,30 @@ def set_metadatapath(path: str):
     if os.path.isdir(path):
         global _path
         _path = path
+        _store.clear()
     else:
         raise FileNotFoundError('폴더가 없습니다.')
 
 
+def set_json_decoder(decoder: 'utils.JsonDecoder' = 'auto'):
+    """메타데이터 파일을 읽을때 사용할 JSON 디코더를 설정합니다.
+
+    :param decoder: 'auto', 'orjson', 'msgspec', 'ujson', 'json' 또는
+        bytes 를 받는 함수. 'auto' 면 설치된 가장 빠른 디코더를 사용합니다.
+    :raises ImportError: 지정한 디코더가 설치되지 않았을때
+    """
+    global _decoder
+    _decoder = utils._jsondecoder(decoder)
+    _store.clear()
+
+
+def _loads(data: bytes):
+    global _decoder
+    if _decoder is None:
+        _decoder = utils._jsondecoder()
+    return _decoder(data)
+
+
 def _safe_check(filename):
     try:
         _check_metadatapath(filename)
@@ -52,16 +148,10 @@ def _getId(datatype: str, name: str) -> str:
 
 
 def _get(datatype: str, finddata: str, datavalue: str, dataname: str):
-    filename = datatype + '.json'
-    _check_metadatapath(filename)
-    with open(os.path.join(_path, filename), encoding='utf8') as f:
-        data = json.load(f)
+    byid, byname = _store.get(datatype)
+    index = byid if dataname == 'id' else byname
 
-    result = None
-
-    for item in data:
-        if datavalue == item[dataname]:
-            result = item[finddata]
+    result = index.get(datavalue)
 
     if result == '' or datavalue is None or result is None:
         return 'Unknown'
@@ -74,18 +164,8 @@ def _getid(datatype: str, name: str) -> str:
 
 
 def _gets(datatype):
-    filename = datatype + '.json'
-    _check_metadatapath(filename)
-
-    with open(os.path.join(_path, filename), encoding='utf8') as f:
-        data = json.load(f)
-
-    r = {}
-
-    for item in data:
-        r[item['id']] = item['name']
-
-    return r
+    byid, _ = _store.get(datatype)
+    return dict(byid)
 
 
 def getimagepath(name: str, typename: str) -> str:
@@ -277,28 +357,189 @@ def gettrackid(name: str) -> str:
     return _getId('track', name)
 
 
-def download_meta(file_dir: str):
+def _readstate(file_dir: str) -> dict:
+    try:
+        with open(os.path.join(file_dir, _STATE_FILE), encoding='utf8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _memberpath(root: str, name: str):
+    # 폴더 밖을 가리키는 이름은 None, ZipFile.extract 가 처리합니다.
+    parts = name.split('/')
+    if name.startswith('/') or '..' in parts or '\\' in name or ':' in name:
+        return None
+    return os.path.join(root, *[p for p in parts if p])
+
+
+def _crc32(path: str, chunk_size: int = 2 ** 20) -> int:
+    crc = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def _fileok(path: str, entry: list) -> bool:
+    # entry 는 상태 파일에 저장한 [CRC, 크기, 쓴 뒤의 mtime(ns)]
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    if not stat.S_ISREG(st.st_mode) or st.st_size != entry[1]:
+        return False
+    if len(entry) > 2 and st.st_mtime_ns == entry[2]:
+        return True
+    # 크기가 같아도 mtime 이 바뀌었으면 내용을 읽어 확인합니다.
+    return _crc32(path) == entry[0]
+
+
+def _damaged(file_dir: str, files: dict) -> bool:
+    for name, entry in files.items():
+        path = _memberpath(file_dir, name)
+        if path is not None and not _fileok(path, entry):
+            return True
+    return False
+
+
+def _download(res, file, chunk_size: int):
+    for chunk in res.iter_content(chunk_size):
+        file.write(chunk)
+
+
+def download_meta(file_dir: str, session: requests.Session = None,
+                  url: str = _META_URL, timeout: float = 60,
+                  chunk_size: int = 2 ** 20) -> bool:
     """메타데이터를 다운로드 합니다.
 
-    :param file_dir: 메타데이터가 들어갈 폳더 경로
-    :type file_dir: str
-    """
-    url = 'https://static.api.nexon.co.kr/kart/latest/metadata.zip'
-    res = requests.get(url)
+    압축 파일은 메모리에 올리지 않고 file_dir 안의 임시 파일로 받으며,
+    ETag/Last-Modified 로 바뀌지 않은 압축 파일은 다시 받지 않습니다.
+    단, 이전에 받은 파일이 지워졌거나 바뀌었다면(크기, 또는 mtime 이
+    바뀐 파일의 CRC 로 확인합니다) 조건 없이 다시 받아 되살립니다.
+    이전 다운로드와 같은 파일은 다시 풀지 않고, 바뀐 파일은 임시 파일에
+    푼 뒤 rename 으로 바꿔치기하므로 반쯤 쓰인 파일이 보이지 않습니다.
+    이전 압축 파일에 있었지만 새 압축 파일에 없는 파일은 지우며,
+    메타데이터가 아닌 파일은 건드리지 않습니다.
 
-    zipfile = ZipFile(BytesIO(res.content))
+    .. note:: 파일 하나하나는 원자적으로 바뀌지만 폴더 전체가 한번에
+              바뀌지는 않으므로, 다운로드 중에는 이전 파일과 새 파일이
+              섞여 보일 수 있습니다.
 
-    zipfile.extractall(file_dir)
-    res.close()
-    zipfile.close()
+    :param file_dir: 메타데이터가 들어갈 폴더 경로
+    :type file_dir: str
+    :param session: 다운로드에 사용할 세션, None 이면 새 연결을 사용합니다.
+    :type session: requests.Session
+    :param url: 메타데이터 압축 파일 URL
+    :param timeout: 요청 타임아웃(초)
+    :param chunk_size: 한번에 받을 크기(바이트)
+    :raises requests.HTTPError: 다운로드에 실패했을때
+    :return: 메타데이터가 바뀌었으면 True, 바뀌지 않았으면 False
+    :rtype: bool
+    """
+    os.makedirs(file_dir, exist_ok=True)
+
+    state = _readstate(file_dir)
+    headers = {}
+    # 받아둔 파일이 망가졌으면 304 를 받지 않도록 조건 없이 받습니다.
+    if _damaged(file_dir, state.get('files', {})):
+        state = {'files': state.get('files', {})}
+    if state.get('etag'):
+        headers['If-None-Match'] = state['etag']
+    if state.get('last_modified'):
+        headers['If-Modified-Since'] = state['last_modified']
+
+    res = (session or requests).get(url, headers=headers, stream=True,
+                                    timeout=timeout)
+    try:
+        if res.status_code == 304:
+            return False
+        res.raise_for_status()
+
+        fd, zippath = tempfile.mkstemp(prefix='.metadata-', suffix='.zip',
+                                       dir=file_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                _download(res, f, chunk_size)
+        except BaseException:
+            os.remove(zippath)
+            raise
+    finally:
+        res.close()
+
+    newstate = {'etag': res.headers.get('ETag'),
+                'last_modified': res.headers.get('Last-Modified'),
+                'files': {}}
+    oldfiles = state.get('files', {})
+    try:
+        _extract(zippath, file_dir, oldfiles, newstate['files'])
+    finally:
+        os.remove(zippath)
+
+    for name in oldfiles:
+        path = _memberpath(file_dir, name)
+        if name not in newstate['files'] and path is not None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    _replacefile(os.path.join(file_dir, _STATE_FILE),
+                 json.dumps(newstate).encode('utf8'))
+
+    _store.clear()
+    return True
 
 
-def downmeta_ifnotexist(file_dir: str) -> bool:
+def _replacefile(path: str, data, chunk_size: int = 2 ** 20):
+    # 같은 폴더의 임시 파일에 쓴 뒤 rename 해서 파일을 한번에 바꿉니다.
+    dirname = os.path.dirname(path)
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmppath = tempfile.mkstemp(prefix='.metadata-', dir=dirname)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            if isinstance(data, bytes):
+                f.write(data)
+            else:
+                shutil.copyfileobj(data, f, chunk_size)
+        os.replace(tmppath, path)
+    except BaseException:
+        os.remove(tmppath)
+        raise
+
+
+def _extract(zippath: str, file_dir: str, oldfiles: dict, newfiles: dict):
+    with ZipFile(zippath) as zipfile:
+        for info in zipfile.infolist():
+            if info.is_dir():
+                continue
+
+            key = [info.CRC, info.file_size]
+            newfiles[info.filename] = key
+
+            target = _memberpath(file_dir, info.filename)
+            if target is None:
+                # 폴더 밖을 가리키는 이름은 ZipFile.extract 가 정리합니다.
+                zipfile.extract(info, file_dir)
+                continue
+
+            old = oldfiles.get(info.filename)
+            if old is None or old[:2] != key or not _fileok(target, old):
+                with zipfile.open(info) as src:
+                    _replacefile(target, src)
+            newfiles[info.filename] = key + [os.stat(target).st_mtime_ns]
+
+
+def downmeta_ifnotexist(file_dir: str,
+                        session: requests.Session = None) -> bool:
     """메타데이터 폴더가 없으면 메타데이터를 다운로드 합니다.
 
     :param file_dir: 메타데이터가 들어가거나 있는 폴더
     :type file_dir: str
-    :return: 다운로드 했으면 True, 하지 않았으면 False 를 반환합니다.
+    :param session: 다운로드에 사용할 세션
+    :type session: requests.Session
+    :return: 다운로드해서 메타데이터가 바뀌었으면 True, 아니면 False 를
+        반환합니다.
     :rtype: bool
     """
     filenames = ['character', 'flyingPet', 'gameType', 'kart', 'pet', 'track']
@@ -306,12 +547,10 @@ def downmeta_ifnotexist(file_dir: str) -> bool:
 
     for filename in filenames:
         if not os.path.isfile(os.path.join(file_dir, filename + '.json')):
-            download_meta(file_dir)
-            return True
+            return download_meta(file_dir, session)
 
     for image in images:
         if not os.path.isdir(os.path.join(file_dir, image)):
-            download_meta(file_dir)
-            return True
+            return download_meta(file_dir, session)
 
     return False
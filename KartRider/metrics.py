@@ -0,0 +1,274 @@
+"""Api 의 요청을 관찰하는 이벤트 훅과 지표 수집기입니다.
+
+:class:`KartRider.Api` 의 hooks 에 ``hook(event, data)`` 형태의 함수를
+넣으면 다음 이벤트를 받습니다.
+
+=============== ======================================================
+event           data
+=============== ======================================================
+``request``     endpoint, url, status, elapsed(초), size(바이트), attempt
+``retry``       endpoint, url, status, delay(초), attempt
+``cache``       cache('detail', 'user'), hit(bool)
+``coalesced``   endpoint, url (진행 중이던 같은 URL 요청의 결과를 받음)
+``lazy_detail`` matchid (속성 호출로 상세 정보를 받아온 MatchDetail)
+=============== ======================================================
+
+transport 가 예외를 던진 요청도 status 가 None, size 가 0 인 request
+이벤트를 보낸 뒤 예외를 다시 던집니다.
+
+>>> metrics = KartRider.MetricsCollector()
+>>> api = KartRider.Api(API_KEY, hooks=[metrics])
+>>> api.getAllMatches(prefetch=True)
+>>> metrics.snapshot()['endpoints']['matches']['count']
+10
+
+hooks 가 비어 있으면 시간 측정을 포함한 어떤 작업도 하지 않습니다.
+"""
+import bisect
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence
+
+Hook = Callable[[str, Dict[str, Any]], None]
+
+#: :class:`MetricsCollector` 의 기본 응답 시간 히스토그램 경계(초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+
+
+def _endpoint(url: str, base: str) -> str:
+    # 'users/nickname', 'users', 'users/matches', 'matches/all', 'matches'
+    path = url[len(base):] if url.startswith(base) else url
+    parts = path.split('?', 1)[0].split('/')
+
+    if parts[0] == 'users':
+        if len(parts) > 2 and parts[1] == 'nickname':
+            return 'users/nickname'
+        if len(parts) > 2 and parts[2] == 'matches':
+            return 'users/matches'
+        return 'users'
+    if parts[0] == 'matches':
+        if len(parts) > 1 and parts[1] == 'all':
+            return 'matches/all'
+        return 'matches'
+    return parts[0]
+
+
+def _statuslabel(status: Optional[int]) -> str:
+    return 'error' if status is None else str(status)
+
+
+def _emit(hooks: Sequence[Hook], event: str, data: Dict[str, Any]):
+    for hook in hooks:
+        hook(event, data)
+
+
+class _EndpointStats(object):
+    __slots__ = ('count', 'errors', 'retries', 'coalesced', 'bytes',
+                 'elapsed', 'status', 'buckets')
+
+    def __init__(self, nbuckets):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.coalesced = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+        self.status = {}
+        self.buckets = [0] * (nbuckets + 1)
+
+    def todict(self, bounds) -> dict:
+        return {'count': self.count, 'errors': self.errors,
+                'retries': self.retries, 'coalesced': self.coalesced,
+                'bytes': self.bytes,
+                'elapsed': self.elapsed, 'status': dict(self.status),
+                'latency': dict(zip(bounds + (float('inf'),),
+                                    self.buckets))}
+
+
+class MetricsCollector(object):
+    """이벤트를 엔드포인트별 지표로 모으는 스레드 안전한 훅입니다.
+
+    :param buckets: 응답 시간 히스토그램의 경계(초)
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """모은 지표를 모두 지웁니다."""
+        with self._lock:
+            self._endpoints = {}
+            self._caches = {}
+            self._lazy = 0
+
+    def _stats(self, endpoint) -> _EndpointStats:
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = _EndpointStats(len(self.buckets))
+            self._endpoints[endpoint] = stats
+        return stats
+
+    def __call__(self, event: str, data: Dict[str, Any]):
+        with self._lock:
+            if event == 'request':
+                stats = self._stats(data['endpoint'])
+                status = data['status']
+                stats.count += 1
+                stats.bytes += data['size']
+                stats.elapsed += data['elapsed']
+                stats.status[status] = stats.status.get(status, 0) + 1
+                if status != 200:
+                    stats.errors += 1
+                i = bisect.bisect_left(self.buckets, data['elapsed'])
+                stats.buckets[i] += 1
+
+            elif event == 'retry':
+                self._stats(data['endpoint']).retries += 1
+
+            elif event == 'coalesced':
+                self._stats(data['endpoint']).coalesced += 1
+
+            elif event == 'cache':
+                counts = self._caches.setdefault(data['cache'],
+                                                 {'hits': 0, 'misses': 0})
+                counts['hits' if data['hit'] else 'misses'] += 1
+
+            elif event == 'lazy_detail':
+                self._lazy += 1
+
+    def snapshot(self) -> dict:
+        """지금까지 모은 지표를 dict 로 반환합니다.
+
+        endpoints 는 엔드포인트별 count, errors(200 이 아닌 응답과
+        transport 예외), retries, coalesced(다른 요청의 결과를 함께 받은
+        수), bytes, elapsed(초 합계), status(응답 코드별 수, transport
+        예외는 None), latency(히스토그램 경계별 수) 를 담고, caches 는
+        캐시별 hits, misses, lazy_details 는 속성 호출로 받아온 상세 정보
+        수입니다.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'endpoints': {name: stats.todict(self.buckets)
+                              for name, stats in self._endpoints.items()},
+                'caches': {name: dict(counts)
+                           for name, counts in self._caches.items()},
+                'lazy_details': self._lazy,
+            }
+
+
+class PrometheusHook(object):
+    """이벤트를 prometheus_client 지표로 내보내는 훅입니다.
+
+    prometheus_client 가 필요합니다.
+
+    ``{prefix}_requests_total{endpoint, status}``,
+    ``{prefix}_request_seconds{endpoint}``,
+    ``{prefix}_response_bytes_total{endpoint}``,
+    ``{prefix}_retries_total{endpoint, status}``,
+    ``{prefix}_coalesced_total{endpoint}``,
+    ``{prefix}_cache_total{cache, result}``,
+    ``{prefix}_lazy_details_total`` 를 만듭니다.
+
+    :param registry: 지표를 등록할 CollectorRegistry, None 이면 기본 registry
+    :param prefix: 지표 이름 앞에 붙일 문자열
+    :param buckets: 응답 시간 히스토그램의 경계(초)
+    """
+
+    def __init__(self, registry=None, prefix: str = 'kartrider',
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        from prometheus_client import REGISTRY, Counter, Histogram
+
+        if registry is None:
+            registry = REGISTRY
+
+        self.requests = Counter(f'{prefix}_requests', 'API 요청 수',
+                                ['endpoint', 'status'], registry=registry)
+        self.seconds = Histogram(f'{prefix}_request_seconds',
+                                 'API 응답 시간(초)', ['endpoint'],
+                                 buckets=buckets, registry=registry)
+        self.bytes = Counter(f'{prefix}_response_bytes', 'API 응답 크기',
+                             ['endpoint'], registry=registry)
+        self.retries = Counter(f'{prefix}_retries', '재시도한 요청 수',
+                               ['endpoint', 'status'], registry=registry)
+        self.coalesced = Counter(f'{prefix}_coalesced',
+                                 '진행 중인 요청의 결과를 함께 받은 수',
+                                 ['endpoint'], registry=registry)
+        self.cache = Counter(f'{prefix}_cache', '캐시 조회 수',
+                             ['cache', 'result'], registry=registry)
+        self.lazy = Counter(f'{prefix}_lazy_details',
+                            '속성 호출로 받아온 매치 상세 정보 수',
+                            registry=registry)
+
+    def __call__(self, event: str, data: Dict[str, Any]):
+        if event == 'request':
+            endpoint = data['endpoint']
+            self.requests.labels(endpoint,
+                                 _statuslabel(data['status'])).inc()
+            self.seconds.labels(endpoint).observe(data['elapsed'])
+            self.bytes.labels(endpoint).inc(data['size'])
+        elif event == 'retry':
+            self.retries.labels(data['endpoint'], str(data['status'])).inc()
+        elif event == 'coalesced':
+            self.coalesced.labels(data['endpoint']).inc()
+        elif event == 'cache':
+            result = 'hit' if data['hit'] else 'miss'
+            self.cache.labels(data['cache'], result).inc()
+        elif event == 'lazy_detail':
+            self.lazy.inc()
+
+
+class OpenTelemetryHook(object):
+    """이벤트를 OpenTelemetry 지표로 내보내는 훅입니다.
+
+    opentelemetry-api 가 필요합니다.
+
+    :param meter: 사용할 Meter, None 이면 전역 MeterProvider 에서 만듭니다.
+    :param prefix: 지표 이름 앞에 붙일 문자열
+    """
+
+    def __init__(self, meter=None, prefix: str = 'kartrider'):
+        if meter is None:
+            from opentelemetry import metrics
+            meter = metrics.get_meter('KartRider')
+
+        self.requests = meter.create_counter(f'{prefix}.requests',
+                                             description='API 요청 수')
+        self.duration = meter.create_histogram(
+            f'{prefix}.request.duration', unit='s',
+            description='API 응답 시간')
+        self.bytes = meter.create_counter(f'{prefix}.response.size',
+                                          unit='By',
+                                          description='API 응답 크기')
+        self.retries = meter.create_counter(f'{prefix}.retries',
+                                            description='재시도한 요청 수')
+        self.coalesced = meter.create_counter(
+            f'{prefix}.coalesced',
+            description='진행 중인 요청의 결과를 함께 받은 수')
+        self.cache = meter.create_counter(f'{prefix}.cache',
+                                          description='캐시 조회 수')
+        self.lazy = meter.create_counter(
+            f'{prefix}.lazy_details',
+            description='속성 호출로 받아온 매치 상세 정보 수')
+
+    def __call__(self, event: str, data: Dict[str, Any]):
+        if event == 'request':
+            status = data['status']
+            attrs = {'endpoint': data['endpoint'],
+                     'status': 'error' if status is None else status}
+            self.requests.add(1, attrs)
+            self.duration.record(data['elapsed'], attrs)
+            self.bytes.add(data['size'], {'endpoint': data['endpoint']})
+        elif event == 'retry':
+            self.retries.add(1, {'endpoint': data['endpoint'],
+                                 'status': data['status']})
+        elif event == 'coalesced':
+            self.coalesced.add(1, {'endpoint': data['endpoint']})
+        elif event == 'cache':
+            self.cache.add(1, {'cache': data['cache'],
+                               'result': 'hit' if data['hit'] else 'miss'})
+        elif event == 'lazy_detail':
+            self.lazy.add(1)
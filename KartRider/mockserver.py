@@ -0,0 +1,412 @@
+"""부하 테스트용 로컬 가짜 카트라이더 OpenAPI 서버입니다.
+
+실제 API 의 요청 허용량을 쓰지 않고 동시성, rate_limit 설정을 조정할 수
+있도록, OpenAPI 와 같은 형식의 가짜 응답을 만들어 돌려줍니다.
+응답 지연, 429 응답 주입, 매치 수와 플레이어 수를 설정할 수 있습니다.
+
+>>> with MockServer(latency=0.05, error_rate=0.1) as server:
+...     api = KartRider.Api('key', base_url=server.url, rate_limit=50)
+...     api.getAllMatches(limit=500, prefetch=True)
+
+명령줄에서 실행할 수도 있습니다.
+
+    $ python -m KartRider.mockserver --port 8080 --latency 0.05
+"""
+import argparse
+import hashlib
+import json
+import random
+import socketserver
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from . import utils
+
+#: 가짜 매치 타입 ID (스피드 팀전, 스피드 개인전)
+MATCH_TYPES = (
+    'effd66758144a29868663aa50e85d3d95c5bc0147d7fdb9802691c2087f3416e',
+    '7b9f0fd5377c38514dbb78ebe63ac6c3b81009d5a31dd569d1cff8f005aa881a')
+
+_PATH_PREFIX = '/kart/v1.0/'
+_MATCHID_BASE = 0x02f10015820b0000
+_ACCESSID_BASE = 1560546859
+#: 가장 최근 매치의 끝난 시간, 이후 매치는 _INTERVAL 간격으로 과거입니다.
+_LATEST = datetime(2020, 1, 1)
+_INTERVAL = timedelta(seconds=90)
+
+
+#: 종류별 가짜 ID 개수
+_ID_COUNTS = {'character': 50, 'kart': 200, 'pet': 30, 'flyingPet': 20,
+              'track': 100}
+
+#: (종류, 번호) 를 받아 메타데이터 ID 를 돌려주는 함수
+IdFunc = Callable[[str, int], str]
+
+
+def fakeid(kind: str, i: int) -> str:
+    """종류별로 정해진 수 안에서 돌아가는 가짜 메타데이터 ID 입니다."""
+    i %= _ID_COUNTS.get(kind, 1)
+    return hashlib.sha256(f'{kind}{i}'.encode()).hexdigest()
+
+
+def matchid(i: int) -> str:
+    """매치 i 의 매치 ID 입니다."""
+    return '%016x' % (_MATCHID_BASE + i)
+
+
+def accessid(i: int) -> str:
+    """유저 i 의 accessid 입니다."""
+    return str(_ACCESSID_BASE + i)
+
+
+def _times(i: int):
+    end = _LATEST - _INTERVAL * i
+    start = end - timedelta(seconds=109)
+    return (start.isoformat(timespec='milliseconds'),
+            end.isoformat(timespec='milliseconds'))
+
+
+def player(i: int, rank: int, ids: IdFunc = fakeid) -> dict:
+    """플레이어 i 의 응답 JSON 을 만듭니다. rank 가 8 보다 크면
+    리타이어입니다."""
+    retired = rank > 8
+    return {
+        'accountNo': accessid(i),
+        'characterName': f'닉네임{i}',
+        'character': ids('character', i),
+        'kart': ids('kart', i),
+        'license': '',
+        'pet': ids('pet', i),
+        'flyingPet': ids('flyingPet', i),
+        'partsEngine': '',
+        'partsHandle': '',
+        'partsWheel': '',
+        'partsKit': '',
+        'rankinggrade2': str(i % 6),
+        'matchRank': '99' if retired else str(rank),
+        'matchRetired': '1' if retired else '0',
+        'matchWin': '1' if rank <= 4 else '0',
+        'matchTime': '' if retired else str(100000 + rank * 731 + i % 997),
+    }
+
+
+def detail(i: int, start: str, end: str, teamgame: bool = True,
+           players: int = 8, ids: IdFunc = fakeid) -> dict:
+    """매치 i 의 상세 정보 응답 JSON 을 만듭니다.
+
+    :param start: startTime 문자열
+    :param end: endTime 문자열
+    :param teamgame: 스피드 팀전이면 True, 스피드 개인전이면 False
+    :param players: 플레이어 수
+    :param ids: 메타데이터 ID 를 만들 함수
+    """
+    raw = {
+        'channelName': 'speedTeamFast' if teamgame else 'speedIndiFast',
+        'endTime': end,
+        'gameSpeed': 0,
+        'matchId': matchid(i),
+        'matchResult': str(i % 2 + 1),
+        'matchType': MATCH_TYPES[0] if teamgame else MATCH_TYPES[1],
+        'playTime': 109,
+        'startTime': start,
+        'trackId': ids('track', i),
+    }
+    racers = [player(i * players + p, (p + i) % players + 1, ids)
+              for p in range(players)]
+    if teamgame:
+        half = players // 2
+        raw['teams'] = [{'teamId': '1', 'players': racers[:half]},
+                        {'teamId': '2', 'players': racers[half:]}]
+    else:
+        raw['players'] = racers
+    return raw
+
+
+def matchinfo(i: int, user: int, start: str, end: str,
+              matchtype: str = MATCH_TYPES[0], players: int = 8,
+              ids: IdFunc = fakeid) -> dict:
+    """유저 user 의 매치 목록에 들어가는 매치 i 의 응답 JSON 을
+    만듭니다."""
+    return {
+        'accountNo': accessid(user),
+        'matchId': matchid(i),
+        'matchType': matchtype,
+        'teamId': str(i % 2 + 1),
+        'character': ids('character', i),
+        'startTime': start[:19],
+        'endTime': end[:19],
+        'channelName': 'speedTeamFast',
+        'trackId': ids('track', i),
+        'playerCount': str(players),
+        'matchResult': str(i % 2 + 1),
+        'seasonType': '',
+        'player': player(user, i % players + 1, ids),
+    }
+
+
+def _matchtype(i: int) -> str:
+    return MATCH_TYPES[i % len(MATCH_TYPES)]
+
+
+class _Server(socketserver.ThreadingMixIn, HTTPServer):
+    # http.server.ThreadingHTTPServer 는 3.7 부터 있습니다.
+    daemon_threads = True
+
+
+class MockServer(object):
+    """가짜 OpenAPI 서버입니다. :meth:`start` 로 백그라운드 스레드에서
+    실행하고 :attr:`url` 을 :class:`KartRider.Api` 의 base_url 로 사용합니다.
+
+    매치 i 는 2020-01-01 부터 90초 간격으로 과거로 가며, 같은 i 는 항상
+    같은 응답을 만듭니다. start_date, end_date, offset, limit, match_types
+    파라미터를 따릅니다.
+
+    :param host: 바인딩할 주소
+    :param port: 바인딩할 포트, 0 이면 빈 포트를 사용합니다.
+    :param latency: 응답마다 기다릴 시간(초)
+    :param error_rate: 429 응답을 돌려줄 확률(0~1)
+    :param retry_after: 429 응답의 Retry-After 헤더(초), None 이면 보내지
+        않습니다.
+    :param matches: 서버에 있는 전체 매치 수
+    :param players: 매치 상세 정보의 플레이어 수
+    :param token: 설정하면 Authorization 헤더가 다른 요청에 403 을 돌려줍니다.
+    :param seed: 429 주입에 사용할 난수 시드
+    :param fail_every: 0 이 아니면 fail_every 번째 요청마다 429 를
+        돌려줍니다. error_rate 와 달리 결과가 실행마다 같습니다.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, error_rate: float = 0.0,
+                 retry_after: Optional[float] = None,
+                 matches: int = 100000, players: int = 8,
+                 token: Optional[str] = None, seed: Optional[int] = None,
+                 fail_every: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.fail_every = fail_every
+        self.retry_after = retry_after
+        self.matches = matches
+        self.players = players
+        self.token = token
+        self.requests = 0  #: 받은 요청 수
+        self.throttled = 0  #: 429 를 돌려준 요청 수
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._httpd = _Server((host, port), _handler(self))
+
+    @property
+    def url(self) -> str:
+        """Api 의 base_url 로 사용할 서버 URL"""
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}{_PATH_PREFIX}'
+
+    def start(self) -> 'MockServer':
+        """백그라운드 스레드에서 서버를 실행합니다."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """서버를 멈추고 소켓을 닫습니다."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def serve_forever(self):
+        """현재 스레드에서 서버를 실행합니다."""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def _throttle(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            every = self.fail_every
+            if every and self.requests % every == 0:
+                self.throttled += 1
+                return True
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.throttled += 1
+                return True
+        return False
+
+    def _route(self, path: str, query: dict):
+        """(응답 코드, 응답 JSON) 을 반환합니다."""
+        if not path.startswith(_PATH_PREFIX):
+            return 404, None
+        parts = [unquote(p) for p in path[len(_PATH_PREFIX):].split('/')]
+
+        if parts[0] == 'users' and len(parts) == 3 and parts[1] == 'nickname':
+            return 200, self.user(parts[2])
+        if parts[0] == 'users' and len(parts) == 2:
+            if not parts[1].isdigit():
+                return 404, None
+            return 200, {'accessId': parts[1], 'name': f'닉네임{parts[1]}',
+                         'level': 1}
+        if parts[0] == 'users' and len(parts) == 3 and parts[2] == 'matches':
+            return 200, self.matchlist(parts[1], **query)
+        if parts == ['matches', 'all']:
+            return 200, self.allmatches(**query)
+        if parts[0] == 'matches' and len(parts) == 2:
+            try:
+                i = int(parts[1], 16) - _MATCHID_BASE
+            except ValueError:
+                return 404, None
+            if not 0 <= i < self.matches:
+                return 404, None
+            return 200, self.detail(i)
+
+        return 404, None
+
+    def user(self, nickname: str) -> dict:
+        """닉네임의 유저 정보 응답을 만듭니다."""
+        accessid = int(hashlib.md5(nickname.encode()).hexdigest()[:8], 16)
+        return {'accessId': str(accessid), 'name': nickname, 'level': 1}
+
+    def _indexes(self, start_date='', end_date='', offset='0', limit='10',
+                 match_types=''):
+        # 끝난 시간이 [start_date, end_date] 안에 있는 매치의 번호 범위
+        first, last = 0, self.matches - 1
+        if end_date:
+            end = utils._change_str_todt(end_date.replace(' ', 'T'))
+            first = max(first, -((end - _LATEST) // _INTERVAL))
+        if start_date:
+            start = utils._change_str_todt(start_date.replace(' ', 'T'))
+            last = min(last, (_LATEST - start) // _INTERVAL)
+
+        types = set(t for t in match_types.split(',') if t)
+        indexes = (i for i in range(first, last + 1)
+                   if not types or _matchtype(i) in types)
+
+        offset, limit = int(offset or 0), min(int(limit or 10), 500)
+        result = []
+        for n, i in enumerate(indexes):
+            if n >= offset + limit:
+                break
+            if n >= offset:
+                result.append(i)
+        return result
+
+    def _group(self, indexes, makematch) -> list:
+        groups = {}
+        for i in indexes:
+            groups.setdefault(_matchtype(i), []).append(makematch(i))
+        return [{'matchType': t, 'matches': m} for t, m in groups.items()]
+
+    def matchlist(self, accessid: str, **query) -> dict:
+        """유저 매치 목록 응답을 만듭니다."""
+        user = int(accessid) - _ACCESSID_BASE if accessid.isdigit() else 0
+
+        def makematch(i):
+            start, end = _times(i)
+            raw = matchinfo(i, user, start, end, _matchtype(i), self.players)
+            raw['accountNo'] = accessid
+            return raw
+
+        return {'nickName': f'닉네임{accessid}',
+                'matches': self._group(self._indexes(**query), makematch)}
+
+    def allmatches(self, **query) -> dict:
+        """전체 매치 목록 응답을 만듭니다."""
+        return {'matches': self._group(self._indexes(**query), matchid)}
+
+    def detail(self, i: int) -> dict:
+        """매치 i 의 상세 정보 응답을 만듭니다."""
+        start, end = _times(i)
+        return detail(i, start, end, _matchtype(i) == MATCH_TYPES[0],
+                      self.players)
+
+
+def _handler(server: MockServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            if server.latency:
+                time.sleep(server.latency)
+
+            headers = {}
+            token = self.headers.get('Authorization')
+            if server.token is not None and token != server.token:
+                code, raw = 403, None
+            elif server._throttle():
+                code, raw = 429, None
+                if server.retry_after is not None:
+                    headers['Retry-After'] = str(server.retry_after)
+            else:
+                url = urlsplit(self.path)
+                query = {k: v[-1] for k, v in parse_qs(
+                    url.query, keep_blank_values=True).items()}
+                try:
+                    code, raw = server._route(url.path, query)
+                except (TypeError, ValueError):
+                    code, raw = 400, None
+
+            body = b'' if raw is None else json.dumps(
+                raw, ensure_ascii=False).encode('utf8')
+
+            self.send_response(code)
+            self.send_header('Content-Type',
+                             'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m KartRider.mockserver',
+        description='가짜 카트라이더 OpenAPI 서버를 실행합니다.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='응답 지연(초)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='429 응답 확률(0~1)')
+    parser.add_argument('--fail-every', type=int, default=0,
+                        help='N 번째 요청마다 429 응답')
+    parser.add_argument('--retry-after', type=float, default=None,
+                        help='429 응답의 Retry-After(초)')
+    parser.add_argument('--matches', type=int, default=100000,
+                        help='전체 매치 수')
+    parser.add_argument('--players', type=int, default=8,
+                        help='매치당 플레이어 수')
+    parser.add_argument('--token', default=None,
+                        help='허용할 Authorization 헤더')
+    args = parser.parse_args(argv)
+
+    server = MockServer(args.host, args.port, args.latency, args.error_rate,
+                        args.retry_after, args.matches, args.players,
+                        args.token, fail_every=args.fail_every)
+    print(f'{server.url} 에서 실행 중')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
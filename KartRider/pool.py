@@ -0,0 +1,150 @@
+"""여러 API Key 로 요청을 나눠 보내는 :class:`ApiPool` 입니다.
+
+키 선택, 키별 요청 허용량, 403/429 를 받은 키의 순환 제외만 담당하고
+재시도, 이벤트 훅, 캐시는 :class:`KartRider.Api` 의 것을 그대로 씁니다.
+"""
+import threading
+import time
+from typing import List, Optional, Sequence, Union
+
+import requests
+
+from .apiwrapper import Api
+from .ratelimit import RateLimiter, _retryafter
+
+
+class _PoolKey(object):
+    __slots__ = ('token', 'ratelimiter', 'inflight', 'requests', 'errors',
+                 'until')
+
+    def __init__(self, token: str, ratelimiter: Optional[RateLimiter]):
+        self.token = token
+        self.ratelimiter = ratelimiter
+        self.inflight = 0
+        self.requests = 0
+        self.errors = 0
+        self.until = 0.0  # 이 시각(monotonic)까지 순환에서 빠집니다.
+
+    def load(self) -> tuple:
+        delay = 0.0
+        if self.ratelimiter is not None:
+            delay = self.ratelimiter.delay()
+        return (delay, self.inflight, self.requests)
+
+
+class ApiPool(Api):
+    """여러 API Key 로 요청을 나눠 보내는 :class:`KartRider.Api` 입니다.
+
+    요청마다 지금 가장 한가한 키(요청 허용량을 기다릴 시간, 처리 중인 요청
+    수, 보낸 요청 수 순서로 비교)를 고릅니다. 403 이나 429 를 받은 키는
+    cooldown 초(429 는 Retry-After 가 있으면 그 시간) 동안 순환에서 빼고
+    다른 키로 다시 보냅니다. 세션, 캐시, hooks 는 모든 키가 함께 씁니다.
+
+    Api 의 모든 메서드를 그대로 사용할 수 있습니다.
+
+    >>> with KartRider.ApiPool([KEY1, KEY2, KEY3], rate_limit=10) as api:
+    ...     api.getAllMatches(limit=500, prefetch=True)
+
+    :param accesstokens: API KEY 문자열들
+    :param rate_limit: 키 하나당 초당 요청 수, 키마다 다르면 초당 요청 수나
+        :class:`.RateLimiter` 의 리스트, None 이면 제한하지 않습니다.
+    :param cooldown: 403, 429 를 받은 키를 순환에서 뺄 시간(초)
+    :param kwargs: :class:`KartRider.Api` 의 나머지 인자
+    :raises ValueError: 키가 없거나 rate_limit 리스트의 길이가 다를때
+    """
+
+    def __init__(self, accesstokens: Sequence[str],
+                 rate_limit: Union[float, RateLimiter, Sequence, None] = None,
+                 cooldown: float = 60.0, **kwargs):
+        accesstokens = list(accesstokens)
+        if not accesstokens:
+            raise ValueError('API Key 가 없습니다.')
+
+        if isinstance(rate_limit, (list, tuple)):
+            if len(rate_limit) != len(accesstokens):
+                raise ValueError('rate_limit 의 길이가 키 수와 다릅니다.')
+            limits = list(rate_limit)
+        else:
+            limits = [rate_limit] * len(accesstokens)
+
+        Api.__init__(self, accesstokens[0], **kwargs)
+        self.cooldown = cooldown
+
+        keys = []
+        for token, limit in zip(accesstokens, limits):
+            if limit is not None and not isinstance(limit, RateLimiter):
+                limit = RateLimiter(limit)
+            keys.append(_PoolKey(token, limit))
+        self._keys = keys
+        self._lock = threading.Lock()
+
+    @property
+    def accesstokens(self) -> List[str]:
+        """사용하는 API KEY 리스트"""
+        return [key.token for key in self._keys]
+
+    def stats(self) -> List[dict]:
+        """키마다 requests, errors(403, 429 수), inflight, available 을
+        담은 dict 의 리스트를 키 순서대로 반환합니다.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [{'requests': key.requests, 'errors': key.errors,
+                     'inflight': key.inflight, 'available': key.until <= now}
+                    for key in self._keys]
+
+    def _choosekey(self) -> int:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                ready = [i for i, key in enumerate(self._keys)
+                         if key.until <= now]
+                if ready:
+                    index = min(ready, key=lambda i: self._keys[i].load())
+                    key = self._keys[index]
+                    key.inflight += 1
+                    key.requests += 1
+                    break
+                wait = min(key.until for key in self._keys) - now
+            time.sleep(wait)
+
+        if key.ratelimiter is not None:
+            key.ratelimiter.acquire()
+        return index
+
+    def _releasekey(self, index: int, res: Optional[requests.Response]):
+        key = self._keys[index]
+        with self._lock:
+            key.inflight -= 1
+            if res is None or res.status_code not in (403, 429):
+                return
+
+            key.errors += 1
+            wait = None
+            if res.status_code == 429:
+                wait = _retryafter(res.headers.get('Retry-After'))
+            if wait is None:
+                wait = self.cooldown
+            key.until = max(key.until, time.monotonic() + wait)
+
+    def _available(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            return any(key.until <= now for key in self._keys)
+
+    def _send(self, url: str, index: int) -> requests.Response:
+        return self.transport.get(
+            url, headers={'Authorization': self._keys[index].token},
+            timeout=self.timeout)
+
+    def _retrydelay(self, index: int, res: requests.Response,
+                    attempt: int) -> Optional[float]:
+        status = res.status_code
+        rotate = status == 429 or (status == 403 and self._available())
+        if not rotate:
+            return Api._retrydelay(self, index, res, attempt)
+
+        # 403, 429 는 다른 키로 바로 보내며, 키 수만큼 더 재시도합니다.
+        if attempt < self.max_retries + len(self._keys) - 1:
+            return 0.0
+        return None
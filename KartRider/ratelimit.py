@@ -0,0 +1,104 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+class RateLimiter(object):
+    """초당 요청 수를 제한하는 토큰 버킷입니다.
+
+    스레드 안전하므로 여러 :class:`KartRider.Api` 와 스레드가 하나의
+    RateLimiter 를 공유해 API Key 의 허용량을 나눠 쓸 수 있습니다.
+
+    >>> limiter = KartRider.RateLimiter(10)  # 초당 10회
+    >>> api1 = KartRider.Api(API_KEY, rate_limit=limiter)
+    >>> api2 = KartRider.Api(API_KEY, rate_limit=limiter)
+
+    :param rate: 초당 허용되는 요청 수
+    :param burst: 한번에 몰아서 보낼 수 있는 최대 요청 수, None 이면 rate
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError('rate 는 0보다 커야 합니다.')
+
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._pauseuntil = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """토큰 하나를 예약하고, 요청 전까지 기다려야 할 시간(초)을 반환합니다.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst,
+                               self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._pauseuntil - now)
+
+    def delay(self) -> float:
+        """지금 토큰을 예약하면 기다려야 할 시간(초)을 예약하지 않고
+        반환합니다.
+        """
+        with self._lock:
+            now = time.monotonic()
+            tokens = min(self.burst,
+                         self._tokens + (now - self._last) * self.rate) - 1
+            wait = 0.0 if tokens >= 0 else -tokens / self.rate
+            return max(wait, self._pauseuntil - now)
+
+    def acquire(self):
+        """요청을 보낼 수 있을 때까지 기다립니다.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """seconds 초 동안 모든 요청을 멈춥니다. (Retry-After 응답 등)
+        """
+        with self._lock:
+            self._pauseuntil = max(self._pauseuntil,
+                                   time.monotonic() + seconds)
+
+
+def _shouldretry(code: int) -> bool:
+    return code == 429 or code >= 500
+
+
+def _retryafter(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _backoff(attempt: int, base: float, retryafter: Optional[str] = None,
+             cap: float = 60.0) -> float:
+    """재시도 전에 기다릴 시간(초)을 계산합니다.
+
+    Retry-After 헤더가 있으면 그 값을, 없으면 지수 백오프에
+    full jitter 를 적용한 값을 사용합니다.
+    """
+    delay = _retryafter(retryafter)
+    if delay is not None:
+        return min(delay, cap)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
@@ -0,0 +1,123 @@
+"""응답 JSON 을 객체 속성으로 옮기는 선언적 스키마입니다.
+
+스키마는 만들때 한번만 응답 키→(속성 이름, 변환 함수) 표로 컴파일되고,
+응답 객체 하나를 한번 순회하며 이름 변경, int 변환, 빈 문자열→None 변환을
+처리합니다. 아래 변환 함수는 객체를 만들지 않고 응답을 읽는
+:mod:`.columnar`, :mod:`.stats`, :mod:`.warehouse` 도 함께 사용합니다.
+"""
+from typing import Any, Callable, Optional, Tuple
+
+
+def text(v):
+    """앞뒤 공백뿐인 문자열(과 None)은 None 으로 바꿉니다."""
+    if v is None or v.strip() == '':
+        return None
+    return v
+
+
+def integer(v):
+    """빈 문자열(과 None)은 0, 나머지는 int 로 바꿉니다."""
+    if v is None or v == '':
+        return 0
+    return int(v)
+
+
+def matchrank(v):
+    """매치 순위, 리타이어('99' 나 빈 문자열)는 -1 로 바꿉니다."""
+    if v == '99' or v == '':
+        return -1
+    return int(v)
+
+
+def matchretired(v):
+    """매치 순위 문자열로 리타이어 여부를 반환합니다."""
+    return v == '99' or v == ''
+
+
+def matchwin(v):
+    """매치 승리 여부 문자열을 bool 로 바꿉니다."""
+    return v != '0'
+
+
+def emptynone(v):
+    """빈 문자열만 None 으로 바꿉니다."""
+    if v == '':
+        return None
+    return v
+
+
+class Field(object):
+    """스키마의 필드 하나입니다.
+
+    :param key: 응답 JSON 의 키
+    :param attr: 값을 저장할 속성 이름, None 이면 key 를 소문자로 바꾼 이름
+    :param conv: 값 변환 함수, None 이면 그대로 저장합니다.
+    :param nested: True 면 conv 를 conv(api, 값) 으로 호출합니다.
+        (하위 객체를 만들때 사용)
+    """
+    __slots__ = ('key', 'attr', 'conv', 'nested')
+
+    def __init__(self, key: str, attr: Optional[str] = None,
+                 conv: Optional[Callable] = None, nested: bool = False):
+        self.key = key
+        self.attr = attr if attr is not None else key.lower()
+        self.conv = conv
+        self.nested = nested
+
+
+class Schema(object):
+    """응답 JSON 객체의 필드를 :class:`Field` 목록으로 선언한 스키마입니다.
+
+    스키마에 없는 키는 무시합니다.
+
+    >>> schema = Schema(Field('playerCount', conv=integer),
+    ...                 Field('character', 'characterid'))
+    >>> schema.apply(obj, {'playerCount': '8', 'character': 'abc'})
+    >>> obj.playercount, obj.characterid
+    (8, 'abc')
+    """
+    __slots__ = ('fields', '_table', '_byattr')
+
+    def __init__(self, *fields: Field):
+        self.fields = fields
+
+        table = {}
+        for field in fields:
+            table.setdefault(field.key, []).append(
+                (field.attr, field.conv, field.nested))
+        self._table = {k: tuple(v) for k, v in table.items()}
+        self._byattr = {field.attr: field for field in fields}
+
+    @property
+    def attrs(self) -> Tuple[str, ...]:
+        """스키마가 채우는 속성 이름"""
+        return tuple(self._byattr)
+
+    def field(self, attr: str) -> Optional[Field]:
+        """속성 이름으로 :class:`Field` 를 찾습니다. 없으면 None 입니다."""
+        return self._byattr.get(attr)
+
+    def convert(self, field: Field, value, api=None) -> Any:
+        """필드 하나의 값을 변환합니다."""
+        if field.conv is None:
+            return value
+        if field.nested:
+            return field.conv(api, value)
+        return field.conv(value)
+
+    def apply(self, obj, raw: dict, api=None):
+        """raw 의 필드를 변환해 obj 의 속성으로 저장합니다."""
+        table = self._table
+
+        for key, value in raw.items():
+            fields = table.get(key)
+            if fields is None:
+                continue
+
+            for attr, conv, nested in fields:
+                if conv is None:
+                    setattr(obj, attr, value)
+                elif nested:
+                    setattr(obj, attr, conv(api, value))
+                else:
+                    setattr(obj, attr, conv(value))
@@ -0,0 +1,286 @@
+"""매치 기록의 승률, 평균 순위, 리타이어율을 그룹별로 집계합니다.
+
+:class:`MatchStats` 는 :class:`.MatchResponse`, :class:`.AllMatches` 나
+매치 이터레이터를 한번 순회하며 카트, 트랙, 캐릭터, 매치 종류, 시간 구간별
+:class:`Aggregate` 를 쌓습니다. 집계는 더할 수 있으므로 여러 프로세스나
+샤드에서 따로 집계한 뒤 :meth:`MatchStats.merge` 로 합칠 수 있습니다.
+
+>>> stats = MatchStats(by=('kart', 'track'))
+>>> stats.add(api.getUserMatches(accessid, limit=500))
+>>> for (kart, track), agg in stats.items():
+...     print(kart, track, agg.winrate, agg.avgrank)
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+
+from . import utils
+from .match import AllMatches, MatchDetail, MatchResponse
+from .schema import integer, matchrank, matchretired, matchwin
+
+#: 그룹으로 묶을 수 있는 기준
+DIMENSIONS = ('kart', 'track', 'character', 'matchtype', 'time', 'player')
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class Aggregate(object):
+    """한 그룹의 합계입니다. 평균과 비율은 합계에서 계산합니다."""
+    __slots__ = ('count', 'wins', 'retired', 'ranksum', 'finished',
+                 'timesum')
+
+    def __init__(self):
+        self.count = 0  #: 플레이 수
+        self.wins = 0  #: 승리 수
+        self.retired = 0  #: 리타이어 수
+        self.ranksum = 0  #: 완주한 플레이의 순위 합
+        self.finished = 0  #: 완주한 플레이 수
+        self.timesum = 0  #: 완주한 플레이의 기록(ms) 합
+
+    def add(self, rank: int, win: bool, retired: bool, time: int = 0):
+        """플레이 하나를 더합니다. 리타이어는 순위와 기록을 더하지 않습니다.
+        """
+        self.count += 1
+        if win:
+            self.wins += 1
+        if retired:
+            self.retired += 1
+        else:
+            self.finished += 1
+            self.ranksum += rank
+            self.timesum += time
+
+    def merge(self, other: 'Aggregate') -> 'Aggregate':
+        """other 의 합계를 더하고 자신을 반환합니다."""
+        self.count += other.count
+        self.wins += other.wins
+        self.retired += other.retired
+        self.ranksum += other.ranksum
+        self.finished += other.finished
+        self.timesum += other.timesum
+        return self
+
+    @property
+    def winrate(self) -> Optional[float]:
+        """승률, 플레이가 없으면 None"""
+        return self.wins / self.count if self.count else None
+
+    @property
+    def retirerate(self) -> Optional[float]:
+        """리타이어율, 플레이가 없으면 None"""
+        return self.retired / self.count if self.count else None
+
+    @property
+    def avgrank(self) -> Optional[float]:
+        """완주한 플레이의 평균 순위, 완주가 없으면 None"""
+        return self.ranksum / self.finished if self.finished else None
+
+    @property
+    def avgtime(self) -> Optional[float]:
+        """완주한 플레이의 평균 기록(ms), 완주가 없으면 None"""
+        return self.timesum / self.finished if self.finished else None
+
+    def todict(self) -> dict:
+        return {'count': self.count, 'wins': self.wins,
+                'retired': self.retired, 'winrate': self.winrate,
+                'retirerate': self.retirerate, 'avgrank': self.avgrank,
+                'avgtime': self.avgtime}
+
+    def __eq__(self, other):
+        if not isinstance(other, Aggregate):
+            return NotImplemented
+        return all(getattr(self, k) == getattr(other, k)
+                   for k in self.__slots__)
+
+    def __repr__(self):
+        return (f'Aggregate(count={self.count}, winrate={self.winrate}, '
+                f'avgrank={self.avgrank}, retirerate={self.retirerate})')
+
+
+# 플레이 하나: (kart, track, character, matchtype, endtime, player,
+#               rank, win, retired, time)
+def _rawmatchrows(matcheslist: list) -> Iterator[tuple]:
+    # 유저 매치 목록 응답의 matches 를 객체를 만들지 않고 바로 읽습니다.
+    for group in matcheslist:
+        for m in group['matches']:
+            p = m['player']
+            rank = p.get('matchRank', '')
+            yield (p.get('kart'), m.get('trackId'), m.get('character'),
+                   m.get('matchType'), m.get('endTime'), m.get('accountNo'),
+                   matchrank(rank), matchwin(p.get('matchWin')),
+                   matchretired(rank), integer(p.get('matchTime')))
+
+
+def _detailrows(detail) -> Iterator[tuple]:
+    if detail.isteamgame:
+        players = [p for team in detail.teams for p in team]
+    else:
+        players = detail.players
+
+    for p in players:
+        yield (p.kartid, detail.trackid, p.characterid, detail.matchtypeid,
+               detail.endtime, p.accountno, p.matchrank, p.matchwin,
+               p.matchretired, p.matchtime)
+
+
+def _matchinforows(match) -> Iterator[tuple]:
+    p = match.player
+    yield (p.kartid, match.trackid, match.characterid, match.matchtypeid,
+           match.endtime, match.accountno, p.matchrank, p.matchwin,
+           p.matchretired, p.matchtime)
+
+
+def _rows(matches) -> Iterator[tuple]:
+    if isinstance(matches, MatchResponse):
+        yield from _rawmatchrows(matches._matcheslist)
+        return
+    if isinstance(matches, AllMatches):
+        matches = matches.mergevalues()
+
+    for match in matches:
+        if isinstance(match, MatchDetail):
+            yield from _detailrows(match)
+        else:
+            yield from _matchinforows(match)
+
+
+class MatchStats(object):
+    """매치 기록을 그룹별 :class:`Aggregate` 로 집계합니다.
+
+    MatchResponse 는 응답 JSON 을 바로 읽어 MatchInfo 를 만들지 않으며,
+    AllMatches 와 MatchDetail 은 모든 플레이어를, MatchInfo 는 검색한
+    유저의 플레이를 집계합니다. AllMatches 는 먼저
+    :meth:`KartRider.Api.prefetch_details` 로 상세 정보를 받아오세요.
+
+    :param by: 그룹 기준, :data:`DIMENSIONS` 중에서 고릅니다.
+        키는 각 기준의 ID(시간은 구간의 시작 시각 datetime)의 튜플입니다.
+    :param bucket: 'time' 기준의 구간 길이(초 또는 timedelta)
+    :raises ValueError: 없는 기준이거나 'time' 기준에 bucket 이 없을때
+    """
+
+    def __init__(self, by: Sequence[str] = ('kart',),
+                 bucket: Optional[float] = None):
+        by = tuple(by)
+        for dim in by:
+            if dim not in DIMENSIONS:
+                raise ValueError(f'없는 그룹 기준입니다: {dim}')
+        if 'time' in by and not bucket:
+            raise ValueError("'time' 기준은 bucket 이 필요합니다.")
+
+        if isinstance(bucket, timedelta):
+            bucket = bucket.total_seconds()
+
+        self.by = by
+        self.bucket = bucket
+        self.total = Aggregate()  #: 모든 플레이의 합계
+        self._groups = {}
+        # 플레이 튜플은 DIMENSIONS 순서로 시작합니다.
+        self._index = tuple(DIMENSIONS.index(d) for d in by)
+
+    def _timekey(self, endtime) -> Optional[datetime]:
+        if endtime is None:
+            return None
+        if type(endtime) is str:
+            endtime = utils._change_str_todt(endtime)
+        seconds = (endtime - _EPOCH).total_seconds()
+        return _EPOCH + timedelta(seconds=seconds // self.bucket * self.bucket)
+
+    def add(self, matches) -> 'MatchStats':
+        """매치들을 집계에 더하고 자신을 반환합니다.
+
+        :param matches: MatchResponse, AllMatches 또는 MatchInfo,
+            MatchInfoView, MatchDetail 의 이터레이터
+        """
+        groups = self._groups
+        index = self._index
+        total = self.total
+        timepos = self.by.index('time') if 'time' in self.by else -1
+        timekeys = {}
+
+        for row in _rows(matches):
+            key = [row[i] for i in index]
+            if timepos >= 0:
+                endtime = key[timepos]
+                tk = timekeys.get(endtime)
+                if tk is None:
+                    tk = timekeys[endtime] = self._timekey(endtime)
+                key[timepos] = tk
+            key = tuple(key)
+
+            agg = groups.get(key)
+            if agg is None:
+                agg = groups[key] = Aggregate()
+
+            rank, win, retired, time = row[6:]
+            agg.add(rank, win, retired, time)
+            total.add(rank, win, retired, time)
+
+        return self
+
+    def merge(self, other: 'MatchStats') -> 'MatchStats':
+        """같은 기준으로 집계한 other 를 더하고 자신을 반환합니다.
+
+        :raises ValueError: 그룹 기준이나 bucket 이 다를때
+        """
+        if other.by != self.by or other.bucket != self.bucket:
+            raise ValueError('그룹 기준이 다른 집계는 합칠 수 없습니다.')
+
+        for key, agg in other._groups.items():
+            mine = self._groups.get(key)
+            if mine is None:
+                mine = self._groups[key] = Aggregate()
+            mine.merge(agg)
+        self.total.merge(other.total)
+        return self
+
+    def __len__(self):
+        return len(self._groups)
+
+    def __getitem__(self, key) -> Aggregate:
+        if not isinstance(key, tuple):
+            key = (key,)
+        return self._groups[key]
+
+    def __contains__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        return key in self._groups
+
+    def items(self) -> Iterable[Tuple[tuple, Aggregate]]:
+        """(그룹 키, Aggregate) 를 순회합니다."""
+        return self._groups.items()
+
+    def top(self, n: int = 10, key: str = 'winrate',
+            min_count: int = 1) -> list:
+        """key 가 큰 순서로 n 개의 (그룹 키, Aggregate) 를 반환합니다.
+
+        :param key: Aggregate 의 속성 이름 (winrate, avgrank, count 등)
+        :param min_count: 이보다 적게 플레이한 그룹은 제외합니다.
+        """
+        items = [(k, agg) for k, agg in self._groups.items()
+                 if agg.count >= min_count and getattr(agg, key) is not None]
+        items.sort(key=lambda item: getattr(item[1], key), reverse=True)
+        return items[:n]
+
+    def to_rows(self) -> list:
+        """그룹 하나당 기준 값과 :meth:`Aggregate.todict` 를 합친 dict 의
+        리스트를 반환합니다.
+
+        :rtype: list(dict)
+        """
+        rows = []
+        for key, agg in self._groups.items():
+            row = dict(zip(self.by, key))
+            row.update(agg.todict())
+            rows.append(row)
+        return rows
+
+    def to_pandas(self):
+        """:meth:`to_rows` 를 pandas.DataFrame 으로 반환합니다.
+
+        :rtype: pandas.DataFrame
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.to_rows(),
+                            columns=list(self.by) + list(
+                                Aggregate().todict()))
@@ -0,0 +1,175 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional, Union
+
+from . import utils
+from .match import MatchInfo
+
+dtstr = Union[datetime, str]
+
+
+class MatchSync(object):
+    """유저의 매치 기록을 증분 동기화해 sqlite 에 저장합니다.
+
+    accessid 와 매치 종류마다 마지막으로 본 매치의 endTime, matchId
+    (high-water mark)를 저장해 두고, 다음 동기화에서는 그 시간 이후의
+    매치만 start_date 로 요청합니다. 이미 저장된 매치는 건너뜁니다.
+
+    >>> sync = KartRider.MatchSync(api, 'matches.sqlite3')
+    >>> new = sync.sync(accessid)  # 새 매치만 MatchInfo 리스트로 반환
+    >>> allmatches = sync.matches(accessid)
+
+    :param api: 매치를 요청할 :class:`KartRider.Api`
+    :param path: sqlite 데이터베이스 파일 경로
+    :param page_size: 한번에 요청할 매치 수 (최대 500건)
+    """
+
+    def __init__(self, api, path: str, page_size: int = 500):
+        self._api = api
+        self.path = path
+        self.page_size = page_size
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            'CREATE TABLE IF NOT EXISTS watermarks ('
+            'accessid TEXT NOT NULL, matchtypes TEXT NOT NULL, '
+            'endtime TEXT NOT NULL, matchid TEXT NOT NULL, '
+            'PRIMARY KEY (accessid, matchtypes));'
+            'CREATE TABLE IF NOT EXISTS matches ('
+            'accessid TEXT NOT NULL, matchid TEXT NOT NULL, '
+            'matchtype TEXT NOT NULL, endtime TEXT NOT NULL, '
+            'data TEXT NOT NULL, PRIMARY KEY (accessid, matchid));'
+            'CREATE INDEX IF NOT EXISTS matches_endtime '
+            'ON matches (accessid, endtime);')
+        self._conn.commit()
+
+    def close(self):
+        """데이터베이스 연결을 닫습니다.
+        """
+        with self._lock:
+            self._conn.close()
+
+    def watermark(self, accessid: str,
+                  match_types: Union[List[str], str] = "") -> Optional[tuple]:
+        """저장된 (endTime, matchId) 를 반환합니다. 없으면 None 입니다.
+
+        :param accessid: 유저의 accessid
+        :param match_types: 매치 타입 이름이나 ID (리스트 또는 단일 문자열)
+        """
+        with self._lock:
+            return self._conn.execute(
+                'SELECT endtime, matchid FROM watermarks '
+                'WHERE accessid = ? AND matchtypes = ?',
+                (accessid, utils._convMt(match_types))).fetchone()
+
+    def sync(self, accessid: str,
+             match_types: Union[List[str], str] = "") -> List[MatchInfo]:
+        """high-water mark 이후의 새 매치를 받아와 저장합니다.
+
+        :param accessid: 유저의 accessid
+        :param match_types: 매치 타입 이름이나 ID (리스트 또는 단일 문자열)
+        :return: 새로 저장된 매치 정보 리스트
+        :rtype: list(MatchInfo)
+        """
+        match_types = utils._convMt(match_types)
+        mark = self.watermark(accessid, match_types)
+
+        start_date = ''
+        if mark is not None:
+            start_date = utils._change_dt_tostr(
+                utils._change_str_todt(mark[0]))
+
+        offset = 0
+        fetched = []
+
+        while True:
+            raw = self._api._getMatchlist(accessid, start_date, '', offset,
+                                          self.page_size, match_types)
+            count = 0
+            for group in raw['matches']:
+                for match in group['matches']:
+                    fetched.append((group['matchType'], match))
+                count += len(group['matches'])
+
+            offset += count
+            if count < self.page_size:
+                break
+
+        return self._store(accessid, match_types, fetched, mark)
+
+    def sync_many(self, accessids: Iterable[str],
+                  match_types: Union[List[str], str] = "") -> dict:
+        """여러 유저를 차례로 동기화합니다.
+
+        :return: accessid 를 키로, 새 매치 정보 리스트를 값으로 하는 dict
+        :rtype: dict
+        """
+        return {accessid: self.sync(accessid, match_types)
+                for accessid in accessids}
+
+    def _store(self, accessid, match_types, fetched, mark):
+        new = []
+
+        with self._lock:
+            seen = set()
+            for matchtype, match in fetched:
+                matchid = match['matchId']
+                if matchid in seen:
+                    continue
+                seen.add(matchid)
+
+                if self._conn.execute(
+                        'SELECT 1 FROM matches WHERE accessid = ? '
+                        'AND matchid = ?', (accessid, matchid)).fetchone():
+                    continue
+
+                new.append((matchtype, match))
+
+            rows = [(accessid, match['matchId'], matchtype, match['endTime'],
+                     json.dumps(match, ensure_ascii=False))
+                    for matchtype, match in new]
+            self._conn.executemany(
+                'INSERT INTO matches VALUES (?, ?, ?, ?, ?)', rows)
+
+            if new:
+                latest = max(new, key=lambda m: m[1]['endTime'])[1]
+                if mark is None or latest['endTime'] >= mark[0]:
+                    self._conn.execute(
+                        'INSERT OR REPLACE INTO watermarks '
+                        'VALUES (?, ?, ?, ?)',
+                        (accessid, match_types, latest['endTime'],
+                         latest['matchId']))
+            self._conn.commit()
+
+        return [MatchInfo._fromraw(self._api, match) for _, match in new]
+
+    def matches(self, accessid: str, start_date: dtstr = "",
+                end_date: dtstr = "") -> List[MatchInfo]:
+        """저장된 유저의 매치를 최신순으로 반환합니다.
+
+        :param accessid: 유저의 accessid
+        :param start_date: 조회 시작 날짜(UTC)
+        :param end_date: 조회 끝 날짜(UTC)
+        :rtype: list(MatchInfo)
+        """
+        query = 'SELECT data FROM matches WHERE accessid = ?'
+        params = [accessid]
+
+        # endTime 은 고정 길이 ISO 형식이라 문자열 비교로 충분합니다.
+        start_date, end_date = utils._convStEt(start_date, end_date)
+        if start_date != '':
+            query += ' AND endtime >= ?'
+            params.append(start_date.replace(' ', 'T'))
+        if end_date != '':
+            query += ' AND endtime <= ?'
+            params.append(end_date.replace(' ', 'T'))
+
+        with self._lock:
+            rows = self._conn.execute(query + ' ORDER BY endtime DESC',
+                                      params).fetchall()
+
+        return [MatchInfo._fromraw(self._api, json.loads(row[0]))
+                for row in rows]
@@ -0,0 +1,155 @@
+"""Api 가 요청을 보내는 전송 계층입니다.
+
+:class:`KartRider.Api` 는 ``get(url, headers=..., timeout=...)`` 으로
+``status_code``, ``headers``, ``content``, ``close()`` 를 가진 응답을 반환하는
+객체라면 무엇이든 transport 로 사용할 수 있습니다. 기본값은 Api 의
+requests.Session 입니다.
+
+:class:`RecordTransport` 는 받은 응답을 폴더에 저장하고,
+:class:`ReplayTransport` 는 저장된 응답을 네트워크 없이 돌려줍니다.
+
+>>> rec = KartRider.RecordTransport('recordings')
+>>> with KartRider.Api(API_KEY, transport=rec) as api:
+...     api.getAllMatches(limit=100)
+>>> replay = KartRider.ReplayTransport('recordings')
+>>> api = KartRider.Api('', transport=replay)
+>>> api.getAllMatches(limit=100)  # 네트워크 요청 없음
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+#: 녹화할 응답 헤더
+RECORDED_HEADERS = ('Content-Type', 'Retry-After', 'ETag', 'Last-Modified')
+
+
+def _recordname(url: str) -> str:
+    return hashlib.sha1(url.encode('utf8')).hexdigest() + '.json'
+
+
+class RecordedResponse(object):
+    """녹화된 응답입니다. requests.Response 에서 Api 가 사용하는 속성만
+    가지고 있습니다.
+
+    :param url: 요청 URL
+    :param status_code: 응답 코드
+    :param content: 응답 본문
+    :param headers: 응답 헤더
+    """
+    __slots__ = ('url', 'status_code', 'content', 'headers')
+
+    def __init__(self, url: str, status_code: int, content: bytes,
+                 headers: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers or {})
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf8')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        pass
+
+
+def save_response(path: str, url: str, status_code: int, content: bytes,
+                  headers: Optional[Dict[str, str]] = None):
+    """응답 하나를 path 폴더에 :class:`ReplayTransport` 가 읽는 형식으로
+    저장합니다.
+
+    :param path: 녹화 폴더 경로
+    :param url: 요청 URL
+    :param status_code: 응답 코드
+    :param content: 응답 본문(UTF-8)
+    :param headers: 응답 헤더
+    """
+    os.makedirs(path, exist_ok=True)
+
+    record = {'url': url, 'status': status_code,
+              'headers': dict(headers or {}),
+              'body': content.decode('utf8')}
+
+    with open(os.path.join(path, _recordname(url)), 'w',
+              encoding='utf8') as f:
+        json.dump(record, f, ensure_ascii=False)
+
+
+class RecordTransport(object):
+    """실제로 요청을 보내고, 받은 응답을 폴더에 저장하는 transport 입니다.
+
+    같은 URL 을 다시 요청하면 마지막 응답으로 덮어씁니다.
+    Authorization 헤더는 저장하지 않습니다.
+
+    :param path: 녹화 폴더 경로
+    :param transport: 실제 요청을 보낼 transport, None 이면
+        requests.Session 을 새로 만듭니다.
+    """
+
+    def __init__(self, path: str, transport=None):
+        self.path = path
+        self._transport = transport
+        if transport is None:
+            self._transport = requests.Session()
+        self._lock = threading.Lock()
+
+    def get(self, url: str, headers=None, timeout=None):
+        res = self._transport.get(url, headers=headers, timeout=timeout)
+
+        recorded = {k: res.headers[k] for k in RECORDED_HEADERS
+                    if k in res.headers}
+        with self._lock:
+            save_response(self.path, url, res.status_code, res.content,
+                          recorded)
+        return res
+
+    def close(self):
+        self._transport.close()
+
+
+class ReplayTransport(object):
+    """:class:`RecordTransport` 가 저장한 응답을 돌려주는 transport 입니다.
+
+    네트워크 요청을 보내지 않으므로 API KEY 없이 테스트와 벤치마크를
+    재현할 수 있습니다. 녹화는 처음 요청할때 한번만 읽어 메모리에 둡니다.
+
+    :param path: 녹화 폴더 경로
+    :raises LookupError: 녹화되지 않은 URL 을 요청함
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.requests = 0  #: 응답한 요청 수
+        self._records = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str, headers=None, timeout=None) -> RecordedResponse:
+        with self._lock:
+            record = self._records.get(url)
+
+            if record is None:
+                filepath = os.path.join(self.path, _recordname(url))
+                try:
+                    with open(filepath, encoding='utf8') as f:
+                        raw = json.load(f)
+                except FileNotFoundError:
+                    raise LookupError(f'녹화되지 않은 요청입니다: {url}')
+
+                record = (raw['status'], raw['body'].encode('utf8'),
+                          raw['headers'])
+                self._records[url] = record
+
+            self.requests += 1
+
+        return RecordedResponse(url, *record)
+
+    def close(self):
+        pass
@@ -29,7 +29,9 @@ class User(_BaseData):
     .. note:: api가 None 이고 name, accessid 중 하나만 입력했다면
         나머지 하나를 호출할때 ValueError가 던져집니다.
         api가 None 이 아니라면 나머지 하나를 호출할때
-        api를 사용합니다.
+        api를 사용합니다. api가 AsyncApi 라면 RuntimeError가 던져지므로
+        await AsyncApi.user(...) 로 만드세요. getMatches 는 그대로
+        await 할 수 있습니다.
 
 
     :raises ValueError: name 과 accessid 모두 입력하지 않음
@@ -39,6 +41,8 @@ class User(_BaseData):
     :param accessid: 카트라이더 내부 유저 id 문자열(계정 id가 아님)
     """
 
+    __slots__ = ('_api', '_name', '_accessid')
+
     def __init__(self, api=None,
                  name: str = None, accessid: str = None):
         if name is None and accessid is None:
@@ -54,6 +58,7 @@ class User(_BaseData):
         """플레이어 닉네임
 
         :raises ValueError: api가 None인데 호출함
+        :raises RuntimeError: api가 AsyncApi 인데 호출함
         """
         if self._name is None:
             if self._api is None:
@@ -66,6 +71,7 @@ class User(_BaseData):
         """플레이어 고유 ID
 
         :raises ValueError: api가 None인데 호출함
+        :raises RuntimeError: api가 AsyncApi 인데 호출함
         """
         if self._accessid is None:
             if self._api is None:
@@ -76,7 +82,9 @@ class User(_BaseData):
     def getMatches(self, start_date: dtstr = "",
                    end_date: dtstr = "", offset: int = 0,
                    limit: int = 10,
-                   match_types: Union[List[str], str] = "") -> mr:
+                   match_types: Union[List[str], str] = "",
+                   prefetch: bool = False,
+                   lazy: bool = False) -> mr:
         """유저의 매치 데이터를 받아옵니다.
 
         :param start_date: 조회 시작 날짜(UTC)
@@ -84,6 +92,8 @@ class User(_BaseData):
         :param offset: 조회 오프셋
         :param limit: 조회 수 (최대 500건)
         :param match_types: 매치 타입 이름이나 ID (리스트 또는 단일 문자열)
+        :param prefetch: True 면 각 매치의 상세 정보를 동시에 미리 받아옵니다.
+        :param lazy: True 면 매치 정보를 호출할때 변환합니다.
 
         :raises ValueError: api가 None인데 호출함
         :raises InvalidToken: 잘못된 Token이나 파라미터 입력
@@ -97,5 +107,6 @@ class User(_BaseData):
         if self._api is None:
             raise ValueError('api 가 None 이지만 호출하려 했습니다.')
 
-        return self._api.getUserMatches(self.accessid, start_date, end_date,
-                                        offset, limit, match_types)
+        # accessid 는 api 가 변환합니다. (AsyncApi 는 await 로 변환합니다)
+        return self._api.getUserMatches(self, start_date, end_date, offset,
+                                        limit, match_types, prefetch, lazy)
@@ -1,13 +1,53 @@
+import json
 from datetime import datetime
+from typing import Any, Callable, Union
+
 from . import metadata as md
 
+#: 'auto' 일때 설치되어 있는지 확인하는 JSON 디코더 순서
+JSON_DECODERS = ('orjson', 'msgspec', 'ujson', 'json')
+
+JsonDecoder = Union[str, Callable[[bytes], Any]]
+
 
 def _change_dt_tostr(dt: datetime):
     format = '%Y-%m-%d %H:%M:%S'
     return dt.strftime(format)
 
 
+# python 3.7 이상
+_fromisoformat = getattr(datetime, 'fromisoformat', None)
+
+
 def _change_str_todt(date: str):
+    # API 의 시간은 항상 '%Y-%m-%dT%H:%M:%S' 또는 뒤에 '.%f' 가 붙은 형식이므로
+    # 형식만 확인하고 strptime 대신 fromisoformat 이나 고정된 위치를 잘라
+    # 변환합니다.
+    n = len(date)
+    fast = 19 <= n <= 26 and date[10] == 'T'
+    fast = fast and date[4] == date[7] == '-' and date[13] == date[16] == ':'
+    if fast and n > 19:
+        fast = date[19] == '.' and date[20:].isdigit()
+
+    if fast:
+        # 3.11 미만의 fromisoformat 은 소수점 아래 3, 6자리만 지원합니다.
+        if _fromisoformat is not None and n in (19, 23, 26):
+            try:
+                return _fromisoformat(date)
+            except ValueError:
+                pass
+        try:
+            return datetime(int(date[0:4]), int(date[5:7]),
+                            int(date[8:10]), int(date[11:13]),
+                            int(date[14:16]), int(date[17:19]),
+                            int(date[20:].ljust(6, '0')) if n > 19 else 0)
+        except ValueError:
+            pass
+
+    return _strptime_todt(date)
+
+
+def _strptime_todt(date: str):
     format = '%Y-%m-%dT%H:%M:%S'
     try:
         dt = datetime.strptime(date, format)
@@ -18,6 +58,18 @@ def _change_str_todt(date: str):
     return dt
 
 
+def _change_strs_todt64(dates):
+    """ISO 형식 시간 문자열 리스트를 numpy datetime64[ms] 배열로 바꿉니다.
+
+    None 은 NaT 가 됩니다.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError('numpy 가 필요합니다.')
+    return np.array(dates, dtype='datetime64[ms]')
+
+
 def _convMt(mt):
     if mt != '':
         if type(mt) is str:
@@ -53,3 +105,36 @@ def _convStEt(st, et):
     if et != '' and type(et) is datetime:
         et = _change_dt_tostr(et)
     return st, et
+
+
+def _jsondecoder(decoder: JsonDecoder = 'auto') -> Callable[[bytes], Any]:
+    """bytes 를 받아 디코딩하는 JSON 디코더 함수를 반환합니다.
+
+    :param decoder: 'auto', 'orjson', 'msgspec', 'ujson', 'json' 또는
+        bytes 를 받는 함수. 'auto' 면 설치된 가장 빠른 디코더를 사용합니다.
+    :raises ImportError: 지정한 디코더가 설치되지 않았을때
+    :raises ValueError: 알 수 없는 디코더 이름
+    """
+    if callable(decoder):
+        return decoder
+
+    names = JSON_DECODERS if decoder == 'auto' else (decoder,)
+
+    for name in names:
+        try:
+            if name == 'orjson':
+                import orjson
+                return orjson.loads
+            elif name == 'msgspec':
+                import msgspec
+                return msgspec.json.decode
+            elif name == 'ujson':
+                import ujson
+                return ujson.loads
+            elif name == 'json':
+                return json.loads
+        except ImportError:
+            if decoder != 'auto':
+                raise
+
+    raise ValueError(f'알 수 없는 JSON 디코더 {decoder}')
@@ -0,0 +1,415 @@
+"""받아온 매치를 sqlite 에 쌓아 두고 API 없이 다시 조회하는 저장소입니다.
+
+:class:`MatchWarehouse` 는 매치 상세 정보와 유저 매치 목록의 응답 JSON 을
+그대로 저장하고, 검색에 쓰이는 accountNo, trackId, kartId, startTime 과
+매치 종류를 색인한 열로 따로 저장합니다. 조회 결과는
+:class:`.MatchDetail`, :class:`.AllMatches`, :class:`.MatchResponse` 로
+반환됩니다.
+
+:class:`.DetailCache` 와 같은 get/set 을 가지므로 Api 의 detail_cache 로
+지정하면 받아오는 모든 상세 정보가 함께 저장됩니다.
+
+>>> warehouse = KartRider.MatchWarehouse('warehouse.sqlite3', api)
+>>> warehouse.add_details(api.getAllMatches(limit=500))
+>>> warehouse.add_usermatches(api.getUserMatches(accessid, limit=500))
+>>> warehouse.details(track='빌리지 고가의 질주', start_date='2021-01-01')
+"""
+import json
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterable, List, Optional, Union
+
+from . import utils
+from .leaderboard import _toid
+from .match import AllMatches, MatchDetail, MatchResponse
+from .schema import integer, matchrank
+from .utils import JsonDecoder, _jsondecoder
+
+dtstr = Union[datetime, str]
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS details ('
+    'matchid TEXT PRIMARY KEY, matchtype TEXT NOT NULL, trackid TEXT, '
+    'gamespeed INTEGER, starttime TEXT, endtime TEXT, data BLOB NOT NULL);'
+    'CREATE INDEX IF NOT EXISTS details_starttime '
+    'ON details (starttime);'
+    'CREATE INDEX IF NOT EXISTS details_matchtype '
+    'ON details (matchtype, starttime);'
+    'CREATE INDEX IF NOT EXISTS details_trackid '
+    'ON details (trackid, starttime);'
+    'CREATE TABLE IF NOT EXISTS players ('
+    'matchid TEXT NOT NULL, accountno TEXT NOT NULL, kartid TEXT, '
+    'characterid TEXT, matchrank INTEGER, matchtime INTEGER, '
+    'starttime TEXT, PRIMARY KEY (matchid, accountno));'
+    'CREATE INDEX IF NOT EXISTS players_accountno '
+    'ON players (accountno, starttime);'
+    'CREATE INDEX IF NOT EXISTS players_kartid '
+    'ON players (kartid, starttime);'
+    'CREATE TABLE IF NOT EXISTS usermatches ('
+    'accountno TEXT NOT NULL, matchid TEXT NOT NULL, '
+    'matchtype TEXT NOT NULL, trackid TEXT, kartid TEXT, characterid TEXT, '
+    'starttime TEXT, endtime TEXT, nickname TEXT, data BLOB NOT NULL, '
+    'PRIMARY KEY (accountno, matchid));'
+    'CREATE INDEX IF NOT EXISTS usermatches_starttime '
+    'ON usermatches (accountno, starttime);'
+    'CREATE INDEX IF NOT EXISTS usermatches_trackid '
+    'ON usermatches (trackid, starttime);'
+    'CREATE INDEX IF NOT EXISTS usermatches_kartid '
+    'ON usermatches (kartid, starttime);'
+)
+
+
+def _detailplayers(raw: dict) -> list:
+    if 'teams' in raw:
+        return [p for team in raw['teams'] for p in team['players']]
+    return raw.get('players', [])
+
+
+class _Query(object):
+    # WHERE 절과 인자를 함께 쌓습니다.
+    def __init__(self, table: str):
+        self.table = table
+        self.where = []
+        self.params = []
+
+    def add(self, clause: str, *params):
+        self.where.append(clause)
+        self.params.extend(params)
+
+    def dates(self, start_date: dtstr, end_date: dtstr):
+        # startTime 은 고정 길이 ISO 형식이라 문자열 비교로 충분합니다.
+        start_date, end_date = utils._convStEt(start_date, end_date)
+        if start_date != '':
+            self.add(f'{self.table}.starttime >= ?',
+                     start_date.replace(' ', 'T'))
+        if end_date != '':
+            self.add(f'{self.table}.starttime <= ?',
+                     end_date.replace(' ', 'T'))
+
+    def matchtypes(self, match_types: Union[List[str], str]):
+        ids = [i for i in utils._convMt(match_types).split(',') if i]
+        if ids:
+            marks = ', '.join('?' * len(ids))
+            self.add(f'{self.table}.matchtype IN ({marks})', *ids)
+
+    def sql(self, select: str, order: str, limit: Optional[int]) -> str:
+        sql = select
+        if self.where:
+            sql += ' WHERE ' + ' AND '.join(self.where)
+        sql += f' ORDER BY {order}'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            self.params.append(limit)
+        return sql
+
+
+class MatchWarehouse(object):
+    """매치 상세 정보와 유저 매치 목록을 저장하는 sqlite 저장소입니다.
+
+    추가는 호출 한번이 트랜잭션 하나이며, 이미 저장된 매치는 건너뜁니다.
+
+    :param path: sqlite 데이터베이스 파일 경로
+    :param api: 상세 정보를 받아오고 조회 결과 객체에 넣을
+        :class:`KartRider.Api`, None 이면 저장된 정보만 사용합니다.
+    :param json_decoder: 저장된 데이터를 읽을때 사용할 JSON 디코더
+    """
+
+    def __init__(self, path: str, api=None,
+                 json_decoder: JsonDecoder = 'auto'):
+        self.path = path
+        self._api = api
+        self._decode = _jsondecoder(json_decoder)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        """데이터베이스 연결을 닫습니다.
+        """
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        """저장된 상세 정보 수"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM details').fetchone()[0]
+
+    def __contains__(self, matchid):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT 1 FROM details WHERE matchid = ?',
+                (matchid,)).fetchone() is not None
+
+    def get(self, matchid: str) -> Optional[dict]:
+        """저장된 상세 정보 JSON 을 반환합니다. 없으면 None 을 반환합니다.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM details WHERE matchid = ?',
+                (matchid,)).fetchone()
+        return None if row is None else self._loads(row[0])
+
+    def set(self, matchid: str, raw: dict):
+        """상세 정보 JSON 하나를 저장합니다.
+        """
+        self.add_details([raw])
+
+    def _insertdetails(self, raws: list) -> int:
+        detailrows = []
+        playerrows = []
+
+        for raw in raws:
+            matchid = raw['matchId']
+            start = raw.get('startTime')
+            detailrows.append((
+                matchid, raw.get('matchType', ''), raw.get('trackId'),
+                raw.get('gameSpeed'), start, raw.get('endTime'),
+                json.dumps(raw, ensure_ascii=False).encode('utf8')))
+            playerrows.extend(
+                (matchid, p.get('accountNo'), p.get('kart'),
+                 p.get('character'), matchrank(p.get('matchRank', '')),
+                 integer(p.get('matchTime')), start)
+                for p in _detailplayers(raw))
+
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO details VALUES (?, ?, ?, ?, ?, ?, ?)',
+                detailrows)
+            added = self._conn.total_changes - before
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO players VALUES (?, ?, ?, ?, ?, ?, ?)',
+                playerrows)
+
+        return added
+
+    def _stored(self, matchids: Iterable[str]) -> set:
+        matchids = list(matchids)
+        stored = set()
+        with self._lock:
+            # sqlite 의 인자 수 제한보다 작게 나눠 조회합니다.
+            for i in range(0, len(matchids), 500):
+                chunk = matchids[i:i + 500]
+                marks = ', '.join('?' * len(chunk))
+                stored.update(row[0] for row in self._conn.execute(
+                    f'SELECT matchid FROM details WHERE matchid IN ({marks})',
+                    chunk))
+        return stored
+
+    def add_details(self, details, max_workers: int = 8) -> int:
+        """매치 상세 정보들을 한 트랜잭션으로 저장합니다.
+
+        상세 정보를 받아온 MatchDetail 은 그 응답 JSON 을 그대로 저장하고,
+        저장되지 않은 매치 중 상세 정보를 받아오지 않은 MatchDetail 이나
+        매치 ID 만 api 로 최대 max_workers 개씩 동시에 받아옵니다.
+
+        :param details: :class:`.AllMatches` 또는 :class:`.MatchDetail`,
+            매치 ID, 상세 정보 응답 JSON 들
+        :param max_workers: 동시에 보낼 최대 요청 수
+        :return: 새로 저장된 매치 수
+        :rtype: int
+        :raises ValueError: 받아와야 할 매치가 있는데 api 가 없을때
+        """
+        if isinstance(details, AllMatches):
+            details = details.mergevalues()
+
+        raws = {}
+        pending = []
+        for detail in details:
+            if isinstance(detail, dict):
+                raws[detail['matchId']] = detail
+            elif isinstance(detail, MatchDetail):
+                if detail.raw is not None:
+                    raws[detail.matchid] = detail.raw
+                else:
+                    pending.append(detail.matchid)
+            else:
+                pending.append(detail)
+
+        stored = self._stored(set(pending) | set(raws))
+        pending = [m for m in dict.fromkeys(pending)
+                   if m not in stored and m not in raws]
+        raws = [raw for matchid, raw in raws.items() if matchid not in stored]
+
+        if pending:
+            if self._api is None:
+                raise ValueError('상세 정보를 받아올 api 가 없습니다.')
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                raws.extend(executor.map(self._fetch, pending))
+
+        return self._insertdetails(raws) if raws else 0
+
+    def _fetch(self, matchid: str) -> dict:
+        # Api 의 detail_cache 가 이 저장소면 캐시를 거칠때 set 으로 따로
+        # 저장되므로 바로 요청합니다.
+        if self._api.detail_cache is self:
+            return self._api._getjson(
+                self._api.base_url + f'matches/{matchid}')
+        return self._api._getMatchDetails(matchid)
+
+    def add_usermatches(self, response: MatchResponse) -> int:
+        """유저 매치 목록 응답을 한 트랜잭션으로 저장합니다.
+
+        :param response: :meth:`KartRider.Api.getUserMatches` 의 결과
+        :return: 새로 저장된 매치 수
+        :rtype: int
+        """
+        rows = []
+        for group in response._matcheslist:
+            matchtype = group['matchType']
+            for m in group['matches']:
+                p = m.get('player', {})
+                rows.append((
+                    m.get('accountNo'), m['matchId'], matchtype,
+                    m.get('trackId'), p.get('kart'), m.get('character'),
+                    m.get('startTime'), m.get('endTime'), response.nickname,
+                    json.dumps(m, ensure_ascii=False).encode('utf8')))
+
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO usermatches '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            return self._conn.total_changes - before
+
+    def _loads(self, data: Union[bytes, str]) -> dict:
+        # 디코더는 bytes 를 받습니다. 이전 버전은 데이터를 TEXT 로
+        # 저장했습니다.
+        if isinstance(data, str):
+            data = data.encode('utf8')
+        return self._decode(data)
+
+    def _todetail(self, data: bytes) -> MatchDetail:
+        raw = self._loads(data)
+        detail = MatchDetail(self._api, raw['matchId'])
+        detail._setdetail(raw)
+        return detail
+
+    def detail(self, matchid: str) -> Optional[MatchDetail]:
+        """저장된 매치의 :class:`.MatchDetail` 을 반환합니다.
+        없으면 None 을 반환합니다.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM details WHERE matchid = ?',
+                (matchid,)).fetchone()
+        return None if row is None else self._todetail(row[0])
+
+    def _selectdetails(self, start_date, end_date, match_types, track, kart,
+                       accessid, limit) -> list:
+        query = _Query('details')
+        select = 'SELECT details.data FROM details'
+
+        query.dates(start_date, end_date)
+        query.matchtypes(match_types)
+        if track is not None:
+            query.add('details.trackid = ?', _toid(track, 'track'))
+        if accessid is not None or kart is not None:
+            # 조건에 맞는 플레이어가 있는 매치만 고릅니다.
+            sub = []
+            if accessid is not None:
+                sub.append('players.accountno = ?')
+                query.params.append(accessid)
+            if kart is not None:
+                sub.append('players.kartid = ?')
+                query.params.append(_toid(kart, 'kart'))
+            query.where.append(
+                'details.matchid IN (SELECT players.matchid FROM players '
+                'WHERE ' + ' AND '.join(sub) + ')')
+
+        sql = query.sql(select, 'details.starttime DESC', limit)
+        with self._lock:
+            return self._conn.execute(sql, query.params).fetchall()
+
+    def details(self, start_date: dtstr = "", end_date: dtstr = "",
+                match_types: Union[List[str], str] = "",
+                track: Optional[str] = None, kart: Optional[str] = None,
+                accessid: Optional[str] = None,
+                limit: Optional[int] = None) -> List[MatchDetail]:
+        """조건에 맞는 저장된 매치를 최신순으로 반환합니다.
+
+        :param start_date: 조회 시작 날짜(UTC)
+        :param end_date: 조회 끝 날짜(UTC)
+        :param match_types: 매치 타입 이름이나 ID (리스트 또는 단일 문자열)
+        :param track: 트랙 ID 또는 이름
+        :param kart: 이 카트를 탄 플레이어가 있는 매치만, ID 또는 이름
+        :param accessid: 이 유저가 참여한 매치만
+        :param limit: 최대 매치 수
+        :rtype: list(MatchDetail)
+        """
+        rows = self._selectdetails(start_date, end_date, match_types, track,
+                                   kart, accessid, limit)
+        return [self._todetail(row[0]) for row in rows]
+
+    def allmatches(self, start_date: dtstr = "", end_date: dtstr = "",
+                   match_types: Union[List[str], str] = "",
+                   track: Optional[str] = None,
+                   limit: Optional[int] = None) -> AllMatches:
+        """조건에 맞는 저장된 매치를 :class:`.AllMatches` 로 반환합니다.
+        각 MatchDetail 은 상세 정보를 가진 상태입니다.
+
+        :rtype: AllMatches
+        """
+        rows = self._selectdetails(start_date, end_date, match_types, track,
+                                   None, None, limit)
+        raws = [self._loads(row[0]) for row in rows]
+
+        groups = {}
+        for raw in raws:
+            groups.setdefault(raw['matchType'], []).append(raw['matchId'])
+        matches = AllMatches(self._api, matches=[
+            {'matchType': mt, 'matches': ids} for mt, ids in groups.items()])
+
+        byid = {raw['matchId']: raw for raw in raws}
+        for detail in matches.mergevalues():
+            detail._setdetail(byid[detail.matchid])
+        return matches
+
+    def usermatches(self, accessid: str, start_date: dtstr = "",
+                    end_date: dtstr = "",
+                    match_types: Union[List[str], str] = "",
+                    track: Optional[str] = None, kart: Optional[str] = None,
+                    limit: Optional[int] = None,
+                    lazy: bool = False) -> MatchResponse:
+        """저장된 유저의 매치 목록을 최신순 :class:`.MatchResponse` 로
+        반환합니다.
+
+        :param accessid: 유저의 accessid
+        :param track: 트랙 ID 또는 이름
+        :param kart: 카트 ID 또는 이름
+        :param lazy: True 면 :class:`.MatchInfoView` 로 만듭니다.
+        :rtype: MatchResponse
+        """
+        query = _Query('usermatches')
+        query.add('usermatches.accountno = ?', accessid)
+        query.dates(start_date, end_date)
+        query.matchtypes(match_types)
+        if track is not None:
+            query.add('usermatches.trackid = ?', _toid(track, 'track'))
+        if kart is not None:
+            query.add('usermatches.kartid = ?', _toid(kart, 'kart'))
+
+        sql = query.sql('SELECT matchtype, nickname, data FROM usermatches',
+                        'usermatches.starttime DESC', limit)
+        with self._lock:
+            rows = self._conn.execute(sql, query.params).fetchall()
+
+        groups = {}
+        nickname = rows[0][1] if rows else None
+        for matchtype, _, data in rows:
+            groups.setdefault(matchtype, []).append(self._loads(data))
+
+        return MatchResponse(self._api, nickname, [
+            {'matchType': mt, 'matches': matches}
+            for mt, matches in groups.items()], lazy)
@@ -0,0 +1,39 @@
+"""API 시간 문자열 변환 속도를 strptime 과 비교합니다.
+
+    $ python -m benchmarks.bench_dates
+"""
+import timeit
+
+from KartRider import utils
+
+DATES = ['2019-12-16T13:%02d:%02d' % (i // 60 % 60, i % 60)
+         for i in range(1000)]
+DATES_MS = [d + '.%03d' % (i % 1000) for i, d in enumerate(DATES)]
+
+
+def bench(name, func, dates, number=20):
+    t = min(timeit.repeat(lambda: [func(d) for d in dates],
+                          number=number, repeat=3)) / number / len(dates)
+    print(f'{name:<32}{t * 1e9:8.0f} ns/str')
+    return t
+
+
+def main():
+    for label, dates in (('no fraction', DATES), ('milliseconds', DATES_MS)):
+        print(label)
+        old = bench('  strptime', utils._strptime_todt, dates)
+        new = bench('  _change_str_todt', utils._change_str_todt, dates)
+        print(f'  speedup x{old / new:.1f}')
+
+    try:
+        utils._change_strs_todt64(DATES_MS)
+    except ImportError:
+        return
+
+    t = min(timeit.repeat(lambda: utils._change_strs_todt64(DATES_MS),
+                          number=20, repeat=3)) / 20 / len(DATES_MS)
+    print(f'{"  _change_strs_todt64 (batch)":<32}{t * 1e9:8.0f} ns/str')
+
+
+if __name__ == '__main__':
+    main()
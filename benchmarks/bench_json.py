@@ -0,0 +1,45 @@
+"""응답 JSON 디코딩 속도를 디코더별로 비교합니다.
+
+    $ python -m benchmarks.bench_json
+"""
+import json
+import timeit
+
+from KartRider import utils
+from tests import payloads
+
+PAYLOADS = {
+    'users/{id}/matches (500)': payloads.user_matches(500),
+    'matches/all (500)': payloads.all_matches(500),
+    'matches/{id}': payloads.detail(0),
+}
+
+
+def bench(decode, data, number):
+    return min(timeit.repeat(lambda: decode(data), number=number,
+                             repeat=3)) / number
+
+
+def main():
+    decoders = {'json (text)': lambda b: json.loads(b.decode('utf8'))}
+
+    for name in utils.JSON_DECODERS:
+        try:
+            decoders[name] = utils._jsondecoder(name)
+        except ImportError:
+            print(f'{name}: 설치되지 않음')
+
+    for label, raw in PAYLOADS.items():
+        data = json.dumps(raw, ensure_ascii=False).encode('utf8')
+        number = max(10, 2000000 // len(data))
+        print(f'{label}: {len(data) / 1024:.1f} KiB')
+
+        base = None
+        for name, decode in decoders.items():
+            t = bench(decode, data, number)
+            base = base or t
+            print(f'  {name:<12}{t * 1e6:10.1f} us  x{base / t:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""매치 데이터 객체의 메모리 사용량을 측정합니다.
+
+    $ python -m benchmarks.bench_memory
+"""
+import gc
+import os
+import tracemalloc
+
+from KartRider import metadata
+from KartRider.match import AllMatches, MatchResponse
+from tests import payloads
+
+PAGES = 4
+PAGE_SIZE = 500
+
+
+def build():
+    responses = []
+    details = []
+
+    for page in range(PAGES):
+        offset = page * PAGE_SIZE
+        raw = payloads.user_matches(PAGE_SIZE, offset)
+        responses.append(MatchResponse(None, raw['nickName'],
+                                       raw['matches']))
+
+        am = AllMatches(None, **payloads.all_matches(PAGE_SIZE, offset))
+        for detail in am.mergevalues():
+            detail._setdetail(payloads.detail(
+                payloads.matchindex(detail.matchid)))
+        details.append(am)
+
+    return responses, details
+
+
+def count_by_type(lazy):
+    """응답 JSON 을 미리 디코딩해 두고, 매치 종류별 수를 세는데 드는
+    메모리를 측정합니다."""
+    raws = [payloads.user_matches(PAGE_SIZE, page * PAGE_SIZE)
+            for page in range(PAGES)]
+
+    gc.collect()
+    tracemalloc.start()
+    counts = {}
+    for raw in raws:
+        mr = MatchResponse(None, raw['nickName'], raw['matches'], lazy)
+        for mt, matches in mr.items():
+            counts[mt] = counts.get(mt, 0) + len(matches)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    metadata.set_metadatapath(os.path.join('tests', 'metadata'))
+
+    gc.collect()
+    tracemalloc.start()
+    data = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    matches = PAGES * PAGE_SIZE
+    players = matches * (1 + 8)
+    print(f'{matches} MatchInfo + {matches} MatchDetail '
+          f'({players} Player): {current / 2 ** 20:.2f} MiB, '
+          f'{current / players:.0f} B/player')
+
+    for lazy in (False, True):
+        peak = count_by_type(lazy)
+        print(f'count by match type, lazy={lazy}: '
+              f'peak {peak / 2 ** 10:.0f} KiB')
+    return data
+
+
+if __name__ == '__main__':
+    main()
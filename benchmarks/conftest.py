@@ -0,0 +1,35 @@
+"""벤치마크용 녹화 응답과 Api 를 준비합니다.
+
+녹화는 benchmarks/recordings.py 로 만들며, KARTRIDER_RECORDINGS 환경 변수에
+:class:`KartRider.RecordTransport` 로 같은 URL 을 녹화한 폴더를 지정하면 그
+녹화를 대신 사용합니다.
+"""
+import os
+
+import pytest
+
+from KartRider import Api, ReplayTransport, metadata
+
+from benchmarks.recordings import METADATA_PATH, record_payloads
+
+
+@pytest.fixture(scope='session')
+def recordings(tmp_path_factory):
+    path = os.environ.get('KARTRIDER_RECORDINGS')
+    if path is None:
+        path = str(tmp_path_factory.mktemp('recordings'))
+        record_payloads(path)
+    return path
+
+
+@pytest.fixture
+def api(recordings):
+    with Api('', transport=ReplayTransport(recordings),
+             user_cache_ttl=None) as api:
+        yield api
+
+
+@pytest.fixture(scope='session')
+def metadatapath():
+    metadata.set_metadatapath(METADATA_PATH)
+    return METADATA_PATH
@@ -0,0 +1,49 @@
+"""벤치마크가 요청하는 URL 의 녹화 응답을 tests/payloads.py 로 만듭니다.
+
+    $ python -m benchmarks.recordings recordings
+"""
+import json
+import os
+import sys
+
+from KartRider.apiwrapper import _API_URL, _allmatchesurl, _matchlisturl
+from KartRider.transport import save_response
+from tests import payloads
+
+METADATA_PATH = os.path.join(os.path.dirname(__file__), os.pardir, 'tests',
+                             'metadata')
+
+NICKNAME = '닉네임0'
+ACCESSID = payloads.accessid(0)
+PAGE_SIZE = 500
+ALL_MATCHES = 1800
+DETAILS = 50
+
+
+def _save(path, url, raw):
+    save_response(path, url, 200,
+                  json.dumps(raw, ensure_ascii=False).encode('utf8'),
+                  {'Content-Type': 'application/json; charset=utf-8'})
+
+
+def record_payloads(path):
+    """벤치마크가 요청하는 URL 의 응답을 path 폴더에 녹화합니다."""
+    _save(path, _API_URL + f'users/nickname/{NICKNAME}',
+          {'accessId': ACCESSID, 'name': NICKNAME, 'level': 1})
+    _save(path, _API_URL + f'users/{ACCESSID}',
+          {'accessId': ACCESSID, 'name': NICKNAME, 'level': 1})
+    _save(path, _matchlisturl(ACCESSID, '', '', 0, PAGE_SIZE, ''),
+          payloads.user_matches(PAGE_SIZE))
+
+    for offset in range(0, ALL_MATCHES + 1, PAGE_SIZE):
+        count = max(0, min(PAGE_SIZE, ALL_MATCHES - offset))
+        _save(path, _allmatchesurl('', '', offset, PAGE_SIZE, ''),
+              payloads.all_matches(count, offset))
+
+    for i in range(DETAILS):
+        _save(path, _API_URL + f'matches/{payloads.matchid(i)}',
+              payloads.detail(i))
+
+
+if __name__ == '__main__':
+    record_payloads(sys.argv[1])
@@ -0,0 +1,70 @@
+"""녹화된 응답으로 네트워크 없이 파싱과 클라이언트 비용을 측정합니다.
+
+pytest-benchmark 가 필요합니다.
+
+    $ python -m pytest benchmarks
+    $ python -m pytest benchmarks --benchmark-compare  # 이전 결과와 비교
+"""
+import pytest
+
+from KartRider import metadata, utils
+from KartRider.match import MatchDetail
+from tests import payloads
+
+from benchmarks.recordings import (ACCESSID, ALL_MATCHES, DETAILS,
+                                   NICKNAME, PAGE_SIZE)
+
+pytest.importorskip('pytest_benchmark')
+
+
+def test_user(benchmark, api):
+    user = benchmark(api.user, NICKNAME)
+    assert user.accessid == ACCESSID
+
+
+def test_user_matches(benchmark, api):
+    mr = benchmark(api.getUserMatches, ACCESSID, limit=PAGE_SIZE)
+    assert sum(len(v) for v in mr.values()) == PAGE_SIZE
+
+
+def test_user_matches_lazy(benchmark, api):
+    mr = benchmark(api.getUserMatches, ACCESSID, limit=PAGE_SIZE, lazy=True)
+    assert sum(len(v) for v in mr.values()) == PAGE_SIZE
+
+
+def test_all_matches(benchmark, api):
+    am = benchmark(api.getAllMatches, limit=PAGE_SIZE)
+    assert len(list(am.mergevalues())) == PAGE_SIZE
+
+
+def test_match_detail(benchmark, api):
+    matchids = [payloads.matchid(i) for i in range(DETAILS)]
+
+    def getdetails():
+        details = [MatchDetail(api, matchid) for matchid in matchids]
+        for detail in details:
+            detail._getdetail()
+        return details
+
+    details = benchmark(getdetails)
+    assert all(d.isteamgame for d in details)
+
+
+def test_iter_all_matches(benchmark, api):
+    def paginate():
+        return sum(1 for _ in api.iter_all_matches(page_size=PAGE_SIZE))
+
+    assert benchmark(paginate) == ALL_MATCHES
+
+
+def test_metadata_lookup(benchmark, metadatapath):
+    ids = [payloads._ids('track')[i % len(payloads._ids('track'))]
+           for i in range(1000)]
+    names = benchmark(lambda: [metadata.gettrackname(i) for i in ids])
+    assert len(names) == 1000
+
+
+def test_change_str_todt(benchmark):
+    dates = [payloads.detail(i)['startTime'] for i in range(1000)]
+    dts = benchmark(lambda: [utils._change_str_todt(d) for d in dates])
+    assert dts[1].second == 43
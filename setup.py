@@ -24,5 +24,11 @@ setup(
         'Topic :: Software Development :: Libraries :: Python Modules'
     ],
     install_requires=['requests'],
+    extras_require={'async': ['aiohttp'],
+                    'columnar': ['numpy', 'pandas', 'pyarrow'],
+                    'fast': ['orjson'],
+                    'bench': ['pytest', 'pytest-benchmark'],
+                    'prometheus': ['prometheus_client'],
+                    'opentelemetry': ['opentelemetry-api']},
     python_requires='>=3.6'
 )
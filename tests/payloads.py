@@ -0,0 +1,74 @@
+"""OpenAPI 응답 형식을 따르는 테스트용 가짜 응답 데이터입니다.
+
+응답은 :mod:`KartRider.mockserver` 의 생성기로 만들고, ID 는 이름 변환을
+확인할 수 있도록 tests/metadata 의 ID 를 사용합니다.
+"""
+import json
+import os
+
+from KartRider import mockserver
+
+_meta = {}
+
+
+def _ids(datatype):
+    if datatype not in _meta:
+        path = os.path.join(os.path.dirname(__file__), 'metadata',
+                            datatype + '.json')
+        with open(path, encoding='utf8') as f:
+            _meta[datatype] = [item['id'] for item in json.load(f)]
+    return _meta[datatype]
+
+
+def _metaid(kind, i):
+    ids = _ids(kind)
+    return ids[i % len(ids)]
+
+
+SPEED_TEAM, SPEED_SOLO = mockserver.MATCH_TYPES
+
+matchid = mockserver.matchid
+accessid = mockserver.accessid
+
+
+def matchindex(matchid):
+    return int(matchid, 16) - 0x02f10015820b0000
+
+
+def player(i, rank=1):
+    return mockserver.player(i, rank, _metaid)
+
+
+def _times(i):
+    minute = i % 60
+    return (f'2019-12-16T13:{minute:02d}:43.879',
+            f'2019-12-16T13:{minute:02d}:45.268')
+
+
+def detail(i, players=8, teamgame=True):
+    start, end = _times(i)
+    return mockserver.detail(i, start, end, teamgame, players, _metaid)
+
+
+def matchinfo(i, user=0):
+    start, end = _times(i)
+    return mockserver.matchinfo(i, user, start, end, SPEED_TEAM, 8, _metaid)
+
+
+def user_matches(count=10, offset=0, user=0):
+    return {
+        'nickName': f'닉네임{user}',
+        'matches': [{
+            'matchType': SPEED_TEAM,
+            'matches': [matchinfo(offset + i, user) for i in range(count)],
+        }] if count else [],
+    }
+
+
+def all_matches(count=10, offset=0):
+    return {
+        'matches': [{
+            'matchType': SPEED_TEAM,
+            'matches': [matchid(offset + i) for i in range(count)],
+        }] if count else [],
+    }
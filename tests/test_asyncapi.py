@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from KartRider import AsyncApi, NotFound, User
+from KartRider.match import MatchDetail
+
+from . import payloads
+
+pytest.importorskip('aiohttp')
+
+
+def test_asyncapi(monkeypatch):
+    api = AsyncApi('key', max_concurrency=4)
+    urls = []
+
+    async def getjson(url):
+        urls.append(url)
+        await asyncio.sleep(0)
+        if '/matches/all' in url:
+            return payloads.all_matches(10)
+        if '/users/nickname/' in url:
+            return {'accessId': payloads.accessid(0)}
+        if '/users/' in url:
+            return payloads.user_matches(3)
+        return payloads.detail(payloads.matchindex(url.rsplit('/', 1)[1]))
+
+    monkeypatch.setattr(api, '_getjson', getjson)
+
+    async def run():
+        am = await api.getAllMatches(limit=10, prefetch=True)
+        mr = await api.getUserMatches('1560546859', prefetch=True)
+        detail = await api.getMatchDetail(payloads.matchid(1))
+        return am, mr, detail
+
+    # 3.6 에는 asyncio.run 이 없습니다.
+    loop = asyncio.new_event_loop()
+    try:
+        am, mr, detail = loop.run_until_complete(run())
+
+        assert len(urls) == 1 + 10 + 1 + 3 + 1
+        assert all(d.isteamgame for d in am.mergevalues())
+        assert list(mr.mergevalues())[2].detail.playtime == 109
+        assert detail.matchid == payloads.matchid(1)
+
+        lazy = MatchDetail(api, payloads.matchid(20))
+        with pytest.raises(RuntimeError):
+            lazy.players
+        assert loop.run_until_complete(api.load_detail(lazy)) is lazy
+        assert lazy.matchid == payloads.matchid(20) and len(urls) == 17
+        loop.run_until_complete(api.load_detail(lazy))
+        assert len(urls) == 17
+
+        user = User(api, '닉네임')
+        with pytest.raises(RuntimeError):
+            user.accessid
+        urls.clear()
+        mr = loop.run_until_complete(user.getMatches())
+        assert len(list(mr.mergevalues())) == 3
+        assert urls[0].endswith('/users/nickname/닉네임')
+        assert payloads.accessid(0) in urls[1]
+        assert user.accessid == payloads.accessid(0)
+    finally:
+        loop.close()
+
+
+def test_async_users_matches_cancel(monkeypatch):
+    api = AsyncApi('key')
+
+    async def getjson(url):
+        if url.endswith('/nickname/없는닉네임'):
+            raise NotFound()
+        if '/users/nickname/' in url:
+            return {'accessId': payloads.accessid(0)}
+        if payloads.accessid(1) in url:
+            raise NotFound()
+        if payloads.accessid(2) in url:
+            raise asyncio.CancelledError()
+        return payloads.user_matches(3)
+
+    monkeypatch.setattr(api, '_getjson', getjson)
+
+    loop = asyncio.new_event_loop()
+    try:
+        res = loop.run_until_complete(api.getUsersMatches(
+            [payloads.accessid(0), payloads.accessid(1)], accessid=True))
+        assert list(res) == [payloads.accessid(0)]
+        assert isinstance(res.errors[payloads.accessid(1)], NotFound)
+
+        user = User(api, '닉네임')
+        res = loop.run_until_complete(api.getUsersMatches(
+            [User(api, '없는닉네임'), user]))
+        assert list(res) == [payloads.accessid(0)]
+        assert user.accessid == payloads.accessid(0)
+        assert isinstance(res.errors['없는닉네임'], NotFound)
+
+        with pytest.raises(asyncio.CancelledError):
+            loop.run_until_complete(api.getUsersMatches(
+                [payloads.accessid(i) for i in range(3)], accessid=True))
+    finally:
+        loop.close()
@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+
+from KartRider import (Api, DetailCache, MetricsCollector, NotFound,
+                       SingleFlight, TTLCache)
+from KartRider.match import MatchDetail
+from KartRider.transport import RecordedResponse
+
+from . import payloads
+
+
+def test_detail_cache(tmp_path, monkeypatch):
+    path = str(tmp_path / 'details.sqlite3')
+    cache = DetailCache(path)
+    api = Api('key', detail_cache=cache)
+    urls = []
+
+    class Response(object):
+        def __init__(self, url):
+            self.content = json.dumps(
+                payloads.detail(payloads.matchindex(url[-16:]))).encode()
+
+    def getresponse(url):
+        urls.append(url)
+        return Response(url)
+
+    monkeypatch.setattr(api, '_getresponse', getresponse)
+
+    assert MatchDetail(api, payloads.matchid(1)).playtime == 109
+    assert MatchDetail(api, payloads.matchid(1)).playtime == 109
+    assert len(urls) == 1
+    assert cache.stats()['hits'] == 1 and cache.misses == 1
+
+    # 읽기는 사용 시각을 모아 두기만 하고 쓰기 트랜잭션을 만들지 않습니다.
+    changes = cache._conn.total_changes
+    for _ in range(5):
+        cache.get(payloads.matchid(1))
+    assert cache._conn.total_changes == changes
+    cache.flush()
+    assert cache._conn.total_changes == changes + 1
+    cache.close()
+
+    cache = DetailCache(path, max_size=None)
+    assert cache.get(payloads.matchid(1)) == payloads.detail(1)
+
+    for i in range(2, 12):
+        cache.set(payloads.matchid(i), payloads.detail(i))
+    cache.max_size = cache.size // 2
+    cache.set(payloads.matchid(12), payloads.detail(12))
+
+    assert cache.size <= cache.max_size
+    assert payloads.matchid(12) in cache
+    assert payloads.matchid(2) not in cache
+    cache.close()
+
+
+def test_user_cache(monkeypatch):
+    api = Api('key')
+    urls = []
+
+    class Response(object):
+        content = json.dumps({'accessId': '1560546859',
+                              'name': '한글닉네임'}).encode()
+
+    def getresponse(url):
+        urls.append(url)
+        return Response()
+
+    monkeypatch.setattr(api, '_getresponse', getresponse)
+
+    assert api.user(nickname='한글닉네임').accessid == '1560546859'
+    assert api.user(accessid='1560546859').name == '한글닉네임'
+    api.user('한글닉네임', '1560546859')
+    assert len(urls) == 1
+    assert api.usercache.stats()['hits'] == 2
+
+    api.invalidate_user(accessid='1560546859')
+    assert len(api.usercache) == 0
+    api.user(nickname='한글닉네임')
+    assert len(urls) == 2
+
+    cache = TTLCache(maxsize=2, ttl=0)
+    cache.set('a', 1)
+    assert cache.get('a') is None
+
+    cache.ttl = 60
+    for key in 'abc':
+        cache.set(key, key)
+    assert cache.get('a') is None and cache.get('c') == 'c'
+
+
+def test_single_flight():
+    class Slow(object):
+        def __init__(self, status=200):
+            self.status = status
+            self.calls = 0
+
+        def get(self, url, headers=None, timeout=None):
+            self.calls += 1
+            time.sleep(0.2)
+            body = json.dumps(payloads.detail(0)).encode()
+            return RecordedResponse(url, self.status, body, {})
+
+    def burst(api, n=8):
+        barrier = threading.Barrier(n)
+        results = []
+
+        def run():
+            barrier.wait()
+            try:
+                results.append(api._getMatchDetails(payloads.matchid(0)))
+            except NotFound as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    network = Slow()
+    metrics = MetricsCollector()
+    api = Api('key', transport=network, hooks=[metrics])
+    results = burst(api)
+    assert network.calls == 1
+    assert all(r is results[0] for r in results)
+    assert api.singleflight.shared == 7 and len(api.singleflight) == 0
+    snap = metrics.snapshot()
+    assert snap['endpoints']['matches']['coalesced'] == 7
+    assert snap['caches'] == {}
+
+    burst(api)
+    assert network.calls == 2
+
+    network = Slow(404)
+    api = Api('key', transport=network, max_retries=0)
+    results = burst(api)
+    assert network.calls == 1
+    assert all(isinstance(r, NotFound) for r in results)
+    # 기다린 호출은 먼저 실행한 호출의 예외를 복사해서 받습니다.
+    assert len(set(map(id, results))) == 8
+    leader = [r for r in results if r.__cause__ is None]
+    assert len(leader) == 1
+    assert all(r.__cause__ is leader[0] for r in results if r is not leader[0])
+
+    network = Slow()
+    api = Api('key', transport=network, single_flight=False)
+    burst(api, 4)
+    assert network.calls == 4
+
+    flight = SingleFlight()
+    assert flight.do('key', lambda: 1) == (1, False)
@@ -0,0 +1,42 @@
+import pytest
+from KartRider import columnar
+from KartRider.match import AllMatches, MatchResponse
+
+from . import payloads
+
+
+def test_columnar():
+    raw = payloads.user_matches(5)
+    mr = MatchResponse(None, raw['nickName'], raw['matches'])
+    cols = mr.to_columns()
+    infos = list(mr.mergevalues())
+
+    assert cols['matchid'] == [m.detail.matchid for m in infos]
+    assert cols['kartid'] == [m.player.kartid for m in infos]
+    assert cols['matchrank'] == [m.player.matchrank for m in infos]
+    assert cols['playercount'] == [8] * 5
+
+    am = AllMatches(None, **payloads.all_matches(3))
+    for detail in am.mergevalues():
+        detail._setdetail(payloads.detail(
+            payloads.matchindex(detail.matchid)))
+    assert am.to_columns()['matchid'] == [payloads.matchid(i)
+                                          for i in range(3)]
+
+    fromobjs = am.to_columns(details=True)
+    fromraw = columnar.detail_columns(payloads.detail(i) for i in range(3))
+    assert len(fromraw['matchid']) == 24
+    assert fromobjs['kartid'] == fromraw['kartid']
+    assert fromobjs['teamid'] == fromraw['teamid']
+    assert fromobjs['matchretired'] == fromraw['matchretired']
+
+    pd = pytest.importorskip('pandas')
+    df = mr.to_pandas()
+    assert isinstance(df['trackid'].dtype, pd.CategoricalDtype)
+    assert df['starttime'].dtype == 'datetime64[ms]'
+    assert df['starttime'][0] == infos[0].starttime
+
+    pa = pytest.importorskip('pyarrow')
+    table = columnar.to_arrow(fromraw)
+    assert pa.types.is_dictionary(table.schema.field('kartid').type)
+    assert table.schema.field('endtime').type == pa.timestamp('ms')
@@ -57,3 +57,340 @@ def test_mergedict():
                           wegweg=['f', 'g', 'h', 'i'])
 
     assert tc == list(mdict.mergevalues())
+
+
+def test_metastore_invalidate(tmp_path, monkeypatch):
+    import json
+    import shutil
+
+    shutil.copy(os.path.join('tests', 'metadata', 'kart.json'), tmp_path)
+    kartid = next(iter(metadata.getkartsdict()))
+
+    monkeypatch.setattr(metadata, '_MTIME_CHECK_INTERVAL', 0)
+    metadata.set_metadatapath(str(tmp_path))
+
+    try:
+        name = metadata.getkartname(kartid)
+        assert metadata.getkartid(name) == kartid
+
+        with open(tmp_path / 'kart.json', 'w', encoding='utf8') as f:
+            json.dump([{'id': kartid, 'name': 'changed'}], f)
+        st = os.stat(tmp_path / 'kart.json')
+        os.utime(tmp_path / 'kart.json', ns=(st.st_atime_ns,
+                                             st.st_mtime_ns + 10 ** 9))
+
+        assert metadata.getkartname(kartid) == 'changed'
+        assert metadata.getkartid(name) == 'Unknown'
+    finally:
+        metadata.set_metadatapath(os.path.join('tests', 'metadata'))
+
+    assert metadata.getkartname(kartid) == name
+
+
+def test_api_session():
+    from KartRider import Api
+
+    with Api('key', pool_maxsize=3, timeout=5) as api:
+        adapter = api._session.get_adapter('https://api.nexon.co.kr')
+        assert adapter._pool_maxsize == 3
+        assert api.timeout == 5
+
+
+def test_prefetch_details(monkeypatch):
+    import threading
+    from KartRider import Api
+    from KartRider.match import AllMatches
+    from . import payloads
+
+    api = Api('key')
+    calls = []
+    lock = threading.Lock()
+
+    def getdetail(matchid):
+        with lock:
+            calls.append(matchid)
+        return payloads.detail(payloads.matchindex(matchid))
+
+    monkeypatch.setattr(api, '_getMatchDetails', getdetail)
+
+    am = AllMatches(api, **payloads.all_matches(20))
+    details = list(am.mergevalues())
+    api.prefetch_details(details + details[:5], max_workers=4)
+
+    assert sorted(calls) == sorted(d.matchid for d in details)
+    assert all(d.isteamgame for d in details)
+    assert details[3].teams[0][0].kartid == payloads.detail(3)[
+        'teams'][0]['players'][0]['kart']
+
+    api.prefetch_details(details)
+    assert len(calls) == 20
+
+
+def test_iter_matches(monkeypatch):
+    from KartRider import Api
+    from . import payloads
+
+    api = Api('key')
+    offsets = []
+
+    def matchlist(id, st, et, offset, limit, mt):
+        offsets.append(offset)
+        return payloads.user_matches(min(limit, 25 - offset), offset)
+
+    def allmatchlist(st, et, offset, limit, mt):
+        offsets.append(offset)
+        return payloads.all_matches(min(limit, 20 - offset), offset)
+
+    monkeypatch.setattr(api, '_getMatchlist', matchlist)
+    monkeypatch.setattr(api, '_getAllMatchlist', allmatchlist)
+
+    matches = list(api.iter_user_matches('1560546859', page_size=10))
+    assert [m.trackid for m in matches] == [
+        payloads.matchinfo(i)['trackId'] for i in range(25)]
+    assert offsets == [0, 10, 20]
+
+    offsets.clear()
+    details = list(api.iter_all_matches(page_size=10))
+    assert [d.matchid for d in details] == [
+        payloads.matchid(i) for i in range(20)]
+    assert offsets == [0, 10, 20]
+
+
+def test_slots():
+    from KartRider.match import AllMatches, MatchResponse
+    from . import payloads
+
+    raw = payloads.user_matches(2)
+    info = next(MatchResponse(None, raw['nickName'],
+                              raw['matches']).mergevalues())
+    detail = next(AllMatches(None, **payloads.all_matches(1)).mergevalues())
+    detail._setdetail(dict(payloads.detail(0), newField='x'))
+
+    for obj in (info, info.player, detail, detail.teams[0][0],
+                User(None, 'a', '1')):
+        assert not hasattr(obj, '__dict__')
+
+    assert info.seasontype is None
+    assert detail.isteamgame and detail.channelname == 'speedTeamFast'
+    with pytest.raises(AttributeError):
+        detail.players
+
+
+def test_change_str_todt():
+    from datetime import datetime
+
+    assert utils._change_str_todt('2019-12-16T13:20:45') == datetime(
+        2019, 12, 16, 13, 20, 45)
+    assert utils._change_str_todt('2019-12-16T13:20:45.268') == datetime(
+        2019, 12, 16, 13, 20, 45, 268000)
+    assert utils._change_str_todt('2019-12-16T13:20:45.2') == datetime(
+        2019, 12, 16, 13, 20, 45, 200000)
+
+    for wrong in ('2019-13-16T13:20:45', '2019-12-16 13:20:45',
+                  '2019-12-16T13:20:45.', '2019-12-16'):
+        with pytest.raises(ValueError):
+            utils._change_str_todt(wrong)
+
+    np = pytest.importorskip('numpy')
+    dates = utils._change_strs_todt64(['2019-12-16T13:20:45.268', None])
+    assert dates[0] == np.datetime64('2019-12-16T13:20:45.268')
+    assert np.isnat(dates[1])
+
+
+def test_lazy_views():
+    from KartRider.basedata import LazyList
+    from KartRider.match import AllMatches, MatchInfo, MatchResponse
+    from . import payloads
+
+    raw = payloads.user_matches(5)
+    eager = list(MatchResponse(None, raw['nickName'],
+                               raw['matches']).mergevalues())
+    lazy = MatchResponse(None, raw['nickName'], raw['matches'], lazy=True)
+    matches = next(iter(lazy.values()))
+
+    assert isinstance(matches, LazyList) and len(matches) == 5
+    assert matches._items is None
+
+    for e, v in zip(eager, lazy.mergevalues()):
+        for attr in ('accountno', 'characterid', 'playercount', 'trackid',
+                     'starttime', 'endtime', 'seasontype', 'character',
+                     'track', 'matchtype'):
+            assert getattr(e, attr) == getattr(v, attr)
+        assert e.player.kartid == v.player.kartid
+        assert e.detail.matchid == v.detail.matchid
+
+    assert matches[1] is matches[1]
+    assert matches[1].player is matches[1].player
+    assert isinstance(matches[2].materialize(), MatchInfo)
+    assert [m.trackid for m in matches[3:]] == [
+        payloads.matchinfo(i)['trackId'] for i in (3, 4)]
+    with pytest.raises(AttributeError):
+        matches[0].unknown
+
+    am = AllMatches(None, lazy=True, **payloads.all_matches(4))
+    details = list(am.mergevalues())
+    assert [d.matchid for d in details] == [payloads.matchid(i)
+                                            for i in range(4)]
+    assert next(am.mergevalues()) is details[0]
+
+
+def test_json_decoder(tmp_path):
+    import json
+    from KartRider import Api
+
+    assert utils._jsondecoder('json') is json.loads
+    assert utils._jsondecoder(len) is len
+    with pytest.raises(ValueError):
+        utils._jsondecoder('yaml')
+
+    calls = []
+
+    def decoder(data):
+        calls.append(data)
+        return json.loads(data)
+
+    kartid = next(iter(metadata.getkartsdict()))
+    metadata.set_json_decoder(decoder)
+    try:
+        assert metadata.getkartid(metadata.getkartname(kartid)) == kartid
+        assert len(calls) == 1 and isinstance(calls[0], bytes)
+    finally:
+        metadata.set_json_decoder()
+
+    api = Api('key', json_decoder='json')
+    assert api._decode is json.loads
+
+
+def test_users_matches(monkeypatch):
+    from KartRider import Api, NotFound, User
+    from . import payloads
+
+    api = Api('key')
+    urls = []
+
+    def getjson(url):
+        urls.append(url)
+        if '/nickname/' in url:
+            nickname = url.rsplit('/', 1)[1]
+            if nickname == '없는닉네임':
+                raise NotFound
+            return {'accessId': payloads.accessid(int(nickname[-1])),
+                    'name': nickname}
+        user = [i for i in range(4) if payloads.accessid(i) in url][0]
+        return payloads.user_matches(2, user=user)
+
+    monkeypatch.setattr(api, '_getjson', getjson)
+
+    users = ['닉네임1', '닉네임2', '없는닉네임',
+             User(api, '닉네임3', payloads.accessid(3)), '닉네임1']
+    res = api.getUsersMatches(users, limit=2, max_workers=4)
+
+    assert list(res) == ['닉네임1', '닉네임2', payloads.accessid(3)]
+    assert res['닉네임1'].nickname == '닉네임1'
+    assert len(list(res[payloads.accessid(3)].mergevalues())) == 2
+    assert isinstance(res.errors['없는닉네임'], NotFound)
+    assert len(urls) == 3 + 3
+
+    urls.clear()
+    res = api.getUsersMatches([payloads.accessid(0)], accessid=True)
+    assert res[payloads.accessid(0)].nickname == '닉네임0'
+    assert len(urls) == 1
+
+    # accessid 를 모르는 User 도 스레드 풀에서 변환하고 실패를 기록합니다.
+    urls.clear()
+    user = User(api, '닉네임3')
+    res = api.getUsersMatches([User(api, '없는닉네임'), user])
+    assert list(res) == [payloads.accessid(3)]
+    assert user.accessid == payloads.accessid(3)
+    assert isinstance(res.errors['없는닉네임'], NotFound)
+    assert len(urls) == 3
+
+
+def test_download_meta(tmp_path):
+    import io
+    import zipfile
+
+    def makezip(files):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w') as zf:
+            for name, data in files.items():
+                zf.writestr(name, data)
+        return buf.getvalue()
+
+    class Response(object):
+        def __init__(self, status_code, body=b'', headers=None):
+            self.status_code = status_code
+            self.headers = headers or {}
+            self._body = body
+
+        def iter_content(self, chunk_size):
+            for i in range(0, len(self._body), chunk_size):
+                yield self._body[i:i + chunk_size]
+
+        def raise_for_status(self):
+            pass
+
+        def close(self):
+            pass
+
+    class Session(object):
+        def __init__(self):
+            self.etag = '"1"'
+            self.body = makezip({'kart.json': b'[]', 'kart/a.png': b'a',
+                                 'kart/b.png': b'b', 'old.json': b'{}'})
+            self.requests = []
+
+        def get(self, url, headers=None, stream=False, timeout=None):
+            self.requests.append(headers)
+            assert stream
+            if headers.get('If-None-Match') == self.etag:
+                return Response(304)
+            return Response(200, self.body, {'ETag': self.etag})
+
+    session = Session()
+    path = str(tmp_path / 'meta')
+    os.makedirs(os.path.join(path, 'kart'))
+    # 메타데이터가 아닌 파일은 지워지지 않아야 합니다.
+    foreign = [os.path.join(path, 'my_script.py'),
+               os.path.join(path, 'kart', 'mine.png')]
+    for name in foreign:
+        with open(name, 'w') as f:
+            f.write('keep')
+
+    assert metadata.download_meta(path, session, chunk_size=7)
+    assert open(os.path.join(path, 'kart', 'b.png')).read() == 'b'
+    stat = os.stat(os.path.join(path, 'kart', 'a.png'))
+
+    assert not metadata.download_meta(path, session)
+    assert session.requests[-1] == {'If-None-Match': '"1"'}
+
+    session.etag = '"2"'
+    session.body = makezip({'kart.json': b'[]', 'kart/a.png': b'a',
+                            'kart/b.png': b'bb'})
+    assert metadata.download_meta(path, session)
+    assert open(os.path.join(path, 'kart', 'b.png')).read() == 'bb'
+    after = os.stat(os.path.join(path, 'kart', 'a.png'))
+    assert (after.st_ino, after.st_mtime_ns) == (stat.st_ino,
+                                                 stat.st_mtime_ns)
+    assert not os.path.exists(os.path.join(path, 'old.json'))
+    for name in foreign:
+        assert open(name).read() == 'keep'
+    assert sorted(os.listdir(str(tmp_path))) == ['meta']
+    assert sorted(os.listdir(path)) == ['.metadata.json', 'kart',
+                                        'kart.json', 'my_script.py']
+
+    # 받아둔 파일이 지워지면 ETag 를 보내지 않고 다시 받습니다.
+    assert not metadata.downmeta_ifnotexist(path, session)
+    os.remove(os.path.join(path, 'kart.json'))
+    assert metadata.downmeta_ifnotexist(path, session)
+    assert session.requests[-1] == {}
+    assert open(os.path.join(path, 'kart.json')).read() == '[]'
+
+    # 크기가 같게 망가진 파일도 CRC 로 찾아 되살립니다.
+    with open(os.path.join(path, 'kart', 'a.png'), 'w') as f:
+        f.write('x')
+    assert metadata.download_meta(path, session)
+    assert session.requests[-1] == {}
+    assert open(os.path.join(path, 'kart', 'a.png')).read() == 'a'
+    assert not metadata.download_meta(path, session)
+    assert session.requests[-1] == {'If-None-Match': '"2"'}
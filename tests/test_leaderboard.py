@@ -0,0 +1,68 @@
+import random
+
+import pytest
+from KartRider import Api, TrackIndex
+from KartRider.leaderboard import LogSketch
+from KartRider.match import MatchDetail
+
+from . import payloads
+
+
+def test_track_index():
+    api = Api('key')
+    raws = [payloads.detail(i, teamgame=i % 2 == 0) for i in range(40)]
+    raws[0]['teams'][0]['players'][0] = payloads.player(0, 99)
+    details = []
+    for i, raw in enumerate(raws):
+        detail = MatchDetail(api, payloads.matchid(i))
+        detail._setdetail(raw)
+        details.append(detail)
+
+    byobj = TrackIndex(k=5)
+    assert byobj.add(details) == 40 * 8 - 1
+    assert byobj.add(details[:3]) == 0
+    assert len(byobj) == 40
+    byraw = TrackIndex(k=5, dedupe=False)
+    byraw.add(raws)
+    assert not byraw.dedupe and byraw._matchids is None
+
+    again = TrackIndex(k=5, dedupe=False)
+    again.add(raws[:2])
+    assert again.add(raws[:2]) > 0 and len(again) == 4
+
+    track = raws[0]['trackId']
+    finished = []
+    for raw in raws:
+        if raw['trackId'] != track:
+            continue
+        teams = raw.get('teams', [{'players': raw.get('players')}])
+        finished.extend((int(p['matchTime']), p['accountNo'])
+                        for team in teams for p in team['players']
+                        if p['matchTime'])
+    finished.sort()
+    for index in (byobj, byraw):
+        top = index.top(track, n=3)
+        assert [(r.time, r.accountno) for r in top] == finished[:3]
+        assert index.count(track) == len(finished)
+    assert byraw.top(track, matchtype=payloads.SPEED_SOLO) == []
+
+    shards = [TrackIndex(k=5), TrackIndex(k=5)]
+    shards[0].add(raws[:20])
+    shards[1].add(raws[20:])
+    merged = shards[0].merge(shards[1])
+    assert len(merged) == 40
+    assert merged.top(track, n=5) == byraw.top(track, n=5)
+    assert merged.count(track) == byraw.count(track)
+
+    rng = random.Random(0)
+    values = sorted(rng.uniform(60000, 180000) for _ in range(10000))
+    sketch = LogSketch(0.01)
+    for v in values:
+        sketch.add(v)
+    for q in (0.01, 0.5, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.02 * exact
+    assert abs(sketch.rank(values[2500]) - 0.25) < 0.01
+
+    with pytest.raises(ValueError):
+        merged.merge(TrackIndex(k=10))
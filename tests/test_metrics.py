@@ -0,0 +1,120 @@
+import pytest
+from KartRider import Api, DetailCache, MetricsCollector
+from KartRider.match import MatchDetail
+from KartRider.mockserver import MockServer
+
+
+def test_metrics(tmp_path):
+    metrics = MetricsCollector()
+    events = []
+
+    # 세번째 요청마다 429 를 받습니다.
+    with MockServer(matches=100, fail_every=3) as server:
+        api = Api('key', base_url=server.url, backoff=0, max_retries=10,
+                  detail_cache=DetailCache(str(tmp_path / 'd.sqlite3')),
+                  hooks=[metrics, lambda e, d: events.append(e)])
+
+        am = api.getAllMatches(limit=5, prefetch=True)
+        api.prefetch_details(MatchDetail(api, d.matchid)
+                             for d in am.mergevalues())
+        api.user('닉네임')
+        api.user('닉네임')
+        lazy = MatchDetail(api, '%016x' % (0x02f10015820b0000 + 50))
+        assert lazy.playtime == 109
+
+    snap = metrics.snapshot()
+    endpoints = snap['endpoints']
+    assert endpoints['matches/all']['status'][200] == 1
+    assert endpoints['matches']['status'][200] == 6
+    assert endpoints['users/nickname']['status'][200] == 1
+    retries = sum(e['retries'] for e in endpoints.values())
+    assert server.requests == 11 and server.throttled == 3
+    assert retries == server.throttled == events.count('retry')
+    assert sum(e['count'] for e in endpoints.values()) == server.requests
+    assert sum(e['latency'][float('inf')] for e in endpoints.values()) == 0
+    assert snap['caches'] == {'detail': {'hits': 5, 'misses': 6},
+                              'user': {'hits': 1, 'misses': 1}}
+    assert snap['lazy_details'] == 1
+    assert endpoints['matches']['bytes'] > 0
+
+    metrics.reset()
+    assert metrics.snapshot()['endpoints'] == {}
+
+    class Broken(object):
+        def get(self, url, headers=None, timeout=None):
+            raise ConnectionError('boom')
+
+    api = Api('key', transport=Broken(), hooks=[metrics])
+    with pytest.raises(ConnectionError):
+        api.getAllMatches()
+    stats = metrics.snapshot()['endpoints']['matches/all']
+    assert stats['count'] == stats['errors'] == 1
+    assert stats['status'] == {None: 1} and stats['bytes'] == 0
+
+
+def test_metrics_adapters():
+    prometheus_client = pytest.importorskip('prometheus_client')
+    from KartRider import PrometheusHook
+
+    registry = prometheus_client.CollectorRegistry()
+    hook = PrometheusHook(registry)
+    hook('request', {'endpoint': 'matches', 'url': '', 'status': 200,
+                     'elapsed': 0.02, 'size': 100, 'attempt': 0})
+    hook('request', {'endpoint': 'matches', 'url': '', 'status': None,
+                     'elapsed': 0.01, 'size': 0, 'attempt': 0})
+    hook('cache', {'cache': 'detail', 'hit': True})
+    hook('lazy_detail', {'matchid': '1'})
+
+    get = registry.get_sample_value
+    assert get('kartrider_requests_total',
+               {'endpoint': 'matches', 'status': '200'}) == 1
+    assert get('kartrider_requests_total',
+               {'endpoint': 'matches', 'status': 'error'}) == 1
+    assert get('kartrider_response_bytes_total',
+               {'endpoint': 'matches'}) == 100
+    assert get('kartrider_cache_total',
+               {'cache': 'detail', 'result': 'hit'}) == 1
+    assert get('kartrider_lazy_details_total') == 1
+
+
+def test_opentelemetry_hook():
+    pytest.importorskip('opentelemetry.sdk')
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+    from KartRider import OpenTelemetryHook
+
+    reader = InMemoryMetricReader()
+    provider = MeterProvider(metric_readers=[reader])
+    hook = OpenTelemetryHook(provider.get_meter('test'))
+    for status in (200, 200, None):
+        hook('request', {'endpoint': 'matches', 'url': '', 'status': status,
+                         'elapsed': 0.02, 'size': 100, 'attempt': 0})
+    hook('retry', {'endpoint': 'matches', 'url': '', 'status': 429,
+                   'delay': 1.0, 'attempt': 0})
+    hook('coalesced', {'endpoint': 'matches', 'url': ''})
+    hook('cache', {'cache': 'detail', 'hit': False})
+    hook('lazy_detail', {'matchid': '1'})
+
+    points = {}
+    data = reader.get_metrics_data()
+    for scope in data.resource_metrics[0].scope_metrics:
+        for metric in scope.metrics:
+            for point in metric.data.data_points:
+                key = (metric.name, tuple(sorted(point.attributes.items())))
+                points[key] = point
+
+    def value(name, **attrs):
+        return points[(name, tuple(sorted(attrs.items())))].value
+
+    assert value('kartrider.requests', endpoint='matches', status=200) == 2
+    assert value('kartrider.requests', endpoint='matches',
+                 status='error') == 1
+    assert value('kartrider.response.size', endpoint='matches') == 300
+    assert value('kartrider.retries', endpoint='matches', status=429) == 1
+    assert value('kartrider.coalesced', endpoint='matches') == 1
+    assert value('kartrider.cache', cache='detail', result='miss') == 1
+    assert value('kartrider.lazy_details') == 1
+
+    duration = points[('kartrider.request.duration',
+                       (('endpoint', 'matches'), ('status', 200)))]
+    assert duration.count == 2 and duration.sum == pytest.approx(0.04)
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+from KartRider import Api, ForbiddenToken, MatchSync, TooManyRequest, metadata
+from KartRider.mockserver import MockServer
+
+
+metadata.set_metadatapath(os.path.join('tests', 'metadata'))
+
+
+def test_mockserver(tmp_path):
+    with MockServer(matches=1200, players=6, token='key', seed=0) as server:
+        api = Api('key', base_url=server.url, max_retries=0)
+
+        user = api.user('한글닉네임')
+        assert api.user(accessid=user.accessid).accessid == user.accessid
+
+        mr = user.getMatches(limit=20, match_types='스피드 팀전')
+        assert len(list(mr.mergevalues())) == 20
+
+        am = api.getAllMatches(limit=30, prefetch=True)
+        details = list(am.mergevalues())
+        assert len(details) == 30
+        assert all(sum(len(t) for t in d.teams) == 6
+                   for d in details if d.isteamgame)
+        assert all(len(d.players) == 6
+                   for d in details if not d.isteamgame)
+
+        matches = list(api.iter_all_matches(page_size=500))
+        assert len(matches) == 1200
+        assert len(set(m.matchid for m in matches)) == 1200
+
+        last = api.getAllMatches(start_date='2019-12-31 23:30:00', limit=500)
+        assert len(list(last.mergevalues())) == 21
+
+        sync = MatchSync(api, str(tmp_path / 'sync.sqlite3'))
+        assert len(sync.sync(user.accessid)) == 1200
+        assert sync.sync(user.accessid) == []
+        sync.close()
+
+        with pytest.raises(ForbiddenToken):
+            Api('other', base_url=server.url).getAllMatches()
+
+        server.error_rate = 1
+        with pytest.raises(TooManyRequest):
+            api.getAllMatches()
+        assert server.throttled == 1
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+from KartRider import ApiPool, ForbiddenToken, MetricsCollector
+from KartRider.transport import RecordedResponse
+
+from . import payloads
+
+
+def test_api_pool():
+    class Keys(object):
+        def __init__(self, statuses):
+            self.statuses = statuses
+            self.calls = []
+
+        def get(self, url, headers=None, timeout=None):
+            key = headers['Authorization']
+            self.calls.append(key)
+            status = self.statuses.get(key, 200)
+            body = json.dumps(payloads.all_matches(3)).encode()
+            return RecordedResponse(url, status, body, {'Retry-After': '30'})
+
+    network = Keys({})
+    metrics = MetricsCollector()
+    api = ApiPool(['a', 'b', 'c'], transport=network, hooks=[metrics])
+    for _ in range(6):
+        api.getAllMatches()
+    assert sorted(network.calls) == ['a', 'a', 'b', 'b', 'c', 'c']
+    assert metrics.snapshot()['endpoints']['matches/all']['count'] == 6
+
+    network = Keys({'a': 429, 'b': 403})
+    api = ApiPool(['a', 'b', 'c'], transport=network, cooldown=60)
+    for _ in range(3):
+        assert len(list(api.getAllMatches().mergevalues())) == 3
+    assert network.calls[:2] == ['a', 'b']
+    assert network.calls[2:] == ['c'] * 3
+    stats = api.stats()
+    assert [s['available'] for s in stats] == [False, False, True]
+    assert [s['errors'] for s in stats] == [1, 1, 0]
+    assert all(s['inflight'] == 0 for s in stats)
+
+    network = Keys({'a': 403, 'b': 403})
+    api = ApiPool(['a', 'b'], transport=network)
+    with pytest.raises(ForbiddenToken):
+        api.getAllMatches()
+    assert network.calls == ['a', 'b']
+
+    with pytest.raises(ValueError):
+        ApiPool([])
+    with pytest.raises(ValueError):
+        ApiPool(['a', 'b'], rate_limit=[1])
@@ -0,0 +1,43 @@
+import io
+
+import pytest
+import requests
+from KartRider import Api, RateLimiter, TooManyRequest, apiwrapper
+
+
+def test_ratelimiter():
+    limiter = RateLimiter(10, burst=2)
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 0
+    assert 0.09 < limiter.reserve() <= 0.1
+
+    limiter.pause(5)
+    assert limiter.reserve() > 4
+
+
+def test_api_retry(monkeypatch):
+    def response(code, headers=None):
+        res = requests.Response()
+        res.status_code = code
+        res.headers.update(headers or {})
+        res._content = b'{"name": "a"}'
+        res.raw = io.BytesIO()
+        return res
+
+    responses = [response(503), response(429, {'Retry-After': '2'}),
+                 response(200)]
+    sleeps = []
+
+    api = Api('key', rate_limit=1000, backoff=0.1)
+    monkeypatch.setattr(api._session, 'get',
+                        lambda *args, **kwargs: responses.pop(0))
+    monkeypatch.setattr(apiwrapper.time, 'sleep', sleeps.append)
+
+    assert api._getNicknamebyID('1') == 'a'
+    assert 0 <= sleeps[0] <= 0.1
+    assert sleeps[1] == 2
+
+    api.max_retries = 0
+    responses.append(response(429))
+    with pytest.raises(TooManyRequest):
+        api._getNicknamebyID('2')
@@ -0,0 +1,27 @@
+from KartRider.schema import (Field, Schema, integer, matchrank, matchretired,
+                              matchwin, text)
+
+
+def test_schema():
+    class Obj(object):
+        pass
+
+    schema = Schema(Field('playerCount', conv=integer),
+                    Field('character', 'characterid'),
+                    Field('teamId', conv=text),
+                    Field('player', conv=lambda api, v: (api, v),
+                          nested=True))
+    obj = Obj()
+    schema.apply(obj, {'playerCount': '', 'character': 'abc',
+                       'teamId': ' ', 'player': 1, 'unknown': 2}, 'api')
+
+    assert obj.playercount == 0 and obj.characterid == 'abc'
+    assert obj.teamid is None and obj.player == ('api', 1)
+    assert not hasattr(obj, 'unknown')
+    assert schema.field('characterid').key == 'character'
+    assert schema.attrs == ('playercount', 'characterid', 'teamid', 'player')
+
+    assert text(None) is None and integer(None) == 0
+    assert [matchrank(v) for v in ('1', '99', '')] == [1, -1, -1]
+    assert [matchretired(v) for v in ('1', '99', '')] == [False, True, True]
+    assert matchwin('1') and not matchwin('0')
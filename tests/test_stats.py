@@ -0,0 +1,57 @@
+import pickle
+from datetime import datetime
+
+import pytest
+from KartRider import Api, MatchStats
+from KartRider.match import MatchDetail, MatchResponse
+from KartRider.stats import Aggregate
+
+from . import payloads
+
+
+def test_match_stats():
+    api = Api('key')
+    raw = payloads.user_matches(40)
+    mr = MatchResponse(api, raw['nickName'], raw['matches'])
+    lazy = MatchResponse(api, raw['nickName'], raw['matches'], lazy=True)
+
+    byraw = MatchStats(by=('kart', 'track')).add(mr)
+    byobj = MatchStats(by=('kart', 'track')).add(mr.mergevalues())
+    byview = MatchStats(by=('kart', 'track')).add(lazy.mergevalues())
+    assert dict(byraw.items()) == dict(byobj.items()) == dict(byview.items())
+    assert byraw.total.count == 40
+
+    ranks = [m.player.matchrank for m in mr.mergevalues()]
+    wins = [m.player.matchwin for m in mr.mergevalues()]
+    assert byraw.total.avgrank == sum(ranks) / len(ranks)
+    assert byraw.total.winrate == sum(wins) / len(wins)
+
+    details = []
+    for i in range(6):
+        detail = MatchDetail(api, payloads.matchid(i))
+        detail._setdetail(payloads.detail(i, teamgame=i % 2 == 0))
+        details.append(detail)
+
+    whole = MatchStats(by=('track', 'matchtype')).add(details)
+    shards = [MatchStats(by=('track', 'matchtype')).add(details[:3]),
+              MatchStats(by=('track', 'matchtype')).add(details[3:])]
+    merged = pickle.loads(pickle.dumps(shards[0])).merge(shards[1])
+    assert dict(merged.items()) == dict(whole.items())
+    assert whole.total.count == 48 and whole.total.retired == 0
+    assert whole.total.winrate == 0.5
+
+    agg = Aggregate()
+    agg.add(-1, False, True)
+    agg.add(2, True, False, 1000)
+    assert (agg.retirerate, agg.avgrank, agg.avgtime) == (0.5, 2, 1000)
+
+    hourly = MatchStats(by=('time',), bucket=600).add(mr)
+    first = min(k[0] for k, _ in hourly.items())
+    assert first == datetime(2019, 12, 16, 13, 0)
+    assert sum(a.count for _, a in hourly.items()) == 40
+    assert hourly.top(1, key='count')[0][1].count == 10
+
+    with pytest.raises(ValueError):
+        MatchStats(by=('time',))
+    with pytest.raises(ValueError):
+        whole.merge(byraw)
@@ -0,0 +1,50 @@
+import os
+
+from KartRider import Api, MatchSync, metadata
+
+from . import payloads
+
+
+metadata.set_metadatapath(os.path.join('tests', 'metadata'))
+
+
+def test_match_sync(tmp_path, monkeypatch):
+    api = Api('key')
+    calls = []
+    # 새 매치가 생길때마다 앞(최신)에 추가되는 서버 기록
+    history = [payloads.matchinfo(i) for i in range(5)][::-1]
+
+    def getmatchlist(accessid, start_date, end_date, offset, limit, mt):
+        calls.append((start_date, offset))
+        start = start_date.replace(' ', 'T')
+        matches = [m for m in history if m['endTime'] >= start]
+        return {'nickName': '닉네임0', 'matches': [{
+            'matchType': payloads.SPEED_TEAM,
+            'matches': matches[offset:offset + limit]}]}
+
+    monkeypatch.setattr(api, '_getMatchlist', getmatchlist)
+
+    sync = MatchSync(api, str(tmp_path / 'sync.sqlite3'), page_size=2)
+    accessid = payloads.accessid(0)
+
+    new = sync.sync(accessid)
+    assert len(new) == 5
+    assert calls == [('', 0), ('', 2), ('', 4)]
+    assert sync.watermark(accessid) == (history[0]['endTime'],
+                                        history[0]['matchId'])
+
+    # 워터마크와 같은 시간의 매치는 중복으로 걸러집니다.
+    calls.clear()
+    assert sync.sync(accessid) == []
+    assert calls == [('2019-12-16 13:04:45', 0)]
+
+    history.insert(0, payloads.matchinfo(5))
+    new = sync.sync(accessid)
+    assert [m.detail.matchid for m in new] == [payloads.matchid(5)]
+    assert sync.watermark(accessid)[1] == payloads.matchid(5)
+
+    stored = [m.detail.matchid for m in sync.matches(accessid)]
+    assert stored == [m['matchId'] for m in history]
+    assert len(sync.matches(accessid, start_date='2019-12-16 13:03:00')) == 3
+    assert sync.watermark(accessid, '스피드 개인전') is None
+    sync.close()
@@ -0,0 +1,42 @@
+import json
+import os
+
+import pytest
+from KartRider import Api, RecordTransport, ReplayTransport
+from KartRider.transport import RecordedResponse
+
+from . import payloads
+
+
+def test_transport(tmp_path):
+    class Network(object):
+        def __init__(self):
+            self.urls = []
+
+        def get(self, url, headers=None, timeout=None):
+            self.urls.append((url, headers))
+            body = json.dumps(payloads.user_matches(3)).encode()
+            return RecordedResponse(url, 200, body, {'ETag': '"a"'})
+
+        def close(self):
+            pass
+
+    network = Network()
+    path = str(tmp_path / 'recordings')
+
+    with Api('key', transport=RecordTransport(path, network)) as api:
+        recorded = api.getUserMatches(payloads.accessid(0), limit=3)
+    assert network.urls[0][1] == {'Authorization': 'key'}
+    assert 'key' not in ''.join(open(os.path.join(path, f)).read()
+                                for f in os.listdir(path))
+
+    replay = ReplayTransport(path)
+    api = Api('', transport=replay)
+    replayed = api.getUserMatches(payloads.accessid(0), limit=3)
+
+    assert replay.requests == 1 and len(network.urls) == 1
+    assert replayed.to_columns() == recorded.to_columns()
+    assert replay.get(network.urls[0][0]).headers['etag'] == '"a"'
+
+    with pytest.raises(LookupError):
+        api.getUserMatches(payloads.accessid(0), limit=4)
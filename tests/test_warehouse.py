@@ -0,0 +1,113 @@
+from KartRider import Api, MatchWarehouse
+from KartRider.match import AllMatches, MatchDetail, MatchResponse
+
+from . import payloads
+
+
+def test_match_warehouse(tmp_path, monkeypatch):
+    api = Api('key')
+    urls = []
+
+    def getjson(url):
+        urls.append(url)
+        i = payloads.matchindex(url.rsplit('/', 1)[1])
+        return payloads.detail(i, teamgame=i % 2 == 0)
+
+    monkeypatch.setattr(api, '_getjson', getjson)
+    path = str(tmp_path / 'warehouse.sqlite3')
+    warehouse = MatchWarehouse(path, api)
+
+    allmatches = AllMatches(api, **payloads.all_matches(6))
+    assert warehouse.add_details(allmatches) == 6
+    assert len(urls) == 6
+    raws = [payloads.detail(i) for i in range(4, 8)]
+    assert warehouse.add_details(raws) == 2
+    assert warehouse.add_details(allmatches) == 0 and len(urls) == 6
+    assert len(warehouse) == 8
+
+    api.detail_cache = warehouse
+    raw = api._getMatchDetails(payloads.matchid(8))
+    assert raw['matchId'] == payloads.matchid(8)
+    assert payloads.matchid(8) in warehouse
+    api._getMatchDetails(payloads.matchid(8))
+    assert len(urls) == 7
+
+    track = payloads.detail(1)['trackId']
+    bytrack = warehouse.details(track=track)
+    expected = [i for i in range(9) if payloads.detail(i)['trackId'] == track]
+    assert sorted(d.matchid for d in bytrack) == sorted(
+        payloads.matchid(i) for i in expected)
+    assert bytrack[0].trackid == track
+
+    player = payloads.detail(3, teamgame=False)['players'][0]
+    byuser = warehouse.details(accessid=player['accountNo'])
+    assert [d.matchid for d in byuser] == [payloads.matchid(3)]
+    bykart = warehouse.details(kart=player['kart'],
+                               accessid=player['accountNo'])
+    assert len(bykart) == 1
+    assert warehouse.details(kart=player['kart'], accessid='0') == []
+
+    assert len(warehouse.details(start_date='2019-12-16 13:05:00')) == 4
+    assert len(warehouse.details(limit=3)) == 3
+
+    stored = warehouse.allmatches(match_types=payloads.SPEED_SOLO)
+    solo = sorted(d.matchid for d in stored.mergevalues())
+    assert solo == [payloads.matchid(i) for i in (1, 3, 5)]
+    assert warehouse.detail(payloads.matchid(0)).isteamgame
+    assert warehouse.detail('없는 매치') is None
+
+    response = MatchResponse(api, '닉네임0',
+                             payloads.user_matches(5)['matches'])
+    assert warehouse.add_usermatches(response) == 5
+    assert warehouse.add_usermatches(response) == 0
+    mr = warehouse.usermatches(payloads.accessid(0))
+    assert mr.nickname == '닉네임0'
+    newest = [m.detail.matchid for m in mr.mergevalues()]
+    assert newest == [payloads.matchid(i) for i in range(4, -1, -1)]
+    mr = warehouse.usermatches(payloads.accessid(0), track=track, lazy=True)
+    assert len(list(mr.mergevalues())) == len([i for i in expected if i < 5])
+
+    # 상세 정보를 받아온 MatchDetail 은 다시 요청하지 않습니다.
+    calls = len(urls)
+    loaded = [MatchDetail(api, payloads.matchid(i)) for i in (20, 21)]
+    for d in loaded:
+        d._setdetail(payloads.detail(payloads.matchindex(d.matchid)))
+    assert warehouse.add_details(loaded) == 2
+    assert len(urls) == calls
+    assert warehouse.get(payloads.matchid(20)) == loaded[0].raw
+    warehouse.close()
+
+    with MatchWarehouse(path) as reopened:
+        assert len(reopened) == 11
+        mr = reopened.usermatches(payloads.accessid(0), limit=2)
+        assert len(list(mr.mergevalues())) == 2
+
+
+def test_match_warehouse_decoder(tmp_path):
+    import json
+    import sqlite3
+
+    def decoder(data):
+        assert isinstance(data, bytes)
+        return json.loads(data)
+
+    path = str(tmp_path / 'warehouse.sqlite3')
+    with MatchWarehouse(path, json_decoder=decoder) as warehouse:
+        assert warehouse.add_details([payloads.detail(0)]) == 1
+        assert warehouse.get(payloads.matchid(0)) == payloads.detail(0)
+        assert warehouse.details()[0].matchid == payloads.matchid(0)
+
+        response = MatchResponse(None, '닉네임0',
+                                 payloads.user_matches(2)['matches'])
+        assert warehouse.add_usermatches(response) == 2
+        mr = warehouse.usermatches(payloads.accessid(0))
+        assert len(list(mr.mergevalues())) == 2
+
+    # 이전 버전이 TEXT 로 저장한 데이터도 bytes 로 디코더에 넘깁니다.
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute('UPDATE details SET data = ?',
+                     (json.dumps(payloads.detail(1)),))
+    conn.close()
+    with MatchWarehouse(path, json_decoder=decoder) as warehouse:
+        assert warehouse.get(payloads.matchid(0)) == payloads.detail(1)